@@ -62,7 +62,8 @@ async def list_backups() -> None:
                     age_days = int(backup['age_days'])
                     age_text = f"{age_days}d ago" if age_days > 0 else "Today"
                     
-                    print(f"  • {backup['filename']}")
+                    kind = " (incremental snapshot)" if backup['snapshot'] else ""
+                    print(f"  • {backup['filename']}{kind}")
                     print(f"    Size: {backup['size_mb']:.2f} MB | Age: {age_text}")
                     print(f"    Created: {backup['created_at'][:19].replace('T', ' ')}")
                     
@@ -175,7 +176,7 @@ async def diagnose_database() -> None:
         sys.exit(1)
 
 async def restore_backup(backup_path: str, confirm: bool = False) -> None:
-    """Restore from backup"""
+    """Restore from a backup archive or an incremental snapshot id"""
     if not confirm:
         print("⚠️  WARNING: This will replace all current data!")
         print("Use --confirm flag if you're sure you want to proceed.")
@@ -185,7 +186,7 @@ async def restore_backup(backup_path: str, confirm: bool = False) -> None:
     print("⏳ Please wait...")
     
     try:
-        success, result = await backup_service.restore_from_backup(backup_path, confirm_restore=True)
+        success, result = await backup_service.restore_backup(backup_path, confirm_restore=True)
         
         if success:
             print(f"✅ Restore completed successfully!")
@@ -250,7 +251,7 @@ def main():
     
     # Restore command
     restore_parser = subparsers.add_parser('restore', help='Restore from backup')
-    restore_parser.add_argument('backup_path', help='Path to backup file')
+    restore_parser.add_argument('backup_path', help='Path to backup file or incremental snapshot id')
     restore_parser.add_argument('--confirm', action='store_true', 
                                help='Confirm restoration (required)')
     
@@ -14,6 +14,44 @@ class Settings:
     
     # Database Configuration
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///data/database.db")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))  # 64 MB page cache
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    
+    # In-process user profile cache
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))  # seconds
+    
+    # Per-user mood analytics cache (dropped on every new check-in)
+    MOOD_ANALYTICS_CACHE_SIZE = int(os.getenv("MOOD_ANALYTICS_CACHE_SIZE", "2000"))
+    MOOD_ANALYTICS_CACHE_TTL = int(os.getenv("MOOD_ANALYTICS_CACHE_TTL", "3600"))  # seconds
+    
+    # Ranked journal search results, one query per user (dropped on every new entry)
+    JOURNAL_SEARCH_CACHE_SIZE = int(os.getenv("JOURNAL_SEARCH_CACHE_SIZE", "2000"))
+    JOURNAL_SEARCH_CACHE_TTL = int(os.getenv("JOURNAL_SEARCH_CACHE_TTL", "600"))  # seconds
+    
+    # Nightly streak refresh (users per UPDATE chunk)
+    STREAK_REFRESH_CHUNK_SIZE = int(os.getenv("STREAK_REFRESH_CHUNK_SIZE", "5000"))
+    
+    # Conversation state (journal drafts, mood check-in steps): "sqlite" survives restarts, "memory" does not
+    CONVERSATION_STATE_BACKEND = os.getenv("CONVERSATION_STATE_BACKEND", "sqlite")
+    CONVERSATION_STATE_PATH = os.getenv("CONVERSATION_STATE_PATH", "data/conversation_state.db")
+    CONVERSATION_STATE_MAX_ENTRIES = int(os.getenv("CONVERSATION_STATE_MAX_ENTRIES", "10000"))
+    CONVERSATION_STATE_TTL = int(os.getenv("CONVERSATION_STATE_TTL", "21600"))  # seconds; abandoned flows expire
+    
+    # Online database backup: pages copied per step and pause between steps (seconds)
+    BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "1024"))
+    BACKUP_STEP_SLEEP = float(os.getenv("BACKUP_STEP_SLEEP", "0.01"))
+    # NDJSON table export inside full backups: "gzip" or "none", rows fetched per batch
+    BACKUP_EXPORT_COMPRESSION = os.getenv("BACKUP_EXPORT_COMPRESSION", "gzip")
+    BACKUP_EXPORT_BATCH_SIZE = int(os.getenv("BACKUP_EXPORT_BATCH_SIZE", "1000"))
+    # Full backup archive: "zip" (parallel deflate) or "tar.zst" (needs zstandard); 0 workers = all cores
+    BACKUP_ARCHIVE_FORMAT = os.getenv("BACKUP_ARCHIVE_FORMAT", "zip")
+    BACKUP_COMPRESSION_WORKERS = int(os.getenv("BACKUP_COMPRESSION_WORKERS", "0"))
+    # Incremental backups: chunk size of the content-addressed store (bytes, multiple of the page size)
+    BACKUP_CHUNK_SIZE = int(os.getenv("BACKUP_CHUNK_SIZE", str(256 * 1024)))
     
     # Logging Configuration
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -21,13 +59,20 @@ class Settings:
     # Timezone Configuration
     TIMEZONE = os.getenv("TIMEZONE", "Asia/Jakarta")
     
-    # Daily reminder configuration
+    # Daily reminder configuration (DAILY_REMINDER_TIME is the fallback for users without a valid reminder_time)
     DAILY_REMINDER_TIME = os.getenv("DAILY_REMINDER_TIME", "08:00")
     AFTERNOON_BOOST_TIME = os.getenv("AFTERNOON_BOOST_TIME", "15:00")
     EVENING_REFLECTION_TIME = os.getenv("EVENING_REFLECTION_TIME", "21:00")
     WEEKLY_SUMMARY_DAY = int(os.getenv("WEEKLY_SUMMARY_DAY", "6"))  # 6 = Sunday
     WEEKLY_SUMMARY_TIME = os.getenv("WEEKLY_SUMMARY_TIME", "10:00")
-    
+
+    # Broadcast delivery configuration (Telegram limits: ~30 msg/s global, ~1 msg/s per chat)
+    BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "20"))
+    BROADCAST_GLOBAL_RATE = float(os.getenv("BROADCAST_GLOBAL_RATE", "25"))
+    BROADCAST_PER_CHAT_INTERVAL = float(os.getenv("BROADCAST_PER_CHAT_INTERVAL", "1.0"))
+    BROADCAST_MAX_RETRIES = int(os.getenv("BROADCAST_MAX_RETRIES", "3"))
+    BROADCAST_PROGRESS_EVERY = int(os.getenv("BROADCAST_PROGRESS_EVERY", "500"))
+
     # Validation
     @classmethod
     def validate(cls):
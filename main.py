@@ -48,6 +48,7 @@ def setup_bot_handlers_sync(application: Application, scheduler_service: Schedul
     application.add_handler(CommandHandler("emergency", command_handlers.emergency_command))
     application.add_handler(CommandHandler("relapse", command_handlers.relapse_command))
     application.add_handler(CommandHandler("stats", command_handlers.stats_command))
+    application.add_handler(CommandHandler("searchjournal", command_handlers.search_journal_command))
     
     # Add admin command handlers
     application.add_handler(CommandHandler("broadcastnow", admin_handlers.broadcast_now_command))
@@ -113,6 +114,7 @@ async def setup_bot_handlers(application: Application) -> None:
     application.add_handler(CommandHandler("emergency", command_handlers.emergency_command))
     application.add_handler(CommandHandler("relapse", command_handlers.relapse_command))
     application.add_handler(CommandHandler("stats", command_handlers.stats_command))
+    application.add_handler(CommandHandler("searchjournal", command_handlers.search_journal_command))
     
     # Add callback query handler
     application.add_handler(CallbackQueryHandler(callback_handlers.handle_callback))
@@ -25,8 +25,12 @@ class AdminHandlers:
             return
         
         try:
-            await self.broadcast_service.send_daily_broadcast()
-            await update.message.reply_text("✅ Daily broadcast sent to all users!")
+            report = await self.broadcast_service.send_daily_broadcast(bot=context.bot)
+            await update.message.reply_text(
+                f"✅ Daily broadcast sent to all users!\n"
+                f"📤 Sent: {report.get('sent', 0)}\n"
+                f"❌ Failed: {report.get('failed', 0)}"
+            )
         except Exception as e:
             app_logger.error(f"Broadcast error: {e}")
             await update.message.reply_text(f"❌ Broadcast failed: {str(e)}")
@@ -42,7 +46,7 @@ class AdminHandlers:
             user_service = UserService()
             
             # Get user statistics
-            total_users = len(user_service.get_all_users_with_reminders())
+            total_users = user_service.count_users_with_reminders()
             
             # Get scheduler info
             jobs = []
@@ -88,25 +92,14 @@ class AdminHandlers:
             # Join all arguments as message
             custom_message = " ".join(context.args)
             
-            # Send to all users
-            from src.services import UserService
-            user_service = UserService()
-            users = user_service.get_all_users_with_reminders()
-            
-            sent_count = 0
-            failed_count = 0
-            
-            for user in users:
-                try:
-                    await context.bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=f"📢 **Admin Announcement**\n\n{custom_message}",
-                        parse_mode='Markdown'
-                    )
-                    sent_count += 1
-                except Exception as e:
-                    failed_count += 1
-                    app_logger.error(f"Failed to send to user {user.telegram_id}: {e}")
+            # Send to all users through the rate-limited delivery engine
+            report = await self.broadcast_service.send_text_broadcast(
+                f"📢 **Admin Announcement**\n\n{custom_message}",
+                job_name="Admin custom broadcast",
+                bot=context.bot
+            )
+            sent_count = report.get('sent', 0)
+            failed_count = report.get('failed', 0)
             
             await update.message.reply_text(
                 f"✅ Custom broadcast sent!\n"
@@ -153,13 +146,17 @@ class AdminHandlers:
                 "call_to_action": "🧪 **Test Action**: This is a test call to action."
             }
             
-            # Send test message to admin
-            await self.broadcast_service._send_message_to_user(
-                update.effective_user.id, 
-                test_content
+            # Send test message to admin through the same delivery engine as real broadcasts
+            report = await self.broadcast_service._get_delivery_engine(context.bot).broadcast(
+                [update.effective_user.id],
+                lambda chat_id: self.broadcast_service._build_user_message(chat_id, test_content),
+                job_name="Test broadcast"
             )
             
-            await update.message.reply_text("✅ Test broadcast sent to you!")
+            if report['sent']:
+                await update.message.reply_text("✅ Test broadcast sent to you!")
+            else:
+                await update.message.reply_text("❌ Test broadcast could not be delivered, check the logs.")
             
         except Exception as e:
             app_logger.error(f"Test broadcast error: {e}")
@@ -172,7 +169,7 @@ class AdminHandlers:
             return
         
         try:
-            await self.broadcast_service.send_weekly_summary()
+            await self.broadcast_service.send_weekly_summary(bot=context.bot)
             await update.message.reply_text("✅ Weekly summary sent to all users!")
         except Exception as e:
             app_logger.error(f"Weekly summary error: {e}")
@@ -244,6 +241,8 @@ class AdminHandlers:
                     RelapseRecord.created_at >= week_ago
                 ).count()
                 
+                cache_stats = UserService.get_cache_stats()
+                
                 stats_message = f"""
 📈 **Detailed Admin Statistics**
 
@@ -268,6 +267,7 @@ class AdminHandlers:
 • Bot Uptime: Running
 • Database Status: Connected
 • Scheduler Status: Active
+• User Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['hit_rate']}% hit rate, {cache_stats['size']} cached)
 • Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 """
                 
@@ -153,15 +153,16 @@ async def handle_list_backups(query) -> None:
                     age_days = int(backup['age_days'])
                     age_text = f"{age_days}d ago" if age_days > 0 else "Today"
                     
+                    kind = "🧩 " if backup['snapshot'] else ""
                     message_parts.append(
-                        f"• `{backup['filename'][:30]}...` "
+                        f"• {kind}`{backup['filename'][:30]}...` "
                         f"({backup['size_mb']:.1f}MB, {age_text})"
                     )
                     
                     # Add restore button for recent backups
                     if i < 2:  # Max 2 restore buttons per type
                         button_text = f"🔄 Restore {backup_type} #{i+1}"
-                        callback_data = f"backup_restore_{backup_type}_{backup['filename']}"
+                        callback_data = f"backup_restore_pick_{backup_type}_{backup['key']}"
                         buttons.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
                 
                 if len(backup_list) > 3:
@@ -202,6 +203,8 @@ async def handle_backup_status(query) -> None:
             f"💾 **DB Size:** {status['database_size_mb']:.2f} MB",
             f"📁 **Total Backups:** {status['total_backups']}",
             f"💽 **Backup Storage:** {status['backup_directory_size_mb']:.2f} MB",
+            f"🧩 **Incremental Snapshots:** {status['incremental_snapshots']} "
+            f"({status['snapshot_store_size_mb']:.2f} MB)",
         ]
         
         if status['latest_backup']:
@@ -280,7 +283,7 @@ async def handle_restore_menu(query) -> None:
     message = (
         "🔧 **Data Restore Menu**\n\n"
         "⚠️ **WARNING:** Restoring will replace current data!\n"
-        "An emergency backup will be created before restore.\n\n"
+        "Replaced files are kept in backups/emergency before restore.\n\n"
         "Select backup type to restore from:"
     )
     
@@ -301,6 +304,72 @@ async def handle_restore_menu(query) -> None:
     reply_markup = InlineKeyboardMarkup(keyboard)
     await query.edit_message_text(message, reply_markup=reply_markup, parse_mode='Markdown')
 
+async def handle_restore_callback(query, data: str) -> None:
+    """
+    Handle restore callbacks: list a backup type, confirm one backup, run the restore
+    
+    Callback data is ``backup_restore_{list|pick|do}_{type}[_{key}]``; backups are
+    identified by their short key because archive filenames exceed Telegram's
+    64-byte callback data limit.
+    """
+    action, _, rest = data[len("backup_restore_"):].partition("_")
+    backup_type, _, key = rest.partition("_")
+    back_button = [InlineKeyboardButton("🔙 Back", callback_data="backup_restore_menu")]
+    
+    if action == "list":
+        backups = (await backup_service.list_available_backups()).get(backup_type, [])
+        if not backups:
+            await query.edit_message_text(
+                f"📭 No {backup_type} backups found.",
+                reply_markup=InlineKeyboardMarkup([back_button])
+            )
+            return
+        
+        buttons = []
+        for backup in backups[:5]:
+            kind = "🧩 snapshot" if backup['snapshot'] else "📦 archive"
+            created = backup['created_at'][:16].replace('T', ' ')
+            buttons.append([InlineKeyboardButton(
+                f"{created} ({kind}, {backup['size_mb']:.1f}MB)",
+                callback_data=f"backup_restore_pick_{backup_type}_{backup['key']}"
+            )])
+        buttons.append(back_button)
+        await query.edit_message_text(
+            f"🔧 **{backup_type.capitalize()} Backups**\n\nSelect a backup to restore "
+            f"({len(backups)} available, newest first):",
+            reply_markup=InlineKeyboardMarkup(buttons),
+            parse_mode='Markdown'
+        )
+        return
+    
+    backup = await backup_service.find_backup(backup_type, key)
+    if backup is None:
+        await query.edit_message_text("❌ Backup not found (it may have been removed by retention).",
+                                      reply_markup=InlineKeyboardMarkup([back_button]))
+        return
+    
+    if action == "pick":
+        message = (
+            "⚠️ **Confirm Restore**\n\n"
+            f"📁 **Backup:** `{backup['filename']}`\n"
+            f"🧩 **Kind:** {'Incremental snapshot' if backup['snapshot'] else 'Archive'}\n"
+            f"⏰ **Created:** {backup['created_at'][:19].replace('T', ' ')}\n"
+            f"👥 **Users:** {backup.get('user_count', 'N/A')}\n\n"
+            "Current data will be replaced. Replaced files are kept in backups/emergency."
+        )
+        keyboard = [
+            [InlineKeyboardButton("✅ Restore Now", callback_data=f"backup_restore_do_{backup_type}_{key}")],
+            [InlineKeyboardButton("🔙 Back", callback_data=f"backup_restore_list_{backup_type}")]
+        ]
+        await query.edit_message_text(message, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+        return
+    
+    await query.edit_message_text(f"⏳ Restoring `{backup['filename']}`... Please wait.", parse_mode='Markdown')
+    success, result = await backup_service.restore_backup(backup['path'] or backup['filename'], confirm_restore=True)
+    message = f"✅ **Restore completed!**\n\n`{result}`" if success else f"❌ **Restore failed:**\n\n`{result}`"
+    keyboard = [[InlineKeyboardButton("🔙 Back to Menu", callback_data="backup_menu")]]
+    await query.edit_message_text(message, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+
 # Register backup handlers
 def register_backup_handlers(application):
     """Register all backup-related handlers"""
@@ -1,9 +1,13 @@
 from telegram import Update
 from telegram.ext import ContextTypes
-from src.services import UserService, StreakService, MotivationalService, EmergencyService, JournalService
+from src.services import UserService, StreakService, MotivationalService, EmergencyService, JournalService, MoodAnalyticsService, TriggerService
+from src.services.mood_analytics_service import WEEKDAY_NAMES
 from src.bot.keyboards import BotKeyboards
+from src.bot.templates import escape_markdown, message_templates
+from src.bot.handlers.callback_router import CallbackRouter, callback_route
 from src.bot.handlers.mood_checkin_handlers import mood_checkin_handlers
-from src.utils.helpers import get_user_info, format_streak_message
+from src.utils.helpers import get_user_info, format_journal_search_results, format_streak_message
+from src.utils.conversation_state import conversation_state
 from src.utils.logger import app_logger
 
 class CallbackHandlers:
@@ -15,6 +19,11 @@ class CallbackHandlers:
         self.motivational_service = MotivationalService()
         self.emergency_service = EmergencyService()
         self.journal_service = JournalService()
+        self.mood_analytics_service = MoodAnalyticsService()
+        self.trigger_service = TriggerService()
+        self.state = conversation_state
+        # Built once at startup; raises RouteCollisionError on duplicate routes
+        self.router = CallbackRouter.from_handlers(self)
     
     async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Main callback handler - routes to specific handlers"""
@@ -28,118 +37,49 @@ class CallbackHandlers:
         app_logger.info(f"🔘 Callback '{callback_data}' from user {user_info['telegram_id']} (@{user_info.get('username', 'no_username')})")
         
         # Route to appropriate handler
-        if callback_data == "main_menu":
-            await self._main_menu(query, context)
-        elif callback_data == "check_streak":
-            await self._check_streak(query, context)
-        elif callback_data == "get_motivation":
-            await self._get_motivation(query, context)
-        elif callback_data == "emergency_mode":
-            await self._emergency_mode(query, context)
-        elif callback_data == "coping_tips":
-            await self._coping_tips_menu(query, context)
-        elif callback_data.startswith("tips_"):
-            await self._handle_coping_tips(query, context, callback_data)
-        elif callback_data == "education_menu":
-            await self._education_menu(query, context)
-        elif callback_data.startswith("edu_"):
-            await self._handle_education(query, context, callback_data)
-        elif callback_data == "settings_menu":
-            await self._settings_menu(query, context)
-        elif callback_data == "report_relapse":
-            await self._report_relapse(query, context)
-        elif callback_data == "confirm_relapse":
-            await self._confirm_relapse(query, context)
-        elif callback_data == "cancel_relapse":
-            await self._cancel_relapse(query, context)
-        elif callback_data.startswith("emergency_"):
-            await self._handle_emergency(query, context, callback_data)
-        elif callback_data == "urge_surfing":
-            await self._handle_emergency(query, context, callback_data)
-        elif callback_data == "trigger_analysis":
-            await self._handle_emergency(query, context, callback_data)
-        elif callback_data == "immediate_distraction":
-            await self._handle_emergency(query, context, callback_data)
-        elif callback_data == "mindfulness_protocol":
-            await self._handle_emergency(query, context, callback_data)
-        elif callback_data == "emergency_contacts":
-            await self._handle_emergency(query, context, callback_data)
-        elif callback_data == "accountability_check":
-            await self._handle_emergency(query, context, callback_data)
-        elif callback_data == "daily_checkin":
-            await self._daily_checkin(query, context)
-        elif callback_data == "quick_mood_checkin":
-            await mood_checkin_handlers.handle_mood_checkin_start(update, context)
-        elif callback_data == "detailed_mood_checkin":
-            await mood_checkin_handlers.handle_detailed_checkin(update, context)
-        elif callback_data.startswith("mood_score_"):
-            await mood_checkin_handlers.handle_mood_selection(update, context)
-        elif callback_data.startswith("quick_mood_"):
-            await mood_checkin_handlers.handle_quick_mood_response(update, context)
-        elif callback_data == "skip_mood_today":
-            await mood_checkin_handlers.handle_skip_mood_today(update, context)
-        elif callback_data == "finish_mood_checkin":
-            await mood_checkin_handlers.handle_finish_checkin(update, context)
-        elif callback_data == "journal_menu":
-            await self._journal_menu(query, context)
-        elif callback_data == "mood_analysis":
-            await self._mood_analysis(query, context)
-        elif callback_data == "trigger_journal":
-            await self._trigger_analysis(query, context)
-        elif callback_data.startswith("mood_"):
-            await self._handle_mood_selection(query, context, callback_data)
-        elif callback_data == "new_journal":
-            await self._new_journal(query, context)
-        elif callback_data == "read_journal":
-            await self._read_journal(query, context)
-        elif callback_data == "journal_save":
-            await self._journal_save_callback(query, context)
-        elif callback_data == "journal_cancel":
-            await self._journal_cancel_callback(query, context)
-        elif callback_data == "journal_edit":
-            await self._journal_edit_callback(query, context)
-        elif callback_data == "reminder_settings":
-            await self._reminder_settings(query, context)
-        elif callback_data == "language_settings":
-            await self._language_settings(query, context)
-        elif callback_data == "timezone_settings":
-            await self._timezone_settings(query, context)
-        elif callback_data == "view_stats":
-            await self._view_stats(query, context)
-        elif callback_data == "reset_data":
-            await self._reset_data(query, context)
-        elif callback_data.startswith("lang_"):
-            await self._handle_language_selection(query, context, callback_data)
-        elif callback_data.startswith("freq_"):
-            await self._handle_reminder_frequency(query, context, callback_data)
-        elif callback_data == "enable_reminders":
-            await self._enable_reminders(query, context)
-        elif callback_data == "disable_reminders":
-            await self._disable_reminders(query, context)
-        elif callback_data == "set_reminder_time":
-            await self._set_reminder_time(query, context)
-        elif callback_data == "reminder_frequency":
-            await self._reminder_frequency_menu(query, context)
-        else:
+        if not await self.router.dispatch(update, context, callback_data):
             await query.edit_message_text("Menu tidak dikenali. Kembali ke menu utama.", 
                                         reply_markup=BotKeyboards.main_menu())
     
+    # Mood check-in callbacks are served by MoodCheckInHandlers
+    @callback_route("quick_mood_checkin", pass_update=True)
+    async def _quick_mood_checkin(self, update, context):
+        await mood_checkin_handlers.handle_mood_checkin_start(update, context)
+    
+    @callback_route("detailed_mood_checkin", pass_update=True)
+    async def _detailed_mood_checkin(self, update, context):
+        await mood_checkin_handlers.handle_detailed_checkin(update, context)
+    
+    @callback_route("mood_score_", prefix=True, pass_data=False, pass_update=True)
+    async def _mood_score_selection(self, update, context):
+        await mood_checkin_handlers.handle_mood_selection(update, context)
+    
+    @callback_route("quick_mood_", prefix=True, pass_data=False, pass_update=True)
+    async def _quick_mood_response(self, update, context):
+        await mood_checkin_handlers.handle_quick_mood_response(update, context)
+    
+    @callback_route("skip_mood_today", pass_update=True)
+    async def _skip_mood_today(self, update, context):
+        await mood_checkin_handlers.handle_skip_mood_today(update, context)
+    
+    @callback_route("finish_mood_checkin", pass_update=True)
+    async def _finish_mood_checkin(self, update, context):
+        await mood_checkin_handlers.handle_finish_checkin(update, context)
+    
+    def get_route_stats(self) -> dict:
+        """Per-route call counts and latency for callback dispatch"""
+        return self.router.get_stats()
+    
+    @callback_route("main_menu")
     async def _main_menu(self, query, context):
         """Show main menu"""
         user_info = get_user_info(query.from_user)
-        user = self.user_service.get_or_create_user(**user_info)
-        current_streak = self.streak_service.calculate_current_streak(user.telegram_id)
+        user = await self.user_service.get_or_create_user_async(**user_info)
+        current_streak = self.streak_service.streak_days(user.clean_start_date)
         
-        message = f"""
-🌟 **PMO Recovery Coach AI**
-
-Halo {user_info['first_name']}! 
-
-📊 Current Streak: **{current_streak} hari**
-💪 Apa yang ingin kamu lakukan hari ini?
-
-Pilih menu di bawah:
-        """
+        message = message_templates.render(
+            'main_menu', first_name=user_info['first_name'], current_streak=current_streak
+        )
         
         await query.edit_message_text(
             message,
@@ -147,13 +87,14 @@ Pilih menu di bawah:
             parse_mode='Markdown'
         )
     
+    @callback_route("check_streak")
     async def _check_streak(self, query, context):
         """Handle check streak callback"""
         user_info = get_user_info(query.from_user)
-        user = self.user_service.get_or_create_user(**user_info)
+        user = await self.user_service.get_or_create_user_async(**user_info)
         
-        current_streak = self.streak_service.calculate_current_streak(user.telegram_id)
-        stats = self.streak_service.get_streak_stats(user.telegram_id)
+        stats = await self.streak_service.get_streak_stats_async(user.telegram_id)
+        current_streak = stats.get('current_streak', 0)
         milestones = self.streak_service.get_streak_milestones(current_streak)
         
         message = format_streak_message(current_streak, stats, milestones)
@@ -164,15 +105,16 @@ Pilih menu di bawah:
             parse_mode='Markdown'
         )
     
+    @callback_route("get_motivation")
     async def _get_motivation(self, query, context):
         """Handle get motivation callback"""
         user_info = get_user_info(query.from_user)
-        user = self.user_service.get_user(user_info['telegram_id'])
+        user = await self.user_service.get_user_async(user_info['telegram_id'])
         
         quote = self.motivational_service.get_daily_quote()
         
         if user:
-            current_streak = self.streak_service.calculate_current_streak(user.telegram_id)
+            current_streak = self.streak_service.streak_days(user.clean_start_date)
             encouragement = self.motivational_service.get_streak_encouragement(current_streak)
         else:
             encouragement = "🌟 Setiap journey dimulai dari langkah pertama!"
@@ -194,40 +136,10 @@ Remember: Kamu lebih kuat dari yang kamu kira! 🔥
             parse_mode='Markdown'
         )
     
+    @callback_route("emergency_mode")
     async def _emergency_mode(self, query, context):
         """Handle emergency mode callback"""
-        message = """
-🆘 **EMERGENCY MODE ACTIVATED** 🆘
-
-**⚠️ SITUASI DARURAT PMO RECOVERY**
-
-Kamu sedang mengalami urge atau craving yang kuat. TARIK NAPAS dan ikuti protokol emergency ini:
-
-**🚨 IMMEDIATE RESPONSE (0-2 menit):**
-1. **STOP** - Hentikan semua aktivitas sekarang
-2. **BREATHE** - Tarik napas dalam 4 detik, tahan 4 detik, buang 4 detik
-3. **MOVE** - Tinggalkan lokasi/posisi sekarang juga
-4. **DISTRACT** - Alihkan perhatian dengan aktivitas fisik
-
-**🔥 Ingat: Urge akan berlalu dalam 15-20 menit!**
-
-**📱 PROTOKOL EMERGENCY OPTIONS:**
-
-🌊 **Urge Surfing** - Teknik surf the urge tanpa melawan
-🎯 **Trigger Analysis** - Identify immediate triggers
-💨 **Immediate Distraction** - Quick distraction techniques  
-🧘 **Mindfulness Protocol** - Emergency mindfulness practice
-🆘 **Emergency Contacts** - Connect dengan support system
-💬 **Accountability Check** - Report dan get support
-
-**💡 QUICK REMINDERS:**
-• Kamu sudah berhasil melewati urge sebelumnya
-• Recovery is a journey, not perfection
-• Setiap detik yang kamu tahan adalah kemenangan
-• Your future self will thank you
-
-**Pilih protokol yang paling sesuai dengan situasi kamu sekarang:**
-        """
+        message = message_templates.render('emergency_mode')
         
         await query.edit_message_text(
             message,
@@ -235,6 +147,7 @@ Kamu sedang mengalami urge atau craving yang kuat. TARIK NAPAS dan ikuti protoko
             parse_mode='Markdown'
         )
     
+    @callback_route("coping_tips")
     async def _coping_tips_menu(self, query, context):
         """Handle coping tips menu"""
         message = """
@@ -257,6 +170,7 @@ Atau pilih **Random Tip** untuk mendapat strategi acak!
             parse_mode='Markdown'
         )
     
+    @callback_route("tips_", prefix=True)
     async def _handle_coping_tips(self, query, context, callback_data):
         """Handle specific coping tips"""
         category_map = {
@@ -289,23 +203,10 @@ Atau pilih **Random Tip** untuk mendapat strategi acak!
             parse_mode='Markdown'
         )
     
+    @callback_route("education_menu")
     async def _education_menu(self, query, context):
         """Handle education menu"""
-        message = """
-📚 **Recovery Education Center**
-
-Belajar tentang science di balik PMO recovery:
-
-**🧠 Dopamine & Recovery** - Bagaimana dopamine bekerja dan recovery process
-
-**✨ Benefits NoFap** - Manfaat yang dilaporkan oleh banyak orang
-
-**🔄 Neuroplasticity** - Bagaimana otak bisa berubah dan heal
-
-**📈 Recovery Timeline** - Apa yang diharapkan dalam timeline recovery
-
-Knowledge is power! Semakin kamu understand prosesnya, semakin mudah untuk tetap motivated.
-        """
+        message = message_templates.render('education_menu')
         
         await query.edit_message_text(
             message,
@@ -313,6 +214,7 @@ Knowledge is power! Semakin kamu understand prosesnya, semakin mudah untuk tetap
             parse_mode='Markdown'
         )
     
+    @callback_route("edu_", prefix=True)
     async def _handle_education(self, query, context, callback_data):
         """Handle education content"""
         topic_map = {
@@ -325,13 +227,7 @@ Knowledge is power! Semakin kamu understand prosesnya, semakin mudah untuk tetap
         topic = topic_map.get(callback_data, "general")
         content = self.motivational_service.get_educational_content(topic)
         
-        message = f"""
-{content['title']}
-
-{content['content']}
-
-Remember: Understanding the process helps you stay committed to recovery! 💪
-        """
+        message = message_templates.render('education_topic', title=content['title'], content=content['content'])
         
         await query.edit_message_text(
             message,
@@ -339,6 +235,7 @@ Remember: Understanding the process helps you stay committed to recovery! 💪
             parse_mode='Markdown'
         )
     
+    @callback_route("settings_menu")
     async def _settings_menu(self, query, context):
         """Handle settings menu"""
         message = """
@@ -358,6 +255,7 @@ Atur preferences sesuai kebutuhanmu untuk experience yang optimal.
             parse_mode='Markdown'
         )
     
+    @callback_route("report_relapse")
     async def _report_relapse(self, query, context):
         """Handle report relapse"""
         message = """
@@ -382,14 +280,15 @@ Relapse adalah bagian dari recovery journey bagi banyak orang. Yang penting adal
             parse_mode='Markdown'
         )
     
+    @callback_route("confirm_relapse")
     async def _confirm_relapse(self, query, context):
         """Handle confirm relapse"""
         user_info = get_user_info(query.from_user)
-        user = self.user_service.get_user(user_info['telegram_id'])
+        user = await self.user_service.get_user_async(user_info['telegram_id'])
         
         if user:
             # Record the relapse
-            success = self.streak_service.record_relapse(user.telegram_id)
+            success = await self.streak_service.record_relapse_async(user.telegram_id)
             
             if success:
                 support_message = self.motivational_service.get_relapse_support()
@@ -432,6 +331,7 @@ Tomorrow is a new day. You've got this! 🌅
                 reply_markup=BotKeyboards.main_menu()
             )
     
+    @callback_route("cancel_relapse")
     async def _cancel_relapse(self, query, context):
         """Handle cancel relapse"""
         message = """
@@ -454,6 +354,9 @@ Kamu sudah membuktikan mental strength dengan tidak melaporkan false relapse. Ke
             parse_mode='Markdown'
         )
     
+    @callback_route("emergency_", prefix=True)
+    @callback_route("urge_surfing", "trigger_analysis", "immediate_distraction",
+                    "mindfulness_protocol", "accountability_check", pass_data=True)
     async def _handle_emergency(self, query, context, callback_data):
         """Handle emergency protocols"""
         if callback_data == "urge_surfing":
@@ -807,6 +710,7 @@ Use emergency menu buttons for specific protocols:
             parse_mode='Markdown'
         )
     
+    @callback_route("daily_checkin")
     async def _daily_checkin(self, query, context):
         """Handle daily check-in"""
         message = """
@@ -826,6 +730,7 @@ Pilih angka di bawah:
             parse_mode='Markdown'
         )
     
+    @callback_route("journal_menu")
     async def _journal_menu(self, query, context):
         """Handle journal menu"""
         message = """
@@ -868,13 +773,14 @@ Start dengan "✍️ Tulis Entry Baru" untuk begin your journaling journey!
             parse_mode='Markdown'
         )
     
+    @callback_route("mood_", prefix=True)
     async def _handle_mood_selection(self, query, context, callback_data):
         """Handle mood selection from daily check-in"""
         # Extract mood value from callback_data (mood_1, mood_2, etc.)
         mood_value = int(callback_data.split("_")[1])
         
         user_info = get_user_info(query.from_user)
-        user = self.user_service.get_or_create_user(**user_info)
+        user = await self.user_service.get_or_create_user_async(**user_info)
         
         # Create mood descriptions
         mood_descriptions = {
@@ -949,15 +855,15 @@ Keep up the great work! You're thriving! 🚀
             parse_mode='Markdown'
         )
     
+    @callback_route("new_journal")
     async def _new_journal(self, query, context):
         """Handle new journal entry - set user state for text input"""
         
         # Set user state to expect journal input
-        context.user_data['state'] = 'input_journal'
-        context.user_data['journal_step'] = 'waiting_for_text'
+        user_info = get_user_info(query.from_user)
+        await self.state.update(user_info['telegram_id'], state='input_journal', journal_step='waiting_for_text')
         
         # Log state change
-        user_info = get_user_info(query.from_user)
         app_logger.info(f"📝 User {user_info['telegram_id']} entered journal input mode (state: input_journal)")
         
         message = """
@@ -999,14 +905,25 @@ Bot sekarang siap menerima entry journal dari kamu. Ketik pesan berikutnya sebag
             parse_mode='Markdown'
         )
     
+    @callback_route("read_journal")
     async def _read_journal(self, query, context):
         """Handle read journal entries"""
         user_info = get_user_info(query.from_user)
-        user = self.user_service.get_or_create_user(**user_info)
-        
-        # Get recent entries from database
-        entries = self.journal_service.get_user_entries(user.telegram_id, limit=5)
-        stats = self.journal_service.get_entry_stats(user.telegram_id)
+        user = await self.user_service.get_or_create_user_async(**user_info)
+        await self._show_journal_page(query, user.telegram_id)
+    
+    @callback_route("jpage_", prefix=True)
+    async def _read_journal_page(self, query, context, callback_data):
+        """Older/newer journal page; callback_data is jpage_<o|n>_<cursor>"""
+        _, direction, cursor = callback_data.split("_", 2)
+        await self._show_journal_page(query, query.from_user.id, cursor, newer=direction == "n")
+    
+    async def _show_journal_page(self, query, telegram_id: int, cursor: str = None, newer: bool = False):
+        """Render one page of journal history with older/newer buttons"""
+        page = await self.journal_service.get_entries_page_async(telegram_id, cursor, newer=newer)
+        entries = page['entries']
+        stats = await self.journal_service.get_entry_stats_async(telegram_id)
+        reply_markup = BotKeyboards.back_to_main()
         
         if not entries:
             message = """
@@ -1030,12 +947,14 @@ Kamu belum menulis journal entry apapun. Mari mulai journaling journey!
 Start writing your first entry today! ✍️
             """
         else:
-            # Format recent entries
+            # Format this page of entries
             entries_text = ""
-            for i, entry in enumerate(entries, 1):
+            for entry in entries:
                 date_str = entry.created_at.strftime("%d/%m/%Y %H:%M")
                 preview = entry.entry_text[:100] + "..." if len(entry.entry_text) > 100 else entry.entry_text
-                entries_text += f"\n**{i}. {date_str}**\n{preview}\n"
+                entries_text += f"\n**{date_str}**\n{preview}\n"
+            section_title = "Recent Entries" if page['newer_cursor'] is None else "Older Entries"
+            reply_markup = BotKeyboards.journal_history_pagination(page['older_cursor'], page['newer_cursor'])
             
             message = f"""
 📖 **Your Journal Entries**
@@ -1047,7 +966,7 @@ Start writing your first entry today! ✍️
 • **First entry:** {stats.get('first_entry').strftime('%d/%m/%Y') if stats.get('first_entry') else 'N/A'}
 • **Last entry:** {stats.get('last_entry').strftime('%d/%m/%Y') if stats.get('last_entry') else 'N/A'}
 
-**� Recent Entries (Last 5):**
+**📝 {section_title}:**
 {entries_text}
 
 **🎯 Amazing Progress!** You've been consistently documenting your recovery journey.
@@ -1062,47 +981,41 @@ Great work maintaining your journaling habit! 💪✨
         
         await query.edit_message_text(
             message,
-            reply_markup=BotKeyboards.back_to_main(),
+            reply_markup=reply_markup,
+            parse_mode='Markdown'
+        )
+    
+    @callback_route("jsearch_", prefix=True)
+    async def _journal_search_page(self, query, context, callback_data):
+        """Show another page of /searchjournal results"""
+        search_text = (await self.state.get(query.from_user.id)).get('journal_search')
+        if not search_text:
+            await query.edit_message_text(
+                "🔍 Pencarian sudah kedaluwarsa. Jalankan /searchjournal lagi.",
+                reply_markup=BotKeyboards.journal_menu()
+            )
+            return
+        
+        page = max(0, int(callback_data.split("_", 1)[1]))
+        search = await self.journal_service.search_entries_async(query.from_user.id, search_text, page=page)
+        
+        await query.edit_message_text(
+            format_journal_search_results(search_text, search),
+            reply_markup=BotKeyboards.journal_search_pagination(search['page'], search['has_more']),
             parse_mode='Markdown'
         )
     
+    @callback_route("mood_analysis")
     async def _mood_analysis(self, query, context):
         """Handle mood analysis"""
-        message = """
-🎯 **Analisis Mood**
-
-**Advanced Feature Coming Soon!** 📊
-
-Fitur analisis mood akan memberikan insights mendalam tentang emotional patterns Anda:
-
-**📈 Mood Analytics akan include:**
-• **Mood Trends** - Grafik mood dari waktu ke waktu
-• **Pattern Recognition** - Identify recurring mood patterns
-• **Trigger Correlation** - Connection antara events dan mood changes
-• **Weekly/Monthly Reports** - Comprehensive mood summaries
-• **Improvement Suggestions** - Personalized tips based pada patterns
-• **Mood Forecasting** - Predict challenging periods
-
-**🎨 Visualization Features:**
-• Color-coded mood calendar
-• Trend lines dan charts
-• Mood distribution graphs
-• Correlation matrices
-
-**🔍 Current Alternatives:**
-• Use daily check-in untuk track mood harian
-• Note mood dalam journal entries
-• Observe personal patterns manually
-• Use emergency mode saat mood rendah
-
-**💡 Self-Analysis Tips:**
-• Track mood consistently every day
-• Note external factors yang influence mood
-• Identify time patterns (morning vs evening mood)
-• Connect mood dengan sleep, exercise, activities
-
-Continue dengan daily check-ins untuk build data yang berguna untuk future analysis!
-        """
+        user_info = get_user_info(query.from_user)
+        user = await self.user_service.get_or_create_user_async(**user_info)
+        analytics = await self.mood_analytics_service.get_user_analytics_async(user.telegram_id, user.timezone)
+        
+        if analytics['entries']:
+            message = message_templates.render('mood_analysis', **self._mood_analysis_fields(analytics))
+        else:
+            message = message_templates.render('mood_analysis_empty')
         
         await query.edit_message_text(
             message,
@@ -1110,49 +1023,86 @@ Continue dengan daily check-ins untuk build data yang berguna untuk future analy
             parse_mode='Markdown'
         )
     
+    @staticmethod
+    def _mood_analysis_fields(analytics: dict) -> dict:
+        """Format MoodAnalyticsService results into mood_analysis template fields"""
+        def score(value):
+            return f"{value:.1f}/10" if value is not None else "-"
+        
+        averages = analytics['averages']
+        average_lines = [
+            f"• Mood: {score(averages['mood_score'])}",
+            f"• Energy: {score(averages['energy_level'])}",
+            f"• Stress: {score(averages['stress_level'])}",
+            f"• Sleep: {score(averages['sleep_quality'])}",
+            f"• Urge: {score(averages['urge_intensity'])}",
+        ]
+        
+        rolling = analytics['rolling']
+        rolling_lines = [
+            f"• 7 hari terakhir: {score(rolling['last_7d'])}",
+            f"• 7 hari sebelumnya: {score(rolling['prev_7d'])}",
+            f"• 30 hari terakhir: {score(rolling['last_30d'])}",
+        ]
+        if rolling['moving_7'] is not None:
+            rolling_lines.append(f"• 7 check-in terakhir: {score(rolling['moving_7'])}")
+        
+        pattern_lines = []
+        weekday_mood = analytics['weekday_mood']
+        if len(weekday_mood) > 1:
+            best = max(weekday_mood, key=weekday_mood.get)
+            worst = min(weekday_mood, key=weekday_mood.get)
+            pattern_lines.append(f"• Hari terbaik: {WEEKDAY_NAMES[best]} ({score(weekday_mood[best])})")
+            pattern_lines.append(f"• Hari terberat: {WEEKDAY_NAMES[worst]} ({score(weekday_mood[worst])})")
+        hour_mood = analytics['hour_mood']
+        if len(hour_mood) > 1:
+            best = max(hour_mood, key=hour_mood.get)
+            worst = min(hour_mood, key=hour_mood.get)
+            pattern_lines.append(f"• Jam terbaik: {best:02d}:00 ({score(hour_mood[best])})")
+            pattern_lines.append(f"• Jam terberat: {worst:02d}:00 ({score(hour_mood[worst])})")
+        
+        correlation_labels = {
+            'sleep_urge': "Sleep ↔ Urge",
+            'stress_urge': "Stress ↔ Urge",
+            'sleep_mood': "Sleep ↔ Mood",
+            'stress_mood': "Stress ↔ Mood",
+        }
+        correlation_lines = [
+            f"• {label}: {analytics['correlations'][key]:+.2f}"
+            for key, label in correlation_labels.items()
+            if analytics['correlations'][key] is not None
+        ]
+        
+        trend_labels = {'mood_score': "Mood", 'stress_level': "Stress", 'urge_intensity': "Urge"}
+        trend_lines = [
+            f"• {label}: {analytics['trends'][key]:+.2f} poin"
+            for key, label in trend_labels.items()
+            if analytics['trends'][key] is not None
+        ]
+        
+        not_enough = "• Belum cukup data"
+        return {
+            'entries': analytics['entries'],
+            'first_entry': analytics['first_entry'].strftime('%d %b %Y'),
+            'average_lines': "\n".join(average_lines),
+            'rolling_lines': "\n".join(rolling_lines),
+            'pattern_lines': "\n".join(pattern_lines) or not_enough,
+            'correlation_lines': "\n".join(correlation_lines) or not_enough,
+            'trend_lines': "\n".join(trend_lines) or not_enough,
+        }
+    
+    @callback_route("trigger_journal")
     async def _trigger_analysis(self, query, context):
         """Handle trigger analysis"""
-        message = """
-🔍 **Analisis Trigger**
-
-**Smart Trigger Detection Coming Soon!** 🎯
-
-Fitur ini akan help identify dan analyze triggers dalam recovery journey:
-
-**🧠 Trigger Analysis akan include:**
-• **Automatic Trigger Detection** - AI-powered identification dari journal entries
-• **Trigger Categories** - Emotional, situational, social, environmental triggers
-• **Risk Assessment** - Severity rating untuk different triggers
-• **Coping Strategy Matching** - Personalized tips untuk each trigger type
-• **Prevention Planning** - Proactive strategies untuk anticipated triggers
-• **Success Tracking** - Monitor progress dalam managing triggers
-
-**📊 Analysis Features:**
-• Trigger frequency charts
-• Time-based trigger patterns
-• Emotion-trigger correlations
-• Success rate dalam handling triggers
-
-**🛠️ Current Tools Available:**
-• **Emergency Mode** - Immediate support saat trigger muncul
-• **Coping Tips** - Strategies untuk manage urges
-• **Daily Check-in** - Monitor emotional state
-• **Journal Writing** - Document trigger experiences
-
-**💪 Manual Trigger Awareness:**
-• Note situasi yang challenging dalam journal
-• Use emergency mode immediately saat urge muncul
-• Practice coping strategies regularly
-• Identify patterns dalam timing dan circumstances
-
-**🎯 Build Trigger Awareness Now:**
-1. Document trigger situations dalam journal
-2. Use emergency mode untuk immediate help
-3. Practice mindfulness untuk early detection
-4. Build strong coping strategy toolkit
-
-Emergency mode tersedia 24/7 untuk immediate trigger support!
-        """
+        user_info = get_user_info(query.from_user)
+        user = await self.user_service.get_or_create_user_async(**user_info)
+        report = await self.trigger_service.get_trigger_report_async(user.telegram_id, user.timezone)
+        
+        if report['records']:
+            global_report = await self.trigger_service.get_trigger_report_async(tz_name=user.timezone)
+            message = message_templates.render('trigger_analysis', **self._trigger_analysis_fields(report, global_report))
+        else:
+            message = message_templates.render('trigger_analysis_empty')
         
         await query.edit_message_text(
             message,
@@ -1160,13 +1110,35 @@ Emergency mode tersedia 24/7 untuk immediate trigger support!
             parse_mode='Markdown'
         )
     
+    @staticmethod
+    def _trigger_analysis_fields(report: dict, global_report: dict) -> dict:
+        """Format TriggerService reports into trigger_analysis template fields"""
+        def trigger_line(trigger):
+            line = f"• {escape_markdown(trigger['tag'])}: {trigger['count']}x"
+            if trigger['lift'] is not None:
+                line += f" (lift {trigger['lift']:.1f})"
+            return line
+        
+        hours = report['hours']
+        busiest = sorted((hour for hour in range(24) if hours[hour]), key=lambda hour: (-hours[hour], hour))[:3]
+        return {
+            'records': report['records'],
+            'relapse_records': report['relapse_records'],
+            'trigger_lines': "\n".join(trigger_line(trigger) for trigger in report['triggers']),
+            'hour_lines': "\n".join(f"• {hour:02d}:00-{hour:02d}:59 ({hours[hour]}x)" for hour in busiest),
+            'global_lines': "\n".join(
+                f"• {escape_markdown(trigger['tag'])}: {trigger['count']}x" for trigger in global_report['triggers'][:3]
+            ),
+        }
+    
+    @callback_route("journal_save")
     async def _journal_save_callback(self, query, context):
         """Handle journal save button callback"""
         user_info = get_user_info(query.from_user)
-        user = self.user_service.get_or_create_user(**user_info)
+        user = await self.user_service.get_or_create_user_async(**user_info)
         
-        # Get journal text from context
-        journal_text = context.user_data.get('journal_text')
+        # Get journal draft from the conversation state store
+        journal_text = (await self.state.get(user.telegram_id)).get('journal_text')
         
         if not journal_text:
             app_logger.error(f"❌ No journal text found for user {user.telegram_id}")
@@ -1175,12 +1147,12 @@ Emergency mode tersedia 24/7 untuk immediate trigger support!
                 "Please start again with journal menu.",
                 reply_markup=BotKeyboards.journal_menu()
             )
-            context.user_data.clear()
+            await self.state.clear(user.telegram_id)
             return
         
         try:
             # Save to database using JournalService
-            success = self.journal_service.create_journal_entry(
+            success = await self.journal_service.create_journal_entry_async(
                 telegram_id=user.telegram_id,
                 entry_text=journal_text
             )
@@ -1201,10 +1173,10 @@ Emergency mode tersedia 24/7 untuk immediate trigger support!
             char_count = len(journal_text)
             
             # Get user's total entries count
-            total_entries = self.journal_service.get_entry_count(user.telegram_id)
+            total_entries = await self.journal_service.get_entry_count_async(user.telegram_id)
             
             # Clear the state
-            context.user_data.clear()
+            await self.state.clear(user.telegram_id)
             
             # Log successful save
             app_logger.info(f"✅ Journal entry saved for user {user.telegram_id}: entry #{total_entries}")
@@ -1245,15 +1217,16 @@ Emergency mode tersedia 24/7 untuk immediate trigger support!
                 "Maaf, terjadi error teknis.",
                 reply_markup=BotKeyboards.journal_menu()
             )
-            context.user_data.clear()
+            await self.state.clear(user.telegram_id)
     
+    @callback_route("journal_cancel")
     async def _journal_cancel_callback(self, query, context):
         """Handle journal cancel button callback"""
         user_info = get_user_info(query.from_user)
         app_logger.info(f"🚫 Journal entry canceled by user {user_info['telegram_id']}")
         
         # Clear state
-        context.user_data.clear()
+        await self.state.clear(user_info['telegram_id'])
         
         await query.edit_message_text(
             "🚫 **Journal Entry Dibatalkan**\n\n"
@@ -1262,15 +1235,15 @@ Emergency mode tersedia 24/7 untuk immediate trigger support!
             parse_mode='Markdown'
         )
     
+    @callback_route("journal_edit")
     async def _journal_edit_callback(self, query, context):
         """Handle journal edit button callback"""
         user_info = get_user_info(query.from_user)
         app_logger.info(f"✏️ Journal entry edit requested by user {user_info['telegram_id']}")
         
         # Reset to input mode
-        context.user_data['state'] = 'input_journal'
-        context.user_data['journal_step'] = 'waiting_for_text'
-        context.user_data.pop('journal_text', None)  # Remove stored text
+        await self.state.pop(user_info['telegram_id'], 'journal_text')  # Remove stored text
+        await self.state.update(user_info['telegram_id'], state='input_journal', journal_step='waiting_for_text')
         
         await query.edit_message_text(
             "✏️ **Edit Journal Entry**\n\n"
@@ -1281,6 +1254,7 @@ Emergency mode tersedia 24/7 untuk immediate trigger support!
     
     # ========== SETTINGS HANDLERS ==========
     
+    @callback_route("reminder_settings")
     async def _reminder_settings(self, query, context):
         """Handle reminder settings menu"""
         user_info = get_user_info(query.from_user)
@@ -1315,6 +1289,7 @@ Pilih opsi yang ingin kamu atur:
             parse_mode='Markdown'
         )
     
+    @callback_route("language_settings")
     async def _language_settings(self, query, context):
         """Handle language settings menu"""
         user_info = get_user_info(query.from_user)
@@ -1350,6 +1325,7 @@ Select your language / Pilih bahasa kamu:
             parse_mode='Markdown'
         )
     
+    @callback_route("timezone_settings")
     async def _timezone_settings(self, query, context):
         """Handle timezone settings"""
         message = """
@@ -1377,6 +1353,7 @@ Jika kamu berada di timezone yang berbeda, silakan hubungi admin untuk penyesuai
             parse_mode='Markdown'
         )
     
+    @callback_route("view_stats")
     async def _view_stats(self, query, context):
         """Handle view stats"""
         user_info = get_user_info(query.from_user)
@@ -1414,6 +1391,7 @@ Kamu baru memulai journey recovery. Tetap semangat dan konsisten!
             parse_mode='Markdown'
         )
     
+    @callback_route("reset_data")
     async def _reset_data(self, query, context):
         """Handle reset data with confirmation"""
         message = """
@@ -1451,6 +1429,7 @@ Jika kamu mengalami relapse, gunakan fitur "Lapor Relapse" daripada reset data.
             parse_mode='Markdown'
         )
     
+    @callback_route("lang_", prefix=True)
     async def _handle_language_selection(self, query, context, callback_data):
         """Handle language selection"""
         user_info = get_user_info(query.from_user)
@@ -1498,6 +1477,7 @@ Terima kasih telah menggunakan PMO Recovery Coach! 💪
             parse_mode='Markdown'
         )
     
+    @callback_route("enable_reminders")
     async def _enable_reminders(self, query, context):
         """Enable daily reminders"""
         user_info = get_user_info(query.from_user)
@@ -1533,6 +1513,7 @@ Ready to stay on track! 🚀
             parse_mode='Markdown'
         )
     
+    @callback_route("disable_reminders")
     async def _disable_reminders(self, query, context):
         """Disable daily reminders"""
         user_info = get_user_info(query.from_user)
@@ -1570,6 +1551,7 @@ You can turn reminders back on whenever you want from this menu.
             parse_mode='Markdown'
         )
     
+    @callback_route("set_reminder_time")
     async def _set_reminder_time(self, query, context):
         """Set custom reminder time"""
         message = """
@@ -1601,6 +1583,7 @@ Default times are optimized for Indonesian timezone and healthy daily rhythm.
             parse_mode='Markdown'
         )
     
+    @callback_route("reminder_frequency")
     async def _reminder_frequency_menu(self, query, context):
         """Show reminder frequency options"""
         current_freq = context.user_data.get('reminder_frequency', 'daily')
@@ -1642,6 +1625,7 @@ New users benefit most from daily reminders to build the recovery habit.
             parse_mode='Markdown'
         )
     
+    @callback_route("freq_", prefix=True)
     async def _handle_reminder_frequency(self, query, context, callback_data):
         """Handle reminder frequency selection"""
         user_info = get_user_info(query.from_user)
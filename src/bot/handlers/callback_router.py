@@ -0,0 +1,163 @@
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+class RouteCollisionError(ValueError):
+    """Raised when two callback routes claim the same callback_data"""
+
+class _Route:
+    """A registered callback route with its latency counters"""
+
+    def __init__(self, pattern: str, handler: Callable, prefix: bool, pass_data: bool, pass_update: bool):
+        self.pattern = pattern
+        self.handler = handler
+        self.prefix = prefix
+        self.pass_data = pass_data
+        self.pass_update = pass_update
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.pattern}*" if self.prefix else self.pattern
+
+    def stats(self) -> Dict:
+        avg_ms = (self.total_time / self.calls * 1000) if self.calls else 0.0
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'avg_ms': round(avg_ms, 2),
+            'max_ms': round(self.max_time * 1000, 2),
+            'handler': getattr(self.handler, '__name__', repr(self.handler))
+        }
+
+class _PrefixTrie:
+    """Character trie returning the longest registered prefix of a string"""
+
+    def __init__(self):
+        self._root: Dict = {}
+
+    def insert(self, prefix: str, route: _Route) -> Optional[_Route]:
+        """Insert route; returns the route already stored under prefix, if any"""
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        existing = node.get(None)
+        if existing is None:
+            node[None] = route
+        return existing
+
+    def longest_match(self, text: str) -> Optional[_Route]:
+        node = self._root
+        match = node.get(None)
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            match = node.get(None, match)
+        return match
+
+    def routes(self) -> List[_Route]:
+        """All routes in sorted prefix order"""
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if None in node:
+                found.append(node[None])
+            stack.extend(node[char] for char in sorted((c for c in node if c is not None), reverse=True))
+        return found
+
+def callback_route(*patterns: str, prefix: bool = False, pass_data: bool = None, pass_update: bool = False):
+    """
+    Register a handler method for one or more callback_data values
+
+    Args:
+        patterns: Exact callback_data values, or prefixes when prefix=True
+        prefix: Match any callback_data starting with the pattern (longest prefix wins)
+        pass_data: Pass callback_data as third argument (default: True for prefix routes)
+        pass_update: Call handler(update, context) instead of handler(query, context)
+    """
+    if pass_data is None:
+        pass_data = prefix
+
+    def decorator(func):
+        routes = func.__dict__.setdefault('_callback_routes', [])
+        for pattern in patterns:
+            routes.append((pattern, prefix, pass_data, pass_update))
+        return func
+    return decorator
+
+class CallbackRouter:
+    """Dispatch table for callback_data: exact matches in a dict, prefixes in a trie"""
+
+    def __init__(self):
+        self._exact: Dict[str, _Route] = {}
+        self._prefixes = _PrefixTrie()
+        self.unmatched = 0
+
+    @classmethod
+    def from_handlers(cls, owner) -> 'CallbackRouter':
+        """Build a router from every @callback_route method on owner's class"""
+        router = cls()
+        for attr_name in sorted(dir(type(owner))):
+            func = getattr(type(owner), attr_name, None)
+            for pattern, prefix, pass_data, pass_update in getattr(func, '_callback_routes', ()):
+                router.add(pattern, getattr(owner, attr_name), prefix=prefix,
+                           pass_data=pass_data, pass_update=pass_update)
+        return router
+
+    def add(self, pattern: str, handler: Callable, prefix: bool = False,
+            pass_data: bool = False, pass_update: bool = False):
+        """Register a route, raising RouteCollisionError if the pattern is taken"""
+        if not pattern:
+            raise ValueError("Callback route pattern must not be empty")
+
+        route = _Route(pattern, handler, prefix, pass_data, pass_update)
+        existing = self._prefixes.insert(pattern, route) if prefix else self._exact.setdefault(pattern, route)
+        if existing is not None and existing is not route:
+            raise RouteCollisionError(
+                f"Callback route '{route.name}' registered by {route.stats()['handler']} "
+                f"collides with {existing.stats()['handler']}"
+            )
+
+    def resolve(self, callback_data: str) -> Optional[_Route]:
+        """Find the route for callback_data: exact match first, then longest prefix"""
+        route = self._exact.get(callback_data)
+        if route is None:
+            route = self._prefixes.longest_match(callback_data)
+        return route
+
+    async def dispatch(self, update, context, callback_data: str) -> bool:
+        """Run the matching handler; returns False when no route matches"""
+        route = self.resolve(callback_data)
+        if route is None:
+            self.unmatched += 1
+            return False
+
+        args: Tuple = (update if route.pass_update else update.callback_query, context)
+        if route.pass_data:
+            args += (callback_data,)
+
+        started_at = time.perf_counter()
+        try:
+            await route.handler(*args)
+        except Exception:
+            route.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            route.calls += 1
+            route.total_time += elapsed
+            route.max_time = max(route.max_time, elapsed)
+        return True
+
+    def routes(self) -> List[str]:
+        """Registered route names (prefix routes end with '*')"""
+        return sorted(self._exact) + [route.name for route in self._prefixes.routes()]
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-route call counts and latency (ms)"""
+        all_routes = list(self._exact.values()) + self._prefixes.routes()
+        return {route.name: route.stats() for route in all_routes if route.calls}
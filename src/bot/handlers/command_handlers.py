@@ -1,8 +1,10 @@
 from telegram import Update
 from telegram.ext import ContextTypes
-from src.services import UserService, StreakService, MotivationalService
+from src.services import UserService, StreakService, MotivationalService, JournalService
 from src.bot.keyboards import BotKeyboards
-from src.utils.helpers import format_streak_message, get_user_info
+from src.bot.templates import message_templates
+from src.utils.helpers import format_journal_search_results, format_streak_message, get_user_info
+from src.utils.conversation_state import conversation_state
 from src.utils.logger import app_logger
 
 class CommandHandlers:
@@ -12,11 +14,12 @@ class CommandHandlers:
         self.user_service = UserService()
         self.streak_service = StreakService()
         self.motivational_service = MotivationalService()
+        self.journal_service = JournalService()
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler untuk /start command"""
         user_info = get_user_info(update.effective_user)
-        user = self.user_service.get_or_create_user(**user_info)
+        user = await self.user_service.get_or_create_user_async(**user_info)
         
         # Log user interaction
         app_logger.info(f"👤 /start command from user {user.telegram_id} (@{user.username or 'no_username'})")
@@ -59,6 +62,7 @@ Silakan pilih menu di bawah untuk memulai:
 /checkin - Daily check-in
 /relapse - Lapor relapse
 /stats - Lihat statistik recovery
+/searchjournal - Cari journal entries (contoh: /searchjournal urge malam)
 
 **Tips Penggunaan:**
 • Gunakan menu inline untuk navigasi yang mudah
@@ -84,10 +88,10 @@ Butuh bantuan lebih lanjut? Gunakan menu bantuan di bot!
     async def streak_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler untuk /streak command"""
         user_info = get_user_info(update.effective_user)
-        user = self.user_service.get_or_create_user(**user_info)
+        user = await self.user_service.get_or_create_user_async(**user_info)
         
-        current_streak = self.streak_service.calculate_current_streak(user.telegram_id)
-        stats = self.streak_service.get_streak_stats(user.telegram_id)
+        stats = await self.streak_service.get_streak_stats_async(user.telegram_id)
+        current_streak = stats.get('current_streak', 0)
         milestones = self.streak_service.get_streak_milestones(current_streak)
         
         message = format_streak_message(current_streak, stats, milestones)
@@ -102,10 +106,10 @@ Butuh bantuan lebih lanjut? Gunakan menu bantuan di bot!
         """Handler untuk /motivation command"""
         quote = self.motivational_service.get_daily_quote()
         user_info = get_user_info(update.effective_user)
-        user = self.user_service.get_user(user_info['telegram_id'])
+        user = await self.user_service.get_user_async(user_info['telegram_id'])
         
         if user:
-            current_streak = self.streak_service.calculate_current_streak(user.telegram_id)
+            current_streak = self.streak_service.streak_days(user.clean_start_date)
             encouragement = self.motivational_service.get_streak_encouragement(current_streak)
         else:
             encouragement = "🌟 Setiap journey dimulai dari langkah pertama!"
@@ -129,25 +133,7 @@ Butuh bantuan lebih lanjut? Gunakan menu bantuan di bot!
     
     async def emergency_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler untuk /emergency command"""
-        emergency_message = """
-🚨 **EMERGENCY MODE ACTIVATED** 🚨
-
-Saya mengerti kamu sedang dalam situasi sulit. Tarik napas dalam-dalam. Kamu BISA melewati ini!
-
-**Immediate Actions:**
-1. 🛑 STOP scrolling/browsing sekarang juga
-2. 💨 Tinggalkan area/posisi sekarang
-3. 🧘 Tarik napas dalam 4 detik, tahan 4 detik, hembuskan 6 detik
-4. 💧 Minum air dingin atau basuh wajah
-5. 📱 Hubungi teman/keluarga atau ke area publik
-
-**Remember:**
-• Urge ini akan berlalu dalam 10-20 menit
-• Kamu sudah bertahan sejauh ini - jangan sia-siakan!
-• Setiap kali kamu menolak, kamu semakin kuat
-
-Pilih protokol emergency di bawah:
-        """
+        emergency_message = message_templates.render('emergency_command')
         
         await update.message.reply_text(
             emergency_message,
@@ -157,21 +143,7 @@ Pilih protokol emergency di bawah:
     
     async def relapse_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler untuk /relapse command - with confirmation"""
-        message = """
-💙 **Relapse Report**
-
-Saya memahami betapa sulitnya moment ini untuk kamu. Yang penting adalah kamu datang ke sini untuk honest dan mau bangkit lagi.
-
-Apakah kamu yakin ingin melaporkan relapse? Ini akan mereset streak kamu, tapi remember - ini bukan akhir dari segalanya.
-
-**Setelah melaporkan relapse:**
-• Streak akan di-reset ke 0
-• Data akan tersimpan untuk learning
-• Kamu akan mendapat support message
-• Journey recovery dimulai lagi dari hari ini
-
-Relapse adalah bagian dari proses recovery bagi banyak orang. Yang penting adalah bangkit dan belajar dari pengalaman ini.
-        """
+        message = message_templates.render('relapse_report')
         
         await update.message.reply_text(
             message,
@@ -182,7 +154,7 @@ Relapse adalah bagian dari proses recovery bagi banyak orang. Yang penting adala
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handler untuk /stats command"""
         user_info = get_user_info(update.effective_user)
-        user = self.user_service.get_user(user_info['telegram_id'])
+        user = await self.user_service.get_user_async(user_info['telegram_id'])
         
         if not user:
             await update.message.reply_text(
@@ -191,7 +163,7 @@ Relapse adalah bagian dari proses recovery bagi banyak orang. Yang penting adala
             )
             return
         
-        stats = self.streak_service.get_streak_stats(user.telegram_id)
+        stats = await self.streak_service.get_streak_stats_async(user.telegram_id)
         
         message = f"""
 📊 **Recovery Statistics**
@@ -218,6 +190,26 @@ Keep going strong! Every day counts! 💪
             parse_mode='Markdown'
         )
     
+    async def search_journal_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handler untuk /searchjournal command"""
+        search_text = " ".join(context.args or []).strip()
+        if not search_text:
+            await update.message.reply_text(
+                "🔍 **Cari Journal**\n\nKetik kata kunci setelah command, contoh:\n`/searchjournal urge malam`\n\nTambahkan `*` untuk mencari awalan kata, misalnya `medit*`.",
+                parse_mode='Markdown'
+            )
+            return
+        
+        # Pagination buttons read the query back from the state store (callback_data is limited to 64 bytes)
+        await conversation_state.update(update.effective_user.id, journal_search=search_text)
+        search = await self.journal_service.search_entries_async(update.effective_user.id, search_text)
+        
+        await update.message.reply_text(
+            format_journal_search_results(search_text, search),
+            reply_markup=BotKeyboards.journal_search_pagination(search['page'], search['has_more']),
+            parse_mode='Markdown'
+        )
+    
     def _get_progress_analysis(self, stats: dict) -> str:
         """Generate progress analysis based on stats"""
         current = stats['current_streak']
@@ -1,6 +1,7 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 from src.services import UserService, JournalService
+from src.utils.conversation_state import conversation_state
 from src.utils.helpers import get_user_info
 from src.utils.logger import app_logger
 from datetime import datetime
@@ -11,16 +12,18 @@ class MessageHandlers:
     def __init__(self):
         self.user_service = UserService()
         self.journal_service = JournalService()
+        self.state = conversation_state
     
     async def handle_text(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages based on user state"""
         
         user_info = get_user_info(update.effective_user)
-        user = self.user_service.get_or_create_user(**user_info)
+        user = await self.user_service.get_or_create_user_async(**user_info)
         
         # Check if user is in journal writing mode
-        user_state = context.user_data.get('state')
-        journal_step = context.user_data.get('journal_step')
+        state = await self.state.get(user.telegram_id)
+        user_state = state.get('state')
+        journal_step = state.get('journal_step')
         
         # Log user text message dengan state info
         message_preview = update.message.text[:50] + "..." if len(update.message.text) > 50 else update.message.text
@@ -59,9 +62,8 @@ class MessageHandlers:
             )
             return
         
-        # Store journal text in context for confirmation
-        context.user_data['journal_text'] = journal_text
-        context.user_data['journal_step'] = 'waiting_for_confirmation'
+        # Store journal draft for confirmation (survives restarts with the SQLite store)
+        await self.state.update(user.telegram_id, journal_text=journal_text, journal_step='waiting_for_confirmation')
         
         # Calculate stats
         word_count = len(journal_text.split())
@@ -5,12 +5,12 @@ Handles daily mood tracking and check-in functionality
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 
 from ...services.user_service import UserService
-from ...database.models import MoodEntry
 from ...bot.keyboards.inline_keyboards import BotKeyboards
+from ...utils.conversation_state import conversation_state
 from ...utils.logger import app_logger
 
 logger = app_logger
@@ -20,13 +20,14 @@ class MoodCheckInHandlers:
     
     def __init__(self):
         self.user_service = UserService()
+        self.state = conversation_state
     
     async def handle_mood_checkin_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start mood check-in process"""
         user_id = update.effective_user.id
         
         # Check if already checked in today
-        if self.user_service.has_checked_in_today(user_id):
+        if await self.user_service.has_checked_in_today_async(user_id):
             await update.callback_query.edit_message_text(
                 "✅ **Kamu sudah check-in hari ini!**\n\n"
                 "Terima kasih sudah konsisten tracking mood. "
@@ -64,9 +65,8 @@ class MoodCheckInHandlers:
         # Extract mood score from callback data
         mood_score = int(query.data.split('_')[1])
         
-        # Store mood score in context for later use
-        context.user_data['current_mood_score'] = mood_score
-        context.user_data['mood_checkin_started'] = datetime.now()
+        # Store mood score in the conversation state store for later steps
+        await self.state.update(user_id, current_mood_score=mood_score, mood_checkin_started=datetime.now())
         
         # Get mood emoji and description
         mood_info = self._get_mood_info(mood_score)
@@ -93,7 +93,7 @@ class MoodCheckInHandlers:
         mood_score = int(query.data.split('_')[2])
         
         # Record mood check-in
-        success = self.user_service.record_mood_checkin(user_id, mood_score)
+        success = await self.user_service.record_mood_checkin_async(user_id, mood_score)
         
         if success:
             mood_info = self._get_mood_info(mood_score)
@@ -160,21 +160,22 @@ class MoodCheckInHandlers:
     async def handle_finish_checkin(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Finish mood check-in process"""
         user_id = update.effective_user.id
-        mood_score = context.user_data.get('current_mood_score')
+        state = await self.state.get(user_id)
+        mood_score = state.get('current_mood_score')
         
         if not mood_score:
             await update.callback_query.answer("❌ Error: Mood score tidak ditemukan")
             return
         
         # Get additional data if available
-        energy_level = context.user_data.get('energy_level')
-        stress_level = context.user_data.get('stress_level')
-        sleep_quality = context.user_data.get('sleep_quality')
-        urge_intensity = context.user_data.get('urge_intensity')
-        notes = context.user_data.get('mood_notes', '')
+        energy_level = state.get('energy_level')
+        stress_level = state.get('stress_level')
+        sleep_quality = state.get('sleep_quality')
+        urge_intensity = state.get('urge_intensity')
+        notes = state.get('mood_notes', '')
         
         # Record comprehensive mood check-in
-        success = self._record_detailed_mood_checkin(
+        success = await self._record_detailed_mood_checkin(
             user_id, mood_score, energy_level, stress_level, 
             sleep_quality, urge_intensity, notes
         )
@@ -220,8 +221,8 @@ class MoodCheckInHandlers:
                 InlineKeyboardButton("🔄 Coba Lagi", callback_data="daily_checkin")
             ]]
         
-        # Clear context data
-        context.user_data.clear()
+        # Clear check-in state
+        await self.state.clear(user_id)
         
         await update.callback_query.edit_message_text(
             message,
@@ -296,50 +297,20 @@ class MoodCheckInHandlers:
         
         return mood_data.get(mood_score, mood_data[5])  # Default to neutral if invalid score
     
-    def _record_detailed_mood_checkin(self, user_id: int, mood_score: int, 
+    async def _record_detailed_mood_checkin(self, user_id: int, mood_score: int, 
                                     energy_level: int = None, stress_level: int = None,
                                     sleep_quality: int = None, urge_intensity: int = None,
                                     notes: str = None) -> bool:
         """Record detailed mood check-in to database"""
         try:
-            from ...database.database import db
-            
-            session = db.get_session()
-            try:
-                # Check if already checked in today
-                today = datetime.now().date()
-                existing_entry = session.query(MoodEntry).filter(
-                    MoodEntry.user_id == user_id,
-                    MoodEntry.created_at >= datetime.combine(today, datetime.min.time()),
-                    MoodEntry.created_at < datetime.combine(today + timedelta(days=1), datetime.min.time())
-                ).first()
-                
-                if existing_entry:
-                    # Update existing entry
-                    existing_entry.mood_score = mood_score
-                    existing_entry.energy_level = energy_level
-                    existing_entry.stress_level = stress_level
-                    existing_entry.sleep_quality = sleep_quality
-                    existing_entry.urge_intensity = urge_intensity
-                    existing_entry.notes = notes
-                    existing_entry.updated_at = datetime.utcnow()
-                else:
-                    # Create new entry
-                    mood_entry = MoodEntry(
-                        user_id=user_id,
-                        mood_score=mood_score,
-                        energy_level=energy_level,
-                        stress_level=stress_level,
-                        sleep_quality=sleep_quality,
-                        urge_intensity=urge_intensity,
-                        notes=notes
-                    )
-                    session.add(mood_entry)
-                
-                session.commit()
-                return True
-            finally:
-                session.close()
+            return await UserService.save_mood_checkin_async(
+                user_id, mood_score,
+                energy_level=energy_level,
+                stress_level=stress_level,
+                sleep_quality=sleep_quality,
+                urge_intensity=urge_intensity,
+                notes=notes
+            )
         except Exception as e:
             logger.error(f"Error recording detailed mood check-in for user {user_id}: {e}")
             return False
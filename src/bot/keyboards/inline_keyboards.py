@@ -1,9 +1,22 @@
+from functools import lru_cache
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
+# Markups are frozen (immutable) in python-telegram-bot 20, so one instance can be shared by all callbacks
+static_keyboard = lru_cache(maxsize=None)
+
+# Keyboards over a small, repeating set of arguments are cached per argument tuple, bounded to keep memory flat
+def cached_keyboard(maxsize: int = 256):
+    return lru_cache(maxsize=maxsize)
+
+# Keyboards keyed by one-off values (pagination cursors) would never hit a cache, so they are built per call
+def dynamic_keyboard(builder):
+    return builder
+
 class BotKeyboards:
     """Telegram inline keyboards untuk bot"""
     
     @staticmethod
+    @static_keyboard
     def main_menu():
         """Main menu keyboard"""
         keyboard = [
@@ -30,6 +43,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def settings_menu():
         """Settings menu keyboard"""
         keyboard = [
@@ -49,6 +63,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def reminder_settings_menu():
         """Reminder settings keyboard"""
         keyboard = [
@@ -67,6 +82,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def language_settings_menu():
         """Language settings keyboard"""
         keyboard = [
@@ -81,6 +97,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def reminder_frequency_menu():
         """Reminder frequency selection keyboard"""
         keyboard = [
@@ -99,6 +116,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def mood_checkin_menu():
         """Mood check-in keyboard"""
         keyboard = [
@@ -128,6 +146,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def mood_details_menu():
         """Additional mood details keyboard"""
         keyboard = [
@@ -150,6 +169,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def quick_mood_response():
         """Quick response keyboard for broadcast mood check"""
         keyboard = [
@@ -166,6 +186,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def emergency_menu():
         """Emergency mode keyboard"""
         keyboard = [
@@ -188,6 +209,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def emergency_protocol_menu():
         """Emergency protocol keyboard with back to emergency option"""
         keyboard = [
@@ -199,6 +221,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def education_menu():
         """Education menu keyboard"""
         keyboard = [
@@ -217,6 +240,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def journal_menu():
         """Journal menu keyboard"""
         keyboard = [
@@ -235,6 +259,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def journal_confirmation():
         """Journal entry confirmation keyboard"""
         keyboard = [
@@ -249,6 +274,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def coping_tips_menu():
         """Coping tips categories keyboard"""
         keyboard = [
@@ -271,6 +297,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @cached_keyboard()
     def confirmation_keyboard(action: str):
         """Generic confirmation keyboard"""
         keyboard = [
@@ -282,6 +309,36 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @dynamic_keyboard
+    def journal_history_pagination(older_cursor: str = None, newer_cursor: str = None):
+        """Journal history navigation; callback_data carries the page cursor"""
+        nav = []
+        if newer_cursor:
+            nav.append(InlineKeyboardButton("⬅️ Lebih Baru", callback_data=f"jpage_n_{newer_cursor}"))
+        if older_cursor:
+            nav.append(InlineKeyboardButton("Lebih Lama ➡️", callback_data=f"jpage_o_{older_cursor}"))
+        
+        keyboard = [nav] if nav else []
+        keyboard.append([InlineKeyboardButton("📖 Journal Menu", callback_data="journal_menu")])
+        keyboard.append([InlineKeyboardButton("🔙 Kembali ke Menu", callback_data="main_menu")])
+        return InlineKeyboardMarkup(keyboard)
+    
+    @staticmethod
+    @cached_keyboard()
+    def journal_search_pagination(page: int, has_more: bool):
+        """Journal search results navigation (query is kept in the conversation state store)"""
+        nav = []
+        if page > 0:
+            nav.append(InlineKeyboardButton("⬅️ Sebelumnya", callback_data=f"jsearch_{page - 1}"))
+        if has_more:
+            nav.append(InlineKeyboardButton("Berikutnya ➡️", callback_data=f"jsearch_{page + 1}"))
+        
+        keyboard = [nav] if nav else []
+        keyboard.append([InlineKeyboardButton("📖 Journal Menu", callback_data="journal_menu")])
+        return InlineKeyboardMarkup(keyboard)
+    
+    @staticmethod
+    @static_keyboard
     def relapse_confirmation():
         """Relapse confirmation keyboard"""
         keyboard = [
@@ -293,6 +350,7 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def mood_scale():
         """Mood scale keyboard (1-5)"""
         keyboard = []
@@ -304,12 +362,14 @@ class BotKeyboards:
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def back_to_main():
         """Simple back to main menu keyboard"""
         keyboard = [[InlineKeyboardButton("🔙 Kembali ke Menu", callback_data="main_menu")]]
         return InlineKeyboardMarkup(keyboard)
     
     @staticmethod
+    @static_keyboard
     def back_to_settings():
         """Back to settings keyboard"""
         keyboard = [
@@ -318,3 +378,24 @@ class BotKeyboards:
             ]
         ]
         return InlineKeyboardMarkup(keyboard)
+    
+    @classmethod
+    def prebuild(cls) -> int:
+        """Build every static keyboard once; returns the number of keyboards built"""
+        built = 0
+        for value in vars(cls).values():
+            builder = getattr(value, '__func__', None)
+            if isinstance(value, staticmethod) and hasattr(builder, 'cache_info') \
+                    and builder.cache_info().maxsize is None:
+                builder()
+                built += 1
+        return built
+    
+    @classmethod
+    def cache_info(cls) -> dict:
+        """Hit/miss counters for every cached keyboard"""
+        return {name: value.__func__.cache_info()._asdict() for name, value in vars(cls).items()
+                if isinstance(value, staticmethod) and hasattr(value.__func__, 'cache_info')}
+
+# Build static markups at import so the first callback doesn't pay for them
+BotKeyboards.prebuild()
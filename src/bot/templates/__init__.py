@@ -0,0 +1,10 @@
+# Message templates package
+from .renderer import MessageTemplate, TemplateError, TemplateRegistry, escape_markdown, validate_markdown
+from .messages import MESSAGE_TEMPLATES
+
+# Loaded once at startup; an invalid template fails the import instead of a Telegram send
+message_templates = TemplateRegistry()
+message_templates.load(MESSAGE_TEMPLATES)
+
+__all__ = ['MessageTemplate', 'TemplateError', 'TemplateRegistry', 'escape_markdown',
+           'validate_markdown', 'MESSAGE_TEMPLATES', 'message_templates']
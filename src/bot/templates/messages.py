@@ -0,0 +1,188 @@
+# Markdown message templates (parse_mode='Markdown'), validated at import.
+# Plain {field} placeholders are filled by TemplateRegistry.render; a (text, fields)
+# tuple marks user-supplied fields that are Markdown-escaped when rendered.
+
+MESSAGE_TEMPLATES = {
+    'main_menu': ("""
+🌟 **PMO Recovery Coach AI**
+
+Halo {first_name}! 
+
+📊 Current Streak: **{current_streak} hari**
+💪 Apa yang ingin kamu lakukan hari ini?
+
+Pilih menu di bawah:
+        """, ('first_name',)),
+
+    'emergency_mode': """
+🆘 **EMERGENCY MODE ACTIVATED** 🆘
+
+**⚠️ SITUASI DARURAT PMO RECOVERY**
+
+Kamu sedang mengalami urge atau craving yang kuat. TARIK NAPAS dan ikuti protokol emergency ini:
+
+**🚨 IMMEDIATE RESPONSE (0-2 menit):**
+1. **STOP** - Hentikan semua aktivitas sekarang
+2. **BREATHE** - Tarik napas dalam 4 detik, tahan 4 detik, buang 4 detik
+3. **MOVE** - Tinggalkan lokasi/posisi sekarang juga
+4. **DISTRACT** - Alihkan perhatian dengan aktivitas fisik
+
+**🔥 Ingat: Urge akan berlalu dalam 15-20 menit!**
+
+**📱 PROTOKOL EMERGENCY OPTIONS:**
+
+🌊 **Urge Surfing** - Teknik surf the urge tanpa melawan
+🎯 **Trigger Analysis** - Identify immediate triggers
+💨 **Immediate Distraction** - Quick distraction techniques  
+🧘 **Mindfulness Protocol** - Emergency mindfulness practice
+🆘 **Emergency Contacts** - Connect dengan support system
+💬 **Accountability Check** - Report dan get support
+
+**💡 QUICK REMINDERS:**
+• Kamu sudah berhasil melewati urge sebelumnya
+• Recovery is a journey, not perfection
+• Setiap detik yang kamu tahan adalah kemenangan
+• Your future self will thank you
+
+**Pilih protokol yang paling sesuai dengan situasi kamu sekarang:**
+        """,
+
+    'education_menu': """
+📚 **Recovery Education Center**
+
+Belajar tentang science di balik PMO recovery:
+
+**🧠 Dopamine & Recovery** - Bagaimana dopamine bekerja dan recovery process
+
+**✨ Benefits NoFap** - Manfaat yang dilaporkan oleh banyak orang
+
+**🔄 Neuroplasticity** - Bagaimana otak bisa berubah dan heal
+
+**📈 Recovery Timeline** - Apa yang diharapkan dalam timeline recovery
+
+Knowledge is power! Semakin kamu understand prosesnya, semakin mudah untuk tetap motivated.
+        """,
+
+    'education_topic': """
+{title}
+
+{content}
+
+Remember: Understanding the process helps you stay committed to recovery! 💪
+        """,
+
+    'mood_analysis': """
+🎯 **Analisis Mood**
+
+📊 **{entries} check-in** sejak {first_entry}
+
+**📈 Rata-rata Keseluruhan:**
+{average_lines}
+
+**🗓️ Rolling Average Mood:**
+{rolling_lines}
+
+**⏰ Pola Waktu:**
+{pattern_lines}
+
+**🔗 Korelasi:**
+{correlation_lines}
+
+**📉 Trend per Minggu:**
+{trend_lines}
+
+Continue dengan daily check-ins supaya analisis makin akurat! 💪
+        """,
+
+    'mood_analysis_empty': """
+🎯 **Analisis Mood**
+
+Belum ada data mood untuk dianalisis. 📊
+
+Setelah beberapa check-in, kamu akan melihat:
+• **Rolling Average** - Mood 7 dan 30 hari terakhir
+• **Pola Waktu** - Hari dan jam dengan mood terbaik/terendah
+• **Korelasi** - Hubungan sleep dan stress dengan urge
+• **Trend** - Apakah mood, stress dan urge membaik dari minggu ke minggu
+
+**💡 Mulai sekarang:**
+• Use daily check-in untuk track mood harian
+• Isi energy, stress, sleep dan urge di detailed check-in
+• Use emergency mode saat mood rendah
+        """,
+
+    'trigger_analysis': """
+🔍 **Analisis Trigger**
+
+📊 **{records} catatan** dengan trigger, {relapse_records} di antaranya relapse
+
+**🎯 Trigger Paling Sering:**
+{trigger_lines}
+
+**⏰ Waktu Paling Rawan:**
+{hour_lines}
+
+**🌍 Trigger Umum Semua User:**
+{global_lines}
+
+**💡 Cara Membaca Lift:**
+Lift > 1 berarti trigger itu lebih sering muncul saat relapse dibanding catatan biasa. Siapkan coping strategy khusus untuk trigger tersebut.
+
+Tandai trigger di journal dengan hashtag, misalnya #stres #bosan #sendiri 📝
+        """,
+
+    'trigger_analysis_empty': """
+🔍 **Analisis Trigger**
+
+Belum ada trigger yang tercatat. 🎯
+
+**📝 Cara mencatat trigger:**
+• Tulis hashtag di journal entry, misalnya _"urge kuat setelah scroll #bosan #malam"_
+• Trigger dari laporan relapse juga ikut dihitung
+
+**📊 Setelah ada data, kamu akan melihat:**
+• **Frekuensi** - Trigger yang paling sering muncul
+• **Waktu** - Jam-jam paling rawan
+• **Lift** - Trigger yang paling sering mendahului relapse
+
+**🛠️ Sementara itu:**
+• Use emergency mode saat trigger muncul
+• Practice coping strategies regularly
+        """,
+
+    'emergency_command': """
+🚨 **EMERGENCY MODE ACTIVATED** 🚨
+
+Saya mengerti kamu sedang dalam situasi sulit. Tarik napas dalam-dalam. Kamu BISA melewati ini!
+
+**Immediate Actions:**
+1. 🛑 STOP scrolling/browsing sekarang juga
+2. 💨 Tinggalkan area/posisi sekarang
+3. 🧘 Tarik napas dalam 4 detik, tahan 4 detik, hembuskan 6 detik
+4. 💧 Minum air dingin atau basuh wajah
+5. 📱 Hubungi teman/keluarga atau ke area publik
+
+**Remember:**
+• Urge ini akan berlalu dalam 10-20 menit
+• Kamu sudah bertahan sejauh ini - jangan sia-siakan!
+• Setiap kali kamu menolak, kamu semakin kuat
+
+Pilih protokol emergency di bawah:
+        """,
+
+    'relapse_report': """
+💙 **Relapse Report**
+
+Saya memahami betapa sulitnya moment ini untuk kamu. Yang penting adalah kamu datang ke sini untuk honest dan mau bangkit lagi.
+
+Apakah kamu yakin ingin melaporkan relapse? Ini akan mereset streak kamu, tapi remember - ini bukan akhir dari segalanya.
+
+**Setelah melaporkan relapse:**
+• Streak akan di-reset ke 0
+• Data akan tersimpan untuk learning
+• Kamu akan mendapat support message
+• Journey recovery dimulai lagi dari hari ini
+
+Relapse adalah bagian dari proses recovery bagi banyak orang. Yang penting adalah bangkit dan belajar dari pengalaman ini.
+        """,
+}
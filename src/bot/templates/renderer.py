@@ -0,0 +1,137 @@
+import string
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class TemplateError(ValueError):
+    """Raised when a message template is invalid Markdown or misses a field"""
+
+# Legacy Telegram Markdown entities (parse_mode='Markdown')
+_ENTITY_CHARS = ('*', '_', '`')
+_ESCAPE_CHARS = ('*', '_', '`', '[')
+
+def escape_markdown(value) -> str:
+    """Escape a dynamic value so it renders literally in legacy Markdown"""
+    text = str(value)
+    for char in _ESCAPE_CHARS:
+        text = text.replace(char, f"\\{char}")
+    return text
+
+def validate_markdown(text: str) -> Optional[str]:
+    """
+    Check text the way Telegram's legacy Markdown parser does
+    
+    Returns:
+        Error description, or None if the text parses
+    """
+    open_entity = None
+    open_at = 0
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if open_entity is None and char == '\\' and i + 1 < len(text) and text[i + 1] in _ESCAPE_CHARS:
+            i += 2
+            continue
+        
+        if text.startswith('```', i) and open_entity in (None, '```'):
+            open_entity, open_at = (None, 0) if open_entity else ('```', i)
+            i += 3
+            continue
+        
+        if char in _ENTITY_CHARS and open_entity in (None, char):
+            open_entity, open_at = (None, 0) if open_entity else (char, i)
+        elif char == '[' and open_entity is None:
+            close = text.find('](', i)
+            end = text.find(')', close + 2) if close != -1 else -1
+            if close == -1 or end == -1 or '\n' in text[i:end]:
+                return f"unclosed link at offset {i}"
+            i = end
+        i += 1
+    
+    if open_entity:
+        line = text.count('\n', 0, open_at) + 1
+        return f"unclosed '{open_entity}' entity starting on line {line}"
+    return None
+
+class MessageTemplate:
+    """Markdown message compiled into literal/field parts once"""
+    
+    def __init__(self, name: str, text: str, escape: Iterable[str] = ()):
+        self.name = name
+        self.text = text
+        self.escape = frozenset(escape)
+        self.parts: List[Tuple[str, Optional[str]]] = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(text):
+            if format_spec or conversion or (field is not None and not field.isidentifier()):
+                raise TemplateError(f"Template '{name}': only plain {{field}} placeholders are supported")
+            self.parts.append((literal, field))
+        self.fields = frozenset(field for _, field in self.parts if field)
+        self._static = None if self.fields else self._join({})
+    
+    @property
+    def is_static(self) -> bool:
+        return self._static is not None
+    
+    def validate(self):
+        """Raise TemplateError if the template (with placeholder values) is not valid Markdown"""
+        sample = self._join({field: 'x' for field in self.fields})
+        error = validate_markdown(sample)
+        if error:
+            raise TemplateError(f"Template '{self.name}': {error}")
+    
+    def render(self, **fields) -> str:
+        """Render the template; static templates return their cached text"""
+        if self._static is not None:
+            return self._static
+        
+        missing = self.fields - fields.keys()
+        if missing:
+            raise TemplateError(f"Template '{self.name}' missing fields: {', '.join(sorted(missing))}")
+        values = {field: escape_markdown(fields[field]) if field in self.escape else fields[field]
+                  for field in self.fields}
+        return self._join(values)
+    
+    def _join(self, values: Dict) -> str:
+        return ''.join(literal + (str(values[field]) if field else '') for literal, field in self.parts)
+
+class TemplateRegistry:
+    """Named message templates, validated when loaded"""
+    
+    def __init__(self):
+        self._templates: Dict[str, MessageTemplate] = {}
+    
+    def load(self, definitions: Dict[str, object]) -> int:
+        """
+        Compile and validate templates
+        
+        Args:
+            definitions: name -> text, or name -> (text, fields to Markdown-escape)
+        
+        Returns:
+            Number of templates loaded
+        """
+        errors = []
+        for name, definition in definitions.items():
+            text, escape = definition if isinstance(definition, tuple) else (definition, ())
+            try:
+                template = MessageTemplate(name, text, escape)
+                template.validate()
+            except TemplateError as e:
+                errors.append(str(e))
+                continue
+            self._templates[name] = template
+        
+        if errors:
+            raise TemplateError("Invalid message templates:\n" + "\n".join(errors))
+        return len(definitions)
+    
+    def get(self, name: str) -> MessageTemplate:
+        try:
+            return self._templates[name]
+        except KeyError:
+            raise TemplateError(f"Unknown message template '{name}'") from None
+    
+    def render(self, name: str, **fields) -> str:
+        """Render a named template"""
+        return self.get(name).render(**fields)
+    
+    def names(self) -> List[str]:
+        return sorted(self._templates)
@@ -1,23 +1,33 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from config.settings import settings
+from .engine import get_async_engine, get_engine
 from .models import Base
+from .migrations import run_migrations
 
 class Database:
     """Database connection manager"""
     
     def __init__(self):
-        self.engine = create_engine(settings.DATABASE_URL)
+        self.engine = get_engine()
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.async_engine = get_async_engine()
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.async_engine, autoflush=False, expire_on_commit=False
+        )
         
     def create_tables(self):
-        """Create all database tables"""
+        """Create all database tables and apply pending schema migrations"""
         Base.metadata.create_all(bind=self.engine)
+        run_migrations(self.engine)
         
     def get_session(self):
         """Get database session"""
         return self.SessionLocal()
         
+    def get_async_session(self) -> AsyncSession:
+        """Get async database session (use as ``async with db.get_async_session() as session``)"""
+        return self.AsyncSessionLocal()
+        
     def close_session(self, session):
         """Close database session"""
         session.close()
@@ -0,0 +1,131 @@
+"""
+Shared SQLAlchemy engine factory
+
+The whole process uses one engine (and therefore one connection pool) per
+database URL. SQLite connections get a production PRAGMA profile on connect:
+WAL so readers don't block the writer, ``synchronous=NORMAL`` (safe with WAL),
+a busy timeout instead of immediate "database is locked" errors, and larger
+page cache / mmap windows.
+"""
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+from config.settings import settings
+
+_engine = None
+_async_engine = None
+
+# Async drivers used for each sync backend
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+def sqlite_pragmas() -> dict:
+    """PRAGMA profile applied to every new SQLite connection"""
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': settings.SQLITE_BUSY_TIMEOUT_MS,
+        'cache_size': -settings.SQLITE_CACHE_SIZE_KB,  # negative = KiB instead of pages
+        'mmap_size': settings.SQLITE_MMAP_SIZE,
+        'temp_store': 'MEMORY',
+    }
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict = None):
+    """Apply the PRAGMA profile to a raw DB-API connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in (pragmas or sqlite_pragmas()).items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def _is_memory_database(url) -> bool:
+    return url.database in (None, '', ':memory:') or 'mode=memory' in str(url)
+
+def _engine_options(url, engine_kwargs: dict) -> dict:
+    """Pool and connect options for the backend of ``url``"""
+    if url.get_backend_name() == 'sqlite':
+        is_async = url.get_driver_name() == 'aiosqlite'
+        connect_args = {'timeout': settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if not is_async:
+            # Sessions are used from the event loop and from worker threads
+            connect_args['check_same_thread'] = False
+        options = {'connect_args': connect_args}
+        if _is_memory_database(url):
+            # Every connection to ':memory:' is a separate database, so share one
+            options['poolclass'] = StaticPool
+        else:
+            # SQLite has a single writer; a small pool is enough for concurrent readers
+            if is_async:
+                options['poolclass'] = AsyncAdaptedQueuePool
+            options['pool_size'] = settings.DB_POOL_SIZE
+            options['max_overflow'] = settings.DB_MAX_OVERFLOW
+    else:
+        options = {
+            'pool_size': settings.DB_POOL_SIZE,
+            'max_overflow': settings.DB_MAX_OVERFLOW,
+            'pool_pre_ping': True,
+            'pool_recycle': 1800,
+        }
+    if 'poolclass' in engine_kwargs:
+        # A custom pool (e.g. NullPool) decides its own sizing
+        options.pop('pool_size', None)
+        options.pop('max_overflow', None)
+    options.update(engine_kwargs)
+    return options
+
+def _install_sqlite_pragmas(sync_engine: Engine):
+    """Apply the PRAGMA profile whenever the pool opens a new connection"""
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection)
+
+def create_db_engine(database_url: str = None, **engine_kwargs) -> Engine:
+    """
+    Create an engine tuned for the target backend
+    
+    Args:
+        database_url: Database URL (defaults to settings.DATABASE_URL)
+        **engine_kwargs: Extra ``create_engine`` arguments (override the defaults)
+    """
+    url = make_url(database_url or settings.DATABASE_URL)
+    engine = create_engine(url, **_engine_options(url, engine_kwargs))
+    if url.get_backend_name() == 'sqlite':
+        _install_sqlite_pragmas(engine)
+    return engine
+
+def create_async_db_engine(database_url: str = None, **engine_kwargs) -> AsyncEngine:
+    """
+    Create an async engine (aiosqlite for SQLite) with the same tuning as the sync one
+    
+    Args:
+        database_url: Sync or async database URL (defaults to settings.DATABASE_URL)
+        **engine_kwargs: Extra ``create_async_engine`` arguments (override the defaults)
+    """
+    url = make_url(database_url or settings.DATABASE_URL)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS and url.drivername not in ASYNC_DRIVERS.values():
+        url = url.set(drivername=ASYNC_DRIVERS[backend])
+    
+    engine = create_async_engine(url, **_engine_options(url, engine_kwargs))
+    if backend == 'sqlite':
+        _install_sqlite_pragmas(engine.sync_engine)
+    return engine
+
+def get_engine() -> Engine:
+    """Get the process-wide engine for settings.DATABASE_URL"""
+    global _engine
+    if _engine is None:
+        _engine = create_db_engine()
+    return _engine
+
+def get_async_engine() -> AsyncEngine:
+    """Get the process-wide async engine for settings.DATABASE_URL"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_db_engine()
+    return _async_engine
@@ -0,0 +1,251 @@
+"""
+Schema migrations for existing databases
+
+``Base.metadata.create_all`` only creates missing tables, so anything added to an
+existing table later (indexes, columns, triggers) is applied here. Each migration
+runs once, in order, and is recorded in ``schema_migrations``.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Index, MetaData, Table, and_, bindparam, func, inspect, select, text
+from src.utils.logger import app_logger
+from .models import MoodEntry, SchemaMigration, TriggerLink, TriggerStat, TriggerTag, TriggerTotal, User, UserAggregate
+
+def _index(table_name, name, *columns, **kwargs):
+    """
+    Index as it was when its migration was written
+    
+    Migrations must not build indexes from the current models: a later migration may
+    add the columns those indexes reference.
+    """
+    index = Index(name, *columns, **kwargs)
+    Table(table_name, MetaData(), *(Column(column) for column in columns), index)
+    return index
+
+def _create_indexes(connection, indexes):
+    """Create the given indexes if they do not exist yet"""
+    for index in indexes:
+        index.create(connection, checkfirst=True)
+
+COMPOSITE_INDEXES = [
+    _index('users', 'ix_users_reminders_enabled', 'timezone', 'reminder_time', 'id',
+           sqlite_where=text('daily_reminders = 1'), postgresql_where=text('daily_reminders')),
+    _index('journal_entries', 'ix_journal_entries_telegram_id_created_at', 'telegram_id', 'created_at'),
+    _index('relapse_records', 'ix_relapse_records_telegram_id_created_at', 'telegram_id', 'created_at'),
+    _index('check_ins', 'ix_check_ins_user_id_check_in_date', 'user_id', 'check_in_date'),
+    _index('mood_entries', 'ix_mood_entries_user_id_created_at', 'user_id', 'created_at'),
+    _index('mood_entries', 'ix_mood_entries_created_at_user_id', 'created_at', 'user_id'),
+]
+
+JOURNAL_KEYSET_INDEXES = [
+    _index('journal_entries', 'ix_journal_entries_telegram_id_created_at_id', 'telegram_id', 'created_at', 'id'),
+]
+
+MOOD_CHECKIN_DAY_INDEXES = [
+    _index('mood_entries', 'ux_mood_entries_user_id_checkin_day', 'user_id', 'checkin_day', unique=True),
+]
+
+def _create_composite_indexes(connection):
+    """Composite indexes on the hot query columns"""
+    _create_indexes(connection, COMPOSITE_INDEXES)
+
+def _backfill_user_aggregates(connection):
+    """Create user_aggregates and fill it from existing journal and mood entries"""
+    from src.services.aggregate_service import AggregateService
+    
+    UserAggregate.__table__.create(connection, checkfirst=True)
+    AggregateService.rebuild(connection)
+
+JOURNAL_FTS_TABLE = "journal_entries_fts"
+
+def _create_journal_search_index(connection):
+    """FTS5 index over journal_entries, kept in sync by triggers (SQLite only)"""
+    if connection.dialect.name != 'sqlite':
+        app_logger.info("Skipping journal FTS5 index: not a SQLite database")
+        return
+    
+    statements = [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {JOURNAL_FTS_TABLE} USING fts5(
+            entry_text, telegram_id, content='journal_entries', content_rowid='id'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS journal_entries_fts_insert AFTER INSERT ON journal_entries BEGIN
+            INSERT INTO {JOURNAL_FTS_TABLE}(rowid, entry_text, telegram_id)
+            VALUES (new.id, new.entry_text, new.telegram_id);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS journal_entries_fts_delete AFTER DELETE ON journal_entries BEGIN
+            INSERT INTO {JOURNAL_FTS_TABLE}({JOURNAL_FTS_TABLE}, rowid, entry_text, telegram_id)
+            VALUES ('delete', old.id, old.entry_text, old.telegram_id);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS journal_entries_fts_update AFTER UPDATE ON journal_entries BEGIN
+            INSERT INTO {JOURNAL_FTS_TABLE}({JOURNAL_FTS_TABLE}, rowid, entry_text, telegram_id)
+            VALUES ('delete', old.id, old.entry_text, old.telegram_id);
+            INSERT INTO {JOURNAL_FTS_TABLE}(rowid, entry_text, telegram_id)
+            VALUES (new.id, new.entry_text, new.telegram_id);
+        END""",
+        # Index entries written before the triggers existed
+        f"INSERT INTO {JOURNAL_FTS_TABLE}({JOURNAL_FTS_TABLE}) VALUES ('rebuild')",
+    ]
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+def _create_mood_aggregate_triggers(connection):
+    """Keep the mood columns of user_aggregates in step with every mood_entries insert and score change"""
+    if connection.dialect.name == 'postgresql':
+        statements = [
+            """CREATE OR REPLACE FUNCTION mood_entries_aggregate() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO user_aggregates (telegram_id, mood_entries, mood_sum, mood_first_at, mood_last_at, updated_at)
+                    VALUES (NEW.user_id, 1, NEW.mood_score, NEW.created_at, NEW.created_at, now() AT TIME ZONE 'utc')
+                    ON CONFLICT (telegram_id) DO UPDATE SET
+                        mood_entries = user_aggregates.mood_entries + 1,
+                        mood_sum = user_aggregates.mood_sum + EXCLUDED.mood_sum,
+                        mood_first_at = LEAST(user_aggregates.mood_first_at, EXCLUDED.mood_first_at),
+                        mood_last_at = GREATEST(user_aggregates.mood_last_at, EXCLUDED.mood_last_at),
+                        updated_at = EXCLUDED.updated_at;
+                ELSE
+                    UPDATE user_aggregates
+                    SET mood_sum = mood_sum + NEW.mood_score - OLD.mood_score, updated_at = now() AT TIME ZONE 'utc'
+                    WHERE telegram_id = NEW.user_id;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql""",
+            "DROP TRIGGER IF EXISTS mood_entries_aggregate ON mood_entries",
+            """CREATE TRIGGER mood_entries_aggregate AFTER INSERT OR UPDATE OF mood_score ON mood_entries
+            FOR EACH ROW EXECUTE FUNCTION mood_entries_aggregate()""",
+        ]
+    else:
+        statements = [
+            """CREATE TRIGGER IF NOT EXISTS mood_entries_aggregate_insert AFTER INSERT ON mood_entries BEGIN
+                INSERT INTO user_aggregates (telegram_id, mood_entries, mood_sum, mood_first_at, mood_last_at, updated_at)
+                VALUES (new.user_id, 1, new.mood_score, new.created_at, new.created_at, datetime('now'))
+                ON CONFLICT (telegram_id) DO UPDATE SET
+                    mood_entries = mood_entries + 1,
+                    mood_sum = mood_sum + excluded.mood_sum,
+                    mood_first_at = min(coalesce(mood_first_at, excluded.mood_first_at), excluded.mood_first_at),
+                    mood_last_at = max(coalesce(mood_last_at, excluded.mood_last_at), excluded.mood_last_at),
+                    updated_at = excluded.updated_at;
+            END""",
+            """CREATE TRIGGER IF NOT EXISTS mood_entries_aggregate_update AFTER UPDATE OF mood_score ON mood_entries BEGIN
+                UPDATE user_aggregates
+                SET mood_sum = mood_sum + new.mood_score - old.mood_score, updated_at = datetime('now')
+                WHERE telegram_id = new.user_id;
+            END""",
+        ]
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+def _create_entry_triggers(connection):
+    """Mood aggregate triggers and the journal FTS5 index with its sync triggers"""
+    _create_mood_aggregate_triggers(connection)
+    _create_journal_search_index(connection)
+
+def _create_journal_keyset_index(connection):
+    """Replace the (telegram_id, created_at) journal index with the keyset cursor index"""
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ix_journal_entries_telegram_id_created_at")
+    _create_indexes(connection, JOURNAL_KEYSET_INDEXES)
+
+def _backfill_trigger_tags(connection):
+    """Create the trigger tag tables and parse existing triggers columns into them"""
+    from src.services.trigger_service import TriggerService
+    
+    for model in (TriggerTag, TriggerLink, TriggerStat, TriggerTotal):
+        model.__table__.create(connection, checkfirst=True)
+    TriggerService.rebuild(connection)
+
+MOOD_DUPLICATES_TABLE = "mood_entries_duplicates"
+
+def _add_mood_checkin_day(connection):
+    """Add mood_entries.checkin_day, backfill it in each user's timezone and make it unique per user"""
+    from src.services.aggregate_service import AggregateService
+    from src.services.trigger_service import TriggerService
+    from src.services.user_service import UserService
+    
+    if 'checkin_day' not in {column['name'] for column in inspect(connection).get_columns('mood_entries')}:
+        connection.exec_driver_sql("ALTER TABLE mood_entries ADD COLUMN checkin_day DATE")
+    # Re-created below, once duplicate days are gone
+    connection.exec_driver_sql("DROP INDEX IF EXISTS ux_mood_entries_user_id_checkin_day")
+    
+    mood_entries = MoodEntry.__table__
+    rows = connection.execute(
+        select(mood_entries.c.id, mood_entries.c.created_at, User.__table__.c.timezone)
+        .select_from(mood_entries.outerjoin(User.__table__, User.__table__.c.telegram_id == mood_entries.c.user_id))
+        .where(mood_entries.c.checkin_day.is_(None), mood_entries.c.created_at.isnot(None))
+    ).all()
+    if rows:
+        connection.execute(
+            mood_entries.update().where(mood_entries.c.id == bindparam('entry_id')).values(checkin_day=bindparam('day')),
+            [{'entry_id': row.id, 'day': UserService.checkin_day(row.timezone, row.created_at)} for row in rows]
+        )
+    
+    # Keep the latest entry of any day checked in more than once (earlier races)
+    latest = select(func.max(mood_entries.c.id))\
+        .where(mood_entries.c.checkin_day.isnot(None))\
+        .group_by(mood_entries.c.user_id, mood_entries.c.checkin_day)
+    duplicate = and_(mood_entries.c.checkin_day.isnot(None), mood_entries.c.id.not_in(latest))
+    duplicate_ids = connection.execute(select(mood_entries.c.id).where(duplicate).order_by(mood_entries.c.id)).scalars().all()
+    if duplicate_ids:
+        # Moved aside rather than dropped: their notes and levels can still be merged back by hand
+        connection.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {MOOD_DUPLICATES_TABLE} AS SELECT * FROM mood_entries WHERE 1 = 0"
+        )
+        copy = text(f"INSERT INTO {MOOD_DUPLICATES_TABLE} SELECT * FROM mood_entries WHERE id IN :ids")\
+            .bindparams(bindparam('ids', expanding=True))
+        for start in range(0, len(duplicate_ids), 500):
+            batch = duplicate_ids[start:start + 500]
+            connection.execute(copy, {'ids': batch})
+            connection.execute(mood_entries.delete().where(mood_entries.c.id.in_(batch)))
+        app_logger.warning(f"Moved {len(duplicate_ids)} duplicate mood check-ins (same user and day) "
+                           f"from mood_entries to {MOOD_DUPLICATES_TABLE}")
+        AggregateService.rebuild(connection)
+        TriggerService.rebuild(connection)
+    
+    _create_indexes(connection, MOOD_CHECKIN_DAY_INDEXES)
+
+# (version, description, upgrade(connection))
+MIGRATIONS = [
+    (1, "Composite indexes on hot query columns", _create_composite_indexes),
+    (2, "Per-user journal and mood aggregates", _backfill_user_aggregates),
+    (3, "FTS5 full-text search over journal entries and mood aggregate triggers", _create_entry_triggers),
+    (4, "Keyset pagination index on journal_entries", _create_journal_keyset_index),
+    (5, "Normalized trigger tags and incremental trigger stats", _backfill_trigger_tags),
+    (6, "Unique per-user mood check-in day", _add_mood_checkin_day),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(engine) -> int:
+    """Get the highest applied migration version (0 for an unversioned database)"""
+    if not inspect(engine).has_table(SchemaMigration.__tablename__):
+        return 0
+    with engine.connect() as connection:
+        versions = [row[0] for row in connection.execute(SchemaMigration.__table__.select().with_only_columns(SchemaMigration.version))]
+    return max(versions, default=0)
+
+def run_migrations(engine) -> int:
+    """
+    Apply pending migrations to the database
+    
+    Returns:
+        Number of migrations applied
+    """
+    SchemaMigration.__table__.create(engine, checkfirst=True)
+    current_version = get_schema_version(engine)
+    applied = 0
+    
+    for version, description, upgrade in MIGRATIONS:
+        if version <= current_version:
+            continue
+        
+        app_logger.info(f"Applying schema migration {version}: {description}")
+        with engine.begin() as connection:
+            upgrade(connection)
+            connection.execute(SchemaMigration.__table__.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+        applied += 1
+    
+    if applied:
+        app_logger.info(f"Database schema is now at version {SCHEMA_VERSION}")
+    return applied
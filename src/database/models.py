@@ -1,9 +1,9 @@
 from datetime import datetime, timezone
 from typing import Optional
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Text, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from config.settings import settings
+from .engine import get_engine
 
 Base = declarative_base()
 
@@ -33,6 +33,13 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Partial index: only users with reminders enabled (broadcast audience & reminder slots)
+        Index('ix_users_reminders_enabled', 'timezone', 'reminder_time', 'id',
+              sqlite_where=text('daily_reminders = 1'),
+              postgresql_where=text('daily_reminders')),
+    )
+    
     def __repr__(self):
         return f"<User(telegram_id={self.telegram_id}, username={self.username})>"
 
@@ -50,6 +57,11 @@ class JournalEntry(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Keyset pagination: (telegram_id, created_at, id) is the page cursor order
+        Index('ix_journal_entries_telegram_id_created_at_id', 'telegram_id', 'created_at', 'id'),
+    )
+    
     def __repr__(self):
         return f"<JournalEntry(user_id={self.user_id}, created_at={self.created_at})>"
 
@@ -68,6 +80,10 @@ class RelapseRecord(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        Index('ix_relapse_records_telegram_id_created_at', 'telegram_id', 'created_at'),
+    )
+    
     def __repr__(self):
         return f"<RelapseRecord(user_id={self.user_id}, streak_broken={self.streak_broken})>"
 
@@ -86,6 +102,10 @@ class CheckIn(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        Index('ix_check_ins_user_id_check_in_date', 'user_id', 'check_in_date'),
+    )
+    
     def __repr__(self):
         return f"<CheckIn(user_id={self.user_id}, check_in_date={self.check_in_date})>"
 
@@ -106,14 +126,112 @@ class MoodEntry(Base):
     activities = Column(Text, nullable=True)  # JSON string for daily activities
     triggers_today = Column(Text, nullable=True)  # JSON string for triggers encountered
     
+    checkin_day = Column(Date, nullable=True)  # Tanggal check-in di timezone user
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        Index('ix_mood_entries_user_id_created_at', 'user_id', 'created_at'),
+        # Daily "who checked in today" range scans across all users
+        Index('ix_mood_entries_created_at_user_id', 'created_at', 'user_id'),
+        # One check-in per user per local day; target of the check-in upsert
+        Index('ux_mood_entries_user_id_checkin_day', 'user_id', 'checkin_day', unique=True),
+    )
+    
     def __repr__(self):
         return f"<MoodEntry(user_id={self.user_id}, mood_score={self.mood_score}, created_at={self.created_at})>"
 
-# Database setup
-engine = create_engine(settings.DATABASE_URL)
+class UserAggregate(Base):
+    """Model untuk statistik journal dan mood per user yang di-maintain secara incremental"""
+    __tablename__ = "user_aggregates"
+    
+    telegram_id = Column(Integer, primary_key=True, autoincrement=False)
+    
+    journal_entries = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    journal_words = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    journal_mood_sum = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    journal_mood_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    journal_first_at = Column(DateTime, nullable=True)
+    journal_last_at = Column(DateTime, nullable=True)
+    
+    mood_entries = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    mood_sum = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    mood_first_at = Column(DateTime, nullable=True)
+    mood_last_at = Column(DateTime, nullable=True)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<UserAggregate(telegram_id={self.telegram_id}, journal_entries={self.journal_entries}, mood_entries={self.mood_entries})>"
+
+class TriggerTag(Base):
+    """Model untuk trigger tag yang sudah dinormalisasi (lowercase)"""
+    __tablename__ = "trigger_tags"
+    
+    name = Column(String(100), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<TriggerTag(name={self.name})>"
+
+class TriggerLink(Base):
+    """Many-to-many antara trigger tags dan journal entries / relapse records / mood entries"""
+    __tablename__ = "trigger_links"
+    
+    source = Column(String(20), primary_key=True)  # journal, relapse, mood
+    source_id = Column(Integer, primary_key=True)
+    tag = Column(String(100), primary_key=True)  # Foreign key ke TriggerTag.name
+    
+    telegram_id = Column(Integer, nullable=False)
+    occurred_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_trigger_links_telegram_id_tag', 'telegram_id', 'tag'),
+    )
+    
+    def __repr__(self):
+        return f"<TriggerLink(source={self.source}, source_id={self.source_id}, tag={self.tag})>"
+
+class TriggerStat(Base):
+    """Model untuk jumlah trigger per (user, tag, jam UTC); telegram_id 0 menyimpan angka global"""
+    __tablename__ = "trigger_stats"
+    
+    telegram_id = Column(Integer, primary_key=True, autoincrement=False)
+    tag = Column(String(100), primary_key=True)
+    hour = Column(Integer, primary_key=True, autoincrement=False)  # 0-23 UTC
+    
+    occurrences = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    relapses = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    
+    def __repr__(self):
+        return f"<TriggerStat(telegram_id={self.telegram_id}, tag={self.tag}, hour={self.hour}, occurrences={self.occurrences})>"
+
+class TriggerTotal(Base):
+    """Model untuk jumlah record yang punya trigger per user (telegram_id 0 = global), base rate untuk lift"""
+    __tablename__ = "trigger_totals"
+    
+    telegram_id = Column(Integer, primary_key=True, autoincrement=False)
+    
+    records = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    relapse_records = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    
+    def __repr__(self):
+        return f"<TriggerTotal(telegram_id={self.telegram_id}, records={self.records}, relapse_records={self.relapse_records})>"
+
+class SchemaMigration(Base):
+    """Model untuk mencatat versi schema yang sudah diterapkan"""
+    __tablename__ = "schema_migrations"
+    
+    version = Column(Integer, primary_key=True)
+    description = Column(String(255), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SchemaMigration(version={self.version}, description={self.description})>"
+
+# Database setup (shares the process-wide engine with src.database.database.db)
+engine = get_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def create_tables():
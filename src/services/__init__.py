@@ -1,22 +1,32 @@
 # Services package
+from .aggregate_service import AggregateService
+from .trigger_service import TriggerService
 from .user_service import UserService
 from .streak_service import StreakService
 from .motivational_service import MotivationalService
 from .emergency_service import EmergencyService
 from .journal_service import JournalService
+from .mood_analytics_service import MoodAnalyticsService
+from .delivery_service import DeliveryEngine
 from .broadcast_service import BroadcastService
 from .scheduler_service import SchedulerService
 from .backup_service import BackupService
+from .backup_store import ChunkStore
 from .backup_scheduler import BackupScheduler
 
 __all__ = [
+    'AggregateService',
+    'TriggerService',
     'UserService',
     'StreakService', 
     'MotivationalService',
     'EmergencyService',
     'JournalService',
+    'MoodAnalyticsService',
+    'DeliveryEngine',
     'BroadcastService',
     'SchedulerService',
     'BackupService',
+    'ChunkStore',
     'BackupScheduler'
 ]
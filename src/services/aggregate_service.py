@@ -0,0 +1,140 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import case, delete, func, select, true
+from sqlalchemy.dialects import postgresql, sqlite
+from src.database.database import db
+from src.database.models import JournalEntry, MoodEntry, UserAggregate
+from src.utils.logger import app_logger
+
+_table = UserAggregate.__table__
+
+def count_words(text: Optional[str]) -> int:
+    """Word count used for journal statistics"""
+    return len(text.split()) if text else 0
+
+def _upsert(dialect_name: str):
+    """Dialect-specific INSERT supporting ON CONFLICT DO UPDATE"""
+    return postgresql.insert(_table) if dialect_name == 'postgresql' else sqlite.insert(_table)
+
+def _earliest(column, value):
+    return case((column.is_(None) | (column > value), value), else_=column)
+
+def _latest(column, value):
+    return case((column.is_(None) | (column < value), value), else_=column)
+
+class AggregateService:
+    """Service untuk per-user journal/mood aggregates yang di-update saat entry dibuat"""
+
+    @staticmethod
+    def journal_statement(dialect_name: str, telegram_id: int, entries: int, words: int,
+                          mood_sum: int, mood_count: int, first_at: datetime, last_at: datetime):
+        """Upsert adding journal entries to a user's aggregate row (executed in the caller's transaction)"""
+        now = datetime.utcnow()
+        statement = _upsert(dialect_name).values(
+            telegram_id=telegram_id,
+            journal_entries=entries,
+            journal_words=words,
+            journal_mood_sum=mood_sum,
+            journal_mood_count=mood_count,
+            journal_first_at=first_at,
+            journal_last_at=last_at,
+            updated_at=now
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[_table.c.telegram_id],
+            set_={
+                'journal_entries': _table.c.journal_entries + entries,
+                'journal_words': _table.c.journal_words + words,
+                'journal_mood_sum': _table.c.journal_mood_sum + mood_sum,
+                'journal_mood_count': _table.c.journal_mood_count + mood_count,
+                'journal_first_at': _earliest(_table.c.journal_first_at, first_at),
+                'journal_last_at': _latest(_table.c.journal_last_at, last_at),
+                'updated_at': now
+            }
+        )
+
+    @staticmethod
+    def journal_entry_added(dialect_name: str, telegram_id: int, entry_text: str,
+                            mood_score: Optional[int], created_at: datetime):
+        """Aggregate upsert for one new journal entry"""
+        return AggregateService.journal_statement(
+            dialect_name, telegram_id, 1, count_words(entry_text),
+            mood_score or 0, 1 if mood_score is not None else 0, created_at, created_at
+        )
+
+    @staticmethod
+    def get_aggregates(telegram_id: int) -> Optional[UserAggregate]:
+        """Aggregate row for a user (primary-key lookup)"""
+        session = db.get_session()
+        try:
+            return session.get(UserAggregate, telegram_id)
+        finally:
+            db.close_session(session)
+
+    @staticmethod
+    async def get_aggregates_async(telegram_id: int) -> Optional[UserAggregate]:
+        """Aggregate row for a user (primary-key lookup) without blocking the event loop"""
+        async with db.get_async_session() as session:
+            return await session.get(UserAggregate, telegram_id)
+
+    @staticmethod
+    def rebuild(connection, telegram_id: int = None, batch_size: int = 1000) -> int:
+        """
+        Recompute aggregates from journal_entries and mood_entries
+
+        Args:
+            connection: Connection inside a transaction (e.g. ``engine.begin()``)
+            telegram_id: Only rebuild this user (default: everyone)
+            batch_size: Journal rows streamed per fetch
+
+        Returns:
+            Number of aggregate rows written
+        """
+        dialect_name = connection.dialect.name
+        user_filter = (lambda column: column == telegram_id) if telegram_id is not None else (lambda column: true())
+        connection.execute(delete(_table).where(user_filter(_table.c.telegram_id)))
+
+        # Mood aggregates in one INSERT ... SELECT
+        connection.execute(_table.insert().from_select(
+            ['telegram_id', 'mood_entries', 'mood_sum', 'mood_first_at', 'mood_last_at', 'updated_at'],
+            select(
+                MoodEntry.user_id, func.count(MoodEntry.id), func.sum(MoodEntry.mood_score),
+                func.min(MoodEntry.created_at), func.max(MoodEntry.created_at), func.now()
+            ).where(user_filter(MoodEntry.user_id)).group_by(MoodEntry.user_id)
+        ))
+
+        # Journal aggregates: stream entries per user, words are counted in Python like count_words()
+        rows = connection.execution_options(yield_per=batch_size).execute(
+            select(JournalEntry.telegram_id, JournalEntry.entry_text, JournalEntry.mood_score, JournalEntry.created_at)
+            .where(user_filter(JournalEntry.telegram_id))
+            .order_by(JournalEntry.telegram_id)
+        )
+
+        pending = []
+        current = None
+        for row in rows:
+            if current is None or current['telegram_id'] != row.telegram_id:
+                if current:
+                    pending.append(current)
+                current = {'telegram_id': row.telegram_id, 'entries': 0, 'words': 0, 'mood_sum': 0,
+                           'mood_count': 0, 'first_at': row.created_at, 'last_at': row.created_at}
+            current['entries'] += 1
+            current['words'] += count_words(row.entry_text)
+            if row.mood_score is not None:
+                current['mood_sum'] += row.mood_score
+                current['mood_count'] += 1
+            if row.created_at and (current['first_at'] is None or row.created_at < current['first_at']):
+                current['first_at'] = row.created_at
+            if row.created_at and (current['last_at'] is None or row.created_at > current['last_at']):
+                current['last_at'] = row.created_at
+        if current:
+            pending.append(current)
+
+        for aggregate in pending:
+            connection.execute(AggregateService.journal_statement(dialect_name, **aggregate))
+
+        written = connection.execute(
+            select(func.count()).select_from(_table).where(user_filter(_table.c.telegram_id))
+        ).scalar()
+        app_logger.info(f"Rebuilt {written} user aggregate rows")
+        return written
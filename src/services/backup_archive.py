@@ -0,0 +1,366 @@
+"""
+Streaming backup archives: zip (parallel deflate) or tar + zstd
+
+Members are streamed from their source straight into the archive; nothing is
+staged in a temporary directory first. Compression uses every core:
+
+- ``zip``: each member is cut into blocks deflated on a thread pool and joined
+  into one deflate stream (as pigz does), so any unzip tool can read it.
+- ``tar.zst``: zstd's own worker threads; needs the optional ``zstandard`` package.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for tar.zst archives
+    zstandard = None
+
+from ..utils.logger import app_logger
+
+logger = app_logger
+
+ARCHIVE_EXTENSIONS = {
+    "zip": ".zip",
+    "tar.zst": ".tar.zst",
+}
+
+DEFAULT_LEVELS = {
+    "zip": 6,
+    "tar.zst": 3,
+}
+
+# Last member of every archive: size and SHA-256 of each other member
+MANIFEST_NAME = "backup_manifest.json"
+
+# Members that are already compressed are stored as-is in zip archives
+_COMPRESSED_SUFFIXES = (".gz", ".zst", ".zip")
+
+# Parallel deflate replaces zipfile._ZipWriteFile._compressor, which is private. Its
+# use (compress() per write, flush() on close) is checked on these CPython versions;
+# elsewhere zip members use zipfile's own single-threaded compressor.
+_PARALLEL_ZIP_VERSIONS = ((3, 8), (3, 13))
+
+class ArchiveMember(NamedTuple):
+    """One archive entry: copied from ``path`` or produced by ``writer(fileobj)``"""
+    name: str
+    path: Optional[Path] = None
+    writer: Optional[Callable[[BinaryIO], None]] = None
+
+def available_formats() -> List[str]:
+    """Archive formats usable in this environment"""
+    return [fmt for fmt in ARCHIVE_EXTENSIONS if fmt != "tar.zst" or zstandard is not None]
+
+def archive_format_of(path) -> Optional[str]:
+    """Format of an archive file, from its extension"""
+    name = str(path)
+    for fmt, extension in ARCHIVE_EXTENSIONS.items():
+        if name.endswith(extension):
+            return fmt
+    return None
+
+def archive_files(folder: Path) -> List[Path]:
+    """Backup archives in a folder, any supported format"""
+    return [path for extension in ARCHIVE_EXTENSIONS.values() for path in folder.glob(f"*{extension}")]
+
+class ParallelDeflate:
+    """
+    zlib-compatible compressor that deflates fixed-size blocks on a thread pool
+
+    Every block but the last ends with a sync flush, so the concatenated blocks
+    form a single raw deflate stream. zlib releases the GIL while compressing.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, workers: int, level: int, block_size: int):
+        self._executor = executor
+        self._level = level
+        self._block_size = block_size
+        self._max_pending = workers * 2
+        self._buffer = bytearray()
+        self._pending = deque()
+
+    def _deflate(self, block: bytes, final: bool) -> bytes:
+        compressor = zlib.compressobj(self._level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    def _drain(self, wait: bool) -> bytes:
+        out = []
+        while self._pending and (wait or self._pending[0].done() or len(self._pending) > self._max_pending):
+            out.append(self._pending.popleft().result())
+        return b"".join(out)
+
+    def compress(self, data: bytes) -> bytes:
+        self._buffer += data
+        while len(self._buffer) >= self._block_size:
+            block = bytes(self._buffer[:self._block_size])
+            del self._buffer[:self._block_size]
+            self._pending.append(self._executor.submit(self._deflate, block, False))
+        return self._drain(wait=False)
+
+    def flush(self) -> bytes:
+        self._pending.append(self._executor.submit(self._deflate, bytes(self._buffer), True))
+        self._buffer = bytearray()
+        return self._drain(wait=True)
+
+def _parallel_zip_supported() -> bool:
+    low, high = _PARALLEL_ZIP_VERSIONS
+    return sys.implementation.name == "cpython" and low <= sys.version_info[:2] <= high
+
+def _use_parallel_deflate(handle, compressor: ParallelDeflate) -> bool:
+    """Swap a zip member's single-threaded compressor before its first write, where known to be safe"""
+    if not _parallel_zip_supported() or getattr(handle, "_compressor", None) is None:
+        return False
+    handle._compressor = compressor
+    return True
+
+def _write_zip(destination: Path, members: Iterable[ArchiveMember], checksums: Dict, workers: int,
+               level: int, block_size: int) -> List[str]:
+    if not _parallel_zip_supported():
+        logger.info(f"Parallel deflate is not verified on Python {sys.version_info[0]}.{sys.version_info[1]}, "
+                    "zip members are compressed on one thread")
+    names = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backup-deflate") as executor, \
+            zipfile.ZipFile(destination, "w", zipfile.ZIP_DEFLATED, compresslevel=level) as archive:
+        for member in members:
+            if member.path is not None:
+                info = zipfile.ZipInfo.from_file(member.path, member.name)
+            else:
+                info = zipfile.ZipInfo(member.name, datetime.now().timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED if member.name.endswith(_COMPRESSED_SUFFIXES) \
+                else zipfile.ZIP_DEFLATED
+
+            # Generated members have no size up front; zip64 headers keep them valid past 4 GB
+            with archive.open(info, "w", force_zip64=member.path is None) as handle:
+                if info.compress_type == zipfile.ZIP_DEFLATED:
+                    _use_parallel_deflate(handle, ParallelDeflate(executor, workers, level, block_size))
+                output = _HashingWriter(handle)
+                if member.path is not None:
+                    with open(member.path, "rb") as source:
+                        shutil.copyfileobj(source, output, block_size)
+                else:
+                    member.writer(output)
+            checksums[member.name] = output.checksum()
+            names.append(member.name)
+    return names
+
+def _write_tar_zst(destination: Path, members: Iterable[ArchiveMember], checksums: Dict, workers: int,
+                   level: int, block_size: int) -> List[str]:
+    if zstandard is None:
+        raise RuntimeError("tar.zst archives need the zstandard package (pip install zstandard)")
+
+    names = []
+    compressor = zstandard.ZstdCompressor(level=level, threads=workers)
+    with open(destination, "wb") as raw, \
+            compressor.stream_writer(raw, write_size=block_size, closefd=False) as stream, \
+            tarfile.open(fileobj=stream, mode="w|") as archive:
+        for member in members:
+            if member.path is not None:
+                info = archive.gettarinfo(str(member.path), arcname=member.name)
+                with open(member.path, "rb") as source:
+                    reader = _HashingReader(source)
+                    archive.addfile(info, reader)
+                checksums[member.name] = reader.checksum()
+            else:
+                # tar headers need the size first: spool the generated member to an anonymous temp file
+                with tempfile.TemporaryFile(dir=destination.parent) as spool:
+                    output = _HashingWriter(spool)
+                    member.writer(output)
+                    info = tarfile.TarInfo(member.name)
+                    info.size = spool.tell()
+                    info.mtime = int(time.time())
+                    spool.seek(0)
+                    archive.addfile(info, spool)
+                checksums[member.name] = output.checksum()
+            names.append(member.name)
+    return names
+
+def build_archive(destination, members: Iterable[ArchiveMember], fmt: str = "zip",
+                  workers: Optional[int] = None, level: Optional[int] = None,
+                  block_size: int = 1024 * 1024) -> Dict:
+    """
+    Write members into a new archive (blocking, run in a worker thread)
+
+    Size and SHA-256 of every member are recorded while it is written and stored
+    as the last member, MANIFEST_NAME, for verified restores. The archive is built
+    under a hidden sibling name and renamed when complete, so a half-written file
+    is never listed as a backup.
+
+    Returns:
+        Dict with format, members, checksums, bytes_in, bytes_out and seconds
+    """
+    if fmt not in ARCHIVE_EXTENSIONS:
+        raise ValueError(f"Unknown archive format: {fmt}")
+    destination = Path(destination)
+    workers = workers or os.cpu_count() or 1
+    level = DEFAULT_LEVELS[fmt] if level is None else level
+
+    checksums = {}
+    manifest = ArchiveMember(MANIFEST_NAME, writer=lambda f: f.write(
+        json.dumps({"members": checksums}, indent=1, ensure_ascii=False).encode("utf-8")
+    ))
+    temp_path = destination.with_name(f".{destination.name}.part")
+    started_at = time.monotonic()
+    try:
+        write = _write_zip if fmt == "zip" else _write_tar_zst
+        names = write(temp_path, itertools.chain(members, [manifest]), checksums, workers, level, block_size)
+        os.replace(temp_path, destination)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+    checksums.pop(MANIFEST_NAME, None)
+    report = {
+        "format": fmt,
+        "members": names,
+        "checksums": checksums,
+        "bytes_in": sum(checksum["size"] for checksum in checksums.values()),
+        "bytes_out": destination.stat().st_size,
+        "seconds": time.monotonic() - started_at,
+    }
+    logger.info(f"{fmt} archive {destination.name}: {len(names)} members, "
+                f"{report['bytes_in'] / (1024 * 1024):.1f} MB -> {report['bytes_out'] / (1024 * 1024):.1f} MB "
+                f"in {report['seconds']:.1f}s ({workers} workers)")
+    return report
+
+class _HashingWriter:
+    """Write-only file wrapper recording size and SHA-256 of what passes through"""
+
+    def __init__(self, fileobj: BinaryIO):
+        self._fileobj = fileobj
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._hash.update(data)
+        self.size += len(data)
+        return self._fileobj.write(data)
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        self._fileobj.flush()
+
+    def checksum(self) -> Dict:
+        return {"size": self.size, "sha256": self._hash.hexdigest()}
+
+class _HashingReader(_HashingWriter):
+    """Read-only counterpart of _HashingWriter"""
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fileobj.read(size)
+        self._hash.update(data)
+        self.size += len(data)
+        return data
+
+def iter_members(path) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Stream (name, fileobj) for every file member of a zip or tar.zst archive
+
+    Each fileobj is only valid until the next member is requested.
+    """
+    fmt = archive_format_of(path)
+    if fmt == "zip":
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    with archive.open(info) as member:
+                        yield info.filename, member
+    elif fmt == "tar.zst":
+        if zstandard is None:
+            raise RuntimeError("tar.zst archives need the zstandard package (pip install zstandard)")
+        with open(path, "rb") as raw, zstandard.ZstdDecompressor().stream_reader(raw) as stream, \
+                tarfile.open(fileobj=stream, mode="r|") as archive:
+            for info in archive:
+                if info.isfile():
+                    yield info.name, archive.extractfile(info)
+    else:
+        raise ValueError(f"Unknown archive format: {path}")
+
+def read_member(path, name: str) -> Optional[bytes]:
+    """Content of one member (stops reading once found), None when missing"""
+    for member_name, member in iter_members(path):
+        if member_name == name:
+            return member.read()
+    return None
+
+def extract_archive(path, destination) -> List[str]:
+    """Extract every file member under destination (names escaping it are rejected)"""
+    destination = Path(destination).resolve()
+    names = []
+    for name, member in iter_members(path):
+        target = (destination / name).resolve()
+        if destination not in target.parents:
+            raise ValueError(f"Unsafe member path in archive: {name}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "wb") as f:
+            shutil.copyfileobj(member, f, 1024 * 1024)
+        names.append(name)
+    return names
+
+def extract_verified(path, select: Callable[[str], Optional[Path]],
+                     block_size: int = 1024 * 1024) -> Dict[str, Tuple[Path, Path]]:
+    """
+    Stream only the selected members to temp files beside their targets and verify them
+
+    ``select(name)`` returns the target path of a member to restore, or None to skip
+    it. Each selected member is written to a hidden sibling of its target while its
+    SHA-256 is computed, then checked against the archive's MANIFEST_NAME. Nothing is
+    renamed here; on any failure the temp files are removed.
+
+    Returns:
+        {name: (temp_path, target)}
+    """
+    extracted = {}
+    checksums = {}
+    manifest = None
+    temp_paths = []
+    try:
+        for name, member in iter_members(path):
+            if name == MANIFEST_NAME:
+                manifest = json.loads(member.read())["members"]
+                continue
+            target = select(name)
+            if target is None:
+                continue
+
+            target = Path(target)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = target.with_name(f".{target.name}.restore")
+            temp_paths.append(temp_path)
+            with open(temp_path, "wb") as f:
+                output = _HashingWriter(f)
+                shutil.copyfileobj(member, output, block_size)
+                f.flush()
+                os.fsync(f.fileno())
+            extracted[name] = (temp_path, target)
+            checksums[name] = output.checksum()
+
+        if manifest is None:
+            # Archives written before manifests existed: zip members are still CRC-checked on read
+            logger.warning(f"{Path(path).name} has no {MANIFEST_NAME}, restoring without checksum verification")
+        else:
+            for name, checksum in checksums.items():
+                if manifest.get(name) != checksum:
+                    raise ValueError(f"Checksum mismatch for {name} in {Path(path).name}")
+    except BaseException:
+        for temp_path in temp_paths:
+            if temp_path.exists():
+                temp_path.unlink()
+        raise
+    return extracted
@@ -85,7 +85,11 @@ class BackupScheduler:
         try:
             logger.info(f"Starting scheduled {backup_type} backup")
             
-            success, result = await backup_service.create_full_backup(backup_type)
+            if backup_type == "daily":
+                # Daily runs only store what changed; weekly stays a self-contained ZIP
+                success, result = await backup_service.create_incremental_backup(backup_type)
+            else:
+                success, result = await backup_service.create_full_backup(backup_type)
             
             if success:
                 self.backup_stats["successful_backups"] += 1
@@ -4,23 +4,70 @@ Provides comprehensive data backup and recovery functionality
 """
 
 import os
+import gzip
+import hashlib
 import json
 import sqlite3
 import shutil
-import zipfile
+import time
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 import asyncio
 
+from config.settings import settings
 from ..utils.logger import app_logger
+from .backup_archive import (ARCHIVE_EXTENSIONS, ArchiveMember, archive_files, available_formats, build_archive,
+                             extract_verified, read_member)
+from .backup_store import ChunkStore
+
+try:
+    import fcntl
+except ImportError:  # Windows: no reflinks, hardlink or copy instead
+    fcntl = None
 
 logger = app_logger
 
+# Linux ioctl cloning a file's extents (reflink) on btrfs, XFS and similar
+FICLONE = 0x40049409
+
 class BackupService:
     """Service for handling data backup and restore operations"""
     
+    CONFIG_FILES = [
+        "config/settings.py",
+        "requirements.txt",
+        "requirements-dev.txt"
+    ]
+    
+    DATA_FILES = [
+        "data/quotes.json",
+        "data/tips.json"
+    ]
+    
+    # Retention policy (days)
+    RETENTION_DAYS = {
+        "daily": 7,      # Keep 7 daily backups
+        "weekly": 4,     # Keep 4 weekly backups
+        "manual": 10,    # Keep 10 manual backups
+        "emergency": 3   # Keep 3 emergency backups
+    }
+    
+    # Tables exported to NDJSON (missing legacy tables are skipped)
+    EXPORT_TABLES = [
+        "users",
+        "journal_entries",
+        "mood_entries",
+        "check_ins",
+        "relapse_records",
+        "user_settings",
+        "streaks"
+    ]
+    
+    # Name of the database inside incremental snapshots
+    SNAPSHOT_DATABASE = "database/pmo_recovery.db"
+    
     def __init__(self, db_path: str = "data/pmo_recovery.db"):
         self.db_path = db_path
         self.backup_dir = Path("backups")
@@ -31,206 +78,339 @@ class BackupService:
         (self.backup_dir / "weekly").mkdir(exist_ok=True)
         (self.backup_dir / "manual").mkdir(exist_ok=True)
         (self.backup_dir / "emergency").mkdir(exist_ok=True)
+        
+        # Serializes incremental snapshots and chunk garbage collection
+        self._store_lock = asyncio.Lock()
+    
+    @property
+    def chunk_store(self) -> ChunkStore:
+        """Content-addressed store for incremental backups (under backup_dir/store)"""
+        return ChunkStore(self.backup_dir / "store", settings.BACKUP_CHUNK_SIZE)
     
-    async def create_full_backup(self, backup_type: str = "manual") -> Tuple[bool, str]:
+    async def create_full_backup(self, backup_type: str = "manual",
+                                 progress: Optional[Callable[[int, int], None]] = None,
+                                 archive_format: Optional[str] = None) -> Tuple[bool, str]:
         """
         Create a complete backup of all bot data
         
         Args:
             backup_type: Type of backup (daily, weekly, manual, emergency)
+            progress: Optional callback(copied_pages, total_pages) for the database
+                snapshot; called from the worker thread
+            archive_format: "zip" or "tar.zst" (default BACKUP_ARCHIVE_FORMAT)
             
         Returns:
             Tuple of (success, backup_path or error_message)
         """
         try:
+            archive_format = self._archive_format(archive_format)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_name = f"pmo_recovery_backup_{backup_type}_{timestamp}"
-            backup_path = self.backup_dir / backup_type / f"{backup_name}.zip"
+            backup_path = self.backup_dir / backup_type / f"{backup_name}{ARCHIVE_EXTENSIONS[archive_format]}"
             
             logger.info(f"Starting {backup_type} backup: {backup_name}")
             
-            # Create temporary directory for backup files
-            temp_dir = Path(f"temp_backup_{timestamp}")
-            temp_dir.mkdir(exist_ok=True)
+            # The database snapshot is the only file written before the archive
+            snapshot_path = self.backup_dir / backup_type / f".{backup_name}.db"
             
             try:
-                # 1. Backup database
-                await self._backup_database(temp_dir)
-                
-                # 2. Backup configuration files
-                await self._backup_config_files(temp_dir)
-                
-                # 3. Backup data files (quotes, tips)
-                await self._backup_data_files(temp_dir)
+                # 1. Database snapshot, SQL dump and NDJSON export
+                members = await self._database_members(snapshot_path, progress)
                 
-                # 4. Backup logs (last 30 days)
-                await self._backup_recent_logs(temp_dir)
+                # 2. Configuration files, data files (quotes, tips) and logs (last 30 days)
+                members += self._file_members()
                 
-                # 5. Create backup metadata
-                await self._create_backup_metadata(temp_dir, backup_type)
+                # 3. Backup metadata (first member, so it can be read without scanning the archive)
+                members.insert(0, await self._metadata_member(backup_type, members))
                 
-                # 6. Create ZIP archive
-                await self._create_zip_archive(temp_dir, backup_path)
-                
-                # 7. Cleanup temporary directory
-                shutil.rmtree(temp_dir)
-                
-                # 8. Cleanup old backups
-                await self._cleanup_old_backups(backup_type)
-                
-                logger.info(f"Backup completed successfully: {backup_path}")
-                return True, str(backup_path)
-                
-            except Exception as e:
-                # Cleanup on error
-                if temp_dir.exists():
-                    shutil.rmtree(temp_dir)
-                raise e
+                # 4. Stream everything into the archive
+                await asyncio.to_thread(
+                    build_archive, backup_path, members, archive_format,
+                    settings.BACKUP_COMPRESSION_WORKERS or None
+                )
+            finally:
+                if snapshot_path.exists():
+                    snapshot_path.unlink()
+            
+            # 5. Cleanup old backups
+            await self._cleanup_old_backups(backup_type)
+            
+            logger.info(f"Backup completed successfully: {backup_path}")
+            return True, str(backup_path)
                 
         except Exception as e:
             error_msg = f"Backup failed: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
     
-    async def _backup_database(self, temp_dir: Path) -> None:
-        """Backup the SQLite database with integrity check"""
+    @staticmethod
+    def _archive_format(archive_format: Optional[str] = None) -> str:
+        """Requested archive format, falling back to zip when zstandard is not installed"""
+        archive_format = (archive_format or settings.BACKUP_ARCHIVE_FORMAT).lower()
+        if archive_format not in ARCHIVE_EXTENSIONS:
+            raise ValueError(f"Unknown BACKUP_ARCHIVE_FORMAT: {archive_format}")
+        if archive_format not in available_formats():
+            logger.warning(f"{archive_format} backups need the zstandard package, using zip")
+            return "zip"
+        return archive_format
+    
+    async def _database_members(self, snapshot_path: Path,
+                                progress: Optional[Callable[[int, int], None]] = None) -> List[ArchiveMember]:
+        """Snapshot the live SQLite database without blocking the event loop, verify it and list its members"""
         if not os.path.exists(self.db_path):
             logger.warning("Database file not found, skipping database backup")
-            return
-        
-        # Check database integrity before backup
-        if not await self._check_database_integrity():
-            raise Exception("Database integrity check failed")
+            return []
         
-        # Create database backup
-        db_backup_path = temp_dir / "database"
-        db_backup_path.mkdir(exist_ok=True)
+        # Online backup API: consistent even while the bot keeps writing
+        report = await asyncio.to_thread(self._snapshot_database, snapshot_path, progress)
+        logger.info(f"Database snapshot: {report['pages']} pages in {report['steps']} steps, "
+                    f"{report['seconds']:.1f}s")
         
-        # Copy main database
-        shutil.copy2(self.db_path, db_backup_path / "pmo_recovery.db")
-        
-        # Export database to SQL format for additional safety
-        await self._export_database_to_sql(db_backup_path / "pmo_recovery_export.sql")
-        
-        # Export user data to JSON for human-readable backup
-        await self._export_user_data_to_json(db_backup_path / "user_data_export.json")
-        
-        logger.info("Database backup completed")
-    
-    async def _backup_config_files(self, temp_dir: Path) -> None:
-        """Backup configuration files"""
-        config_backup_path = temp_dir / "config"
-        config_backup_path.mkdir(exist_ok=True)
+        # Check the snapshot rather than the live file, so the check does not compete with bot traffic
+        if not await self._check_database_integrity(str(snapshot_path)):
+            raise Exception("Database integrity check failed")
         
-        config_files = [
-            "config/settings.py",
-            "requirements.txt",
-            "requirements-dev.txt"
+        source = str(snapshot_path)
+        members = [
+            ArchiveMember("database/pmo_recovery.db", path=snapshot_path),
+            # SQL format for additional safety
+            ArchiveMember("database/pmo_recovery_export.sql",
+                          writer=lambda f: self._write_sql_dump(f, source))
         ]
         
-        for config_file in config_files:
-            if os.path.exists(config_file):
-                shutil.copy2(config_file, config_backup_path / os.path.basename(config_file))
-        
-        logger.info("Configuration files backup completed")
+        # NDJSON per table for human-readable backup
+        suffix = ".ndjson.gz" if settings.BACKUP_EXPORT_COMPRESSION.lower() == "gzip" else ".ndjson"
+        for table in await asyncio.to_thread(self._export_tables, source):
+            members.append(ArchiveMember(
+                f"database/export/{table}{suffix}",
+                writer=lambda f, table=table: self._write_table_ndjson(f, source, table)
+            ))
+        return members
     
-    async def _backup_data_files(self, temp_dir: Path) -> None:
-        """Backup data files (quotes, tips, etc.)"""
-        data_backup_path = temp_dir / "data"
-        data_backup_path.mkdir(exist_ok=True)
-        
-        data_files = [
-            "data/quotes.json",
-            "data/tips.json"
-        ]
+    def _snapshot_database(self, destination: Path,
+                           progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """
+        Copy the live database with the SQLite online backup API (blocking, run in a worker thread)
         
-        for data_file in data_files:
-            if os.path.exists(data_file):
-                shutil.copy2(data_file, data_backup_path / os.path.basename(data_file))
+        Copies BACKUP_PAGES_PER_STEP pages per step and sleeps BACKUP_STEP_SLEEP seconds
+        between steps so bot writes are not starved. In WAL mode one read transaction is
+        held for the whole copy: the snapshot is a single point in time and concurrent
+        commits never force the backup to restart.
         
-        logger.info("Data files backup completed")
+        Returns:
+            Dict with pages, steps and seconds
+        """
+        pages_per_step = max(1, settings.BACKUP_PAGES_PER_STEP)
+        step_sleep = max(0.0, settings.BACKUP_STEP_SLEEP)
+        destination = Path(destination)
+        if destination.exists():
+            destination.unlink()
+        
+        steps = 0
+        next_report = 0.0
+        
+        def on_step(status, remaining, total):
+            nonlocal steps, next_report
+            steps += 1
+            copied = total - remaining
+            if progress:
+                progress(copied, total)
+            if total and copied / total >= next_report:
+                logger.debug(f"Database snapshot {copied}/{total} pages")
+                next_report = copied / total + 0.1
+            if remaining and step_sleep:
+                time.sleep(step_sleep)
+        
+        started_at = time.monotonic()
+        source = sqlite3.connect(self.db_path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                                 isolation_level=None)
+        target = sqlite3.connect(str(destination))
+        try:
+            if source.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal":
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            source.backup(target, pages=pages_per_step, progress=on_step, sleep=step_sleep)
+            pages = target.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            if source.in_transaction:
+                source.execute("COMMIT")
+            source.close()
+            target.close()
+        
+        return {"pages": pages, "steps": steps, "seconds": time.monotonic() - started_at}
     
-    async def _backup_recent_logs(self, temp_dir: Path) -> None:
-        """Backup recent log files (last 30 days)"""
-        logs_backup_path = temp_dir / "logs"
-        logs_backup_path.mkdir(exist_ok=True)
+    def _file_members(self) -> List[ArchiveMember]:
+        """Configuration files, data files and log files from the last 30 days"""
+        members = [ArchiveMember(f"config/{os.path.basename(path)}", path=Path(path))
+                   for path in self.CONFIG_FILES if os.path.exists(path)]
+        members += [ArchiveMember(f"data/{os.path.basename(path)}", path=Path(path))
+                    for path in self.DATA_FILES if os.path.exists(path)]
         
         logs_dir = Path("logs")
-        if not logs_dir.exists():
-            return
-        
-        # Get log files from last 30 days
-        thirty_days_ago = datetime.now().timestamp() - (30 * 24 * 60 * 60)
-        
-        for log_file in logs_dir.glob("*.log"):
-            if log_file.stat().st_mtime > thirty_days_ago:
-                shutil.copy2(log_file, logs_backup_path / log_file.name)
-        
-        logger.info("Recent logs backup completed")
+        if logs_dir.exists():
+            thirty_days_ago = datetime.now().timestamp() - (30 * 24 * 60 * 60)
+            members += [ArchiveMember(f"logs/{log_file.name}", path=log_file)
+                        for log_file in logs_dir.glob("*.log") if log_file.stat().st_mtime > thirty_days_ago]
+        return members
     
-    async def _create_backup_metadata(self, temp_dir: Path, backup_type: str) -> None:
-        """Create backup metadata file"""
+    async def _metadata_member(self, backup_type: str, members: List[ArchiveMember]) -> ArchiveMember:
+        """Backup metadata listing every other member"""
         metadata = {
             "backup_type": backup_type,
             "created_at": datetime.now().isoformat(),
             "bot_version": "1.0.0",  # You can make this dynamic
             "database_path": self.db_path,
-            "files_included": [],
+            "files_included": [member.name for member in members],
             "user_count": await self._get_user_count(),
             "journal_entries_count": await self._get_journal_entries_count(),
             "database_size_mb": self._get_file_size_mb(self.db_path) if os.path.exists(self.db_path) else 0
         }
-        
-        # List all files included in backup
-        for root, dirs, files in os.walk(temp_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                relative_path = os.path.relpath(file_path, temp_dir)
-                metadata["files_included"].append(relative_path)
-        
-        metadata_file = temp_dir / "backup_metadata.json"
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
-        
-        logger.info("Backup metadata created")
-    
-    async def _create_zip_archive(self, temp_dir: Path, backup_path: Path) -> None:
-        """Create ZIP archive from temporary directory"""
-        with zipfile.ZipFile(backup_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arc_name = os.path.relpath(file_path, temp_dir)
-                    zipf.write(file_path, arc_name)
-        
-        logger.info(f"ZIP archive created: {backup_path}")
+        data = json.dumps(metadata, indent=2, ensure_ascii=False).encode("utf-8")
+        return ArchiveMember("backup_metadata.json", writer=lambda f: f.write(data))
     
     async def _cleanup_old_backups(self, backup_type: str) -> None:
         """Remove old backups based on retention policy"""
         backup_folder = self.backup_dir / backup_type
-        
-        # Retention policy
-        retention_days = {
-            "daily": 7,      # Keep 7 daily backups
-            "weekly": 4,     # Keep 4 weekly backups
-            "manual": 10,    # Keep 10 manual backups
-            "emergency": 3   # Keep 3 emergency backups
-        }
-        
-        days_to_keep = retention_days.get(backup_type, 7)
+        days_to_keep = self.RETENTION_DAYS.get(backup_type, 7)
         cutoff_time = datetime.now().timestamp() - (days_to_keep * 24 * 60 * 60)
         
-        for backup_file in backup_folder.glob("*.zip"):
+        for backup_file in archive_files(backup_folder):
             if backup_file.stat().st_mtime < cutoff_time:
                 backup_file.unlink()
                 logger.info(f"Removed old backup: {backup_file}")
+        
+        # Files replaced by earlier restores
+        for snapshot_dir in backup_folder.glob("pre_restore_*"):
+            if snapshot_dir.stat().st_mtime < cutoff_time:
+                shutil.rmtree(snapshot_dir)
+                logger.info(f"Removed old pre-restore snapshot: {snapshot_dir}")
+    
+    async def create_incremental_backup(self, backup_type: str = "daily",
+                                        progress: Optional[Callable[[int, int], None]] = None) -> Tuple[bool, str]:
+        """
+        Snapshot the database and data/config files into the chunk store
+        
+        Only chunks not stored by an earlier snapshot are written, so time and disk
+        grow with what changed since then rather than with database size.
+        
+        Args:
+            backup_type: Type of backup (daily, weekly, manual, emergency)
+            progress: Optional callback(copied_pages, total_pages) for the database snapshot
+            
+        Returns:
+            Tuple of (success, snapshot_id or error_message)
+        """
+        snapshot_id = f"{backup_type}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        store = self.chunk_store
+        work_dir = store.root / "tmp"
+        
+        try:
+            async with self._store_lock:
+                logger.info(f"Starting incremental {backup_type} backup: {snapshot_id}")
+                work_dir.mkdir(parents=True, exist_ok=True)
+                db_snapshot = work_dir / f"{snapshot_id}.db"
+                
+                try:
+                    files = {}
+                    if os.path.exists(self.db_path):
+                        await asyncio.to_thread(self._snapshot_database, db_snapshot, progress)
+                        if not await self._check_database_integrity(str(db_snapshot)):
+                            raise Exception("Database integrity check failed")
+                        files[self.SNAPSHOT_DATABASE] = db_snapshot
+                    else:
+                        logger.warning("Database file not found, skipping database backup")
+                    
+                    for path in self.CONFIG_FILES + self.DATA_FILES:
+                        if os.path.exists(path):
+                            files[path] = Path(path)
+                    
+                    metadata = {
+                        "backup_type": backup_type,
+                        "bot_version": "1.0.0",
+                        "database_path": self.db_path,
+                        "user_count": await self._get_user_count(),
+                        "journal_entries_count": await self._get_journal_entries_count()
+                    }
+                    await asyncio.to_thread(store.create_snapshot, snapshot_id, files, metadata)
+                finally:
+                    if db_snapshot.exists():
+                        db_snapshot.unlink()
+                
+                await self._cleanup_old_snapshots(store)
+            
+            logger.info(f"Incremental backup completed: {snapshot_id}")
+            return True, snapshot_id
+            
+        except Exception as e:
+            error_msg = f"Incremental backup failed: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
+    
+    async def _cleanup_old_snapshots(self, store: ChunkStore) -> None:
+        """Drop snapshots past the retention policy, then chunks nothing references any more"""
+        now = datetime.now()
+        removed = 0
+        for manifest in store.list_snapshots():
+            days_to_keep = self.RETENTION_DAYS.get(manifest.get("backup_type"), 7)
+            if (now - datetime.fromisoformat(manifest["created_at"])).total_seconds() > days_to_keep * 24 * 60 * 60:
+                store.delete_snapshot(manifest["id"])
+                logger.info(f"Removed old snapshot: {manifest['id']}")
+                removed += 1
+        if removed:
+            await asyncio.to_thread(store.collect_garbage)
+    
+    async def restore_incremental_backup(self, snapshot_id: str, confirm_restore: bool = False) -> Tuple[bool, str]:
+        """
+        Restore the database and data/config files from an incremental snapshot
+        
+        Args:
+            snapshot_id: Snapshot to restore
+            confirm_restore: Safety confirmation flag
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        if not confirm_restore:
+            return False, "Restore operation requires explicit confirmation (confirm_restore=True)"
+        
+        try:
+            store = self.chunk_store
+            manifest = store.load_manifest(snapshot_id)
+            logger.info(f"Starting restore from snapshot: {snapshot_id}")
+            
+            restored = {}
+            try:
+                for name, entry in manifest["files"].items():
+                    target = Path(self.db_path) if name == self.SNAPSHOT_DATABASE else Path(name)
+                    temp_path = target.with_name(f".{target.name}.restore")
+                    await asyncio.to_thread(store.restore_file, entry, temp_path)
+                    restored[name] = (temp_path, target)
+                
+                await self._install_restored_files(restored)
+            finally:
+                self._remove_temp_files(restored)
+            
+            success_msg = f"Restore completed successfully from snapshot {snapshot_id}"
+            logger.info(success_msg)
+            return True, success_msg
+            
+        except Exception as e:
+            error_msg = f"Restore failed: {str(e)}"
+            logger.error(error_msg)
+            return False, error_msg
     
     async def restore_from_backup(self, backup_path: str, confirm_restore: bool = False) -> Tuple[bool, str]:
         """
         Restore data from a backup file
         
+        Only the database, config and data members are extracted. They are streamed
+        into hidden files next to their targets and checked against the archive's
+        checksum manifest before anything live is touched. Files are then renamed into
+        place and the database is copied into the live file in one transaction (see
+        ``_swap_in_files``). The replaced files are kept as an emergency snapshot.
+        
         Args:
-            backup_path: Path to the backup ZIP file
+            backup_path: Path to the backup archive (zip or tar.zst)
             confirm_restore: Safety confirmation flag
             
         Returns:
@@ -246,114 +426,143 @@ class BackupService:
             
             logger.info(f"Starting restore from backup: {backup_path}")
             
-            # Create emergency backup before restore
-            emergency_backup_result = await self.create_full_backup("emergency")
-            if not emergency_backup_result[0]:
-                return False, f"Failed to create emergency backup before restore: {emergency_backup_result[1]}"
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            restore_temp_dir = Path(f"temp_restore_{timestamp}")
-            
+            restored = await asyncio.to_thread(extract_verified, backup_file, self._restore_target)
             try:
-                # Extract backup
-                with zipfile.ZipFile(backup_file, 'r') as zipf:
-                    zipf.extractall(restore_temp_dir)
-                
-                # Read backup metadata
-                metadata_file = restore_temp_dir / "backup_metadata.json"
-                if metadata_file.exists():
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                    logger.info(f"Restoring backup from {metadata['created_at']}")
-                
-                # Restore database
-                await self._restore_database(restore_temp_dir)
-                
-                # Restore configuration files
-                await self._restore_config_files(restore_temp_dir)
-                
-                # Restore data files
-                await self._restore_data_files(restore_temp_dir)
-                
-                # Cleanup temporary directory
-                shutil.rmtree(restore_temp_dir)
-                
-                success_msg = f"Restore completed successfully from {backup_path}"
-                logger.info(success_msg)
-                return True, success_msg
-                
-            except Exception as e:
-                # Cleanup on error
-                if restore_temp_dir.exists():
-                    shutil.rmtree(restore_temp_dir)
-                raise e
+                if self.SNAPSHOT_DATABASE not in restored:
+                    raise Exception("Database backup not found in archive")
+                await self._install_restored_files(restored)
+            finally:
+                self._remove_temp_files(restored)
+            
+            success_msg = f"Restore completed successfully from {backup_path}"
+            logger.info(success_msg)
+            return True, success_msg
                 
         except Exception as e:
             error_msg = f"Restore failed: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
     
-    async def _restore_database(self, restore_dir: Path) -> None:
-        """Restore database from backup"""
-        db_restore_path = restore_dir / "database" / "pmo_recovery.db"
-        
-        if not db_restore_path.exists():
-            raise Exception("Database backup not found in restore directory")
-        
-        # Create backup of current database
-        if os.path.exists(self.db_path):
-            current_db_backup = f"{self.db_path}.pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            shutil.copy2(self.db_path, current_db_backup)
-            logger.info(f"Current database backed up to: {current_db_backup}")
-        
-        # Restore database
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        shutil.copy2(db_restore_path, self.db_path)
-        
-        # Verify restored database integrity
-        if not await self._check_database_integrity():
+    def _restore_target(self, name: str) -> Optional[Path]:
+        """Where an archive member is restored to (None for members that are not restored)"""
+        if name == self.SNAPSHOT_DATABASE:
+            return Path(self.db_path)
+        
+        folder, _, filename = name.partition("/")
+        if not filename or "/" in filename:
+            return None
+        if folder == "config":
+            # settings.py goes back to config/, other config files to the project root
+            return Path("config/settings.py") if filename == "settings.py" else Path(filename)
+        if folder == "data" and filename.endswith(('.json', '.txt')):
+            return Path("data") / filename
+        return None
+    
+    async def _install_restored_files(self, restored: Dict[str, Tuple[Path, Path]]) -> None:
+        """Verify the restored database, keep the current files as an emergency snapshot and swap"""
+        database = restored.get(self.SNAPSHOT_DATABASE)
+        if database and not await self._check_database_integrity(str(database[0])):
             raise Exception("Restored database failed integrity check")
         
-        logger.info("Database restore completed")
+        emergency_dir = await asyncio.to_thread(self._swap_in_files, restored)
+        logger.info(f"Replaced files kept in emergency snapshot: {emergency_dir}")
+        if database:
+            await self._dispose_database_pools()
+        await self._cleanup_old_backups("emergency")
     
-    async def _restore_config_files(self, restore_dir: Path) -> None:
-        """Restore configuration files from backup"""
-        config_restore_path = restore_dir / "config"
-        
-        if not config_restore_path.exists():
-            logger.warning("Configuration files not found in backup")
-            return
+    def _swap_in_files(self, restored: Dict[str, Tuple[Path, Path]]) -> Path:
+        """
+        Snapshot the files about to be replaced, then put the restored files in place (blocking)
         
-        for config_file in config_restore_path.glob("*"):
-            if config_file.name == "settings.py":
-                # Special handling for settings.py
-                target_path = "config/settings.py"
-                os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                shutil.copy2(config_file, target_path)
+        Config and data files are renamed over their targets. The database is not: the
+        bot's pooled connections keep the live file open, so a renamed-in file would
+        leave them on the orphaned inode (or mixing it with the new file's -wal/-shm).
+        It is copied into the live file instead with the online backup API in a single
+        write transaction, which waits for and then holds off every other writer.
+        """
+        emergency_dir = self.backup_dir / "emergency" / f"pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        if self.SNAPSHOT_DATABASE in restored:
+            # The snapshot must hold every committed write, not just the main file
+            self._checkpoint_database()
+        
+        for name, (temp_path, target) in restored.items():
+            if target.exists():
+                method = self._snapshot_file(target, emergency_dir / name, name == self.SNAPSHOT_DATABASE)
+                logger.debug(f"Emergency snapshot of {target} ({method})")
+        
+        # Database last, once everything it may depend on is in place
+        for name in sorted(restored, key=lambda name: name == self.SNAPSHOT_DATABASE):
+            temp_path, target = restored[name]
+            if name == self.SNAPSHOT_DATABASE and target.exists():
+                self._copy_into_live_database(temp_path, target)
             else:
-                # Other config files go to root
-                shutil.copy2(config_file, config_file.name)
-        
-        logger.info("Configuration files restore completed")
+                os.replace(temp_path, target)
+        return emergency_dir
     
-    async def _restore_data_files(self, restore_dir: Path) -> None:
-        """Restore data files from backup"""
-        data_restore_path = restore_dir / "data"
-        
-        if not data_restore_path.exists():
-            logger.warning("Data files not found in backup")
-            return
+    @staticmethod
+    def _copy_into_live_database(source: Path, target: Path) -> None:
+        """Overwrite the live database with source in one write transaction (blocking)"""
+        source_conn = sqlite3.connect(source)
+        target_conn = sqlite3.connect(target, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+        try:
+            source_conn.backup(target_conn)  # pages=-1: a single step, so readers never see a mix
+        finally:
+            target_conn.close()
+            source_conn.close()
+    
+    @staticmethod
+    async def _dispose_database_pools() -> None:
+        """Close the bot's pooled connections so none keeps state from before the restore"""
+        from src.database.database import db
         
-        os.makedirs("data", exist_ok=True)
+        db.engine.dispose()
+        await db.async_engine.dispose()
+    
+    def _snapshot_file(self, source: Path, destination: Path, is_database: bool = False) -> str:
+        """
+        Keep a copy of a file about to be replaced, as cheaply as the filesystem allows
         
-        for data_file in data_restore_path.glob("*"):
-            if data_file.name.endswith(('.json', '.txt')):
-                shutil.copy2(data_file, f"data/{data_file.name}")
+        A reflink shares blocks copy-on-write; a hardlink is safe for files that are
+        renamed over rather than written into, which excludes the database. Falls back
+        to a real copy (the online backup API for the database).
         
-        logger.info("Data files restore completed")
+        Returns:
+            "reflink", "hardlink" or "copy"
+        """
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is not None:
+            try:
+                with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return "reflink"
+            except OSError:
+                destination.unlink(missing_ok=True)
+        if not is_database:
+            try:
+                os.link(source, destination)
+                return "hardlink"
+            except OSError:
+                pass
+        
+        if is_database:
+            self._snapshot_database(destination)
+        else:
+            shutil.copy2(source, destination)
+        return "copy"
+    
+    @staticmethod
+    def _remove_temp_files(restored: Dict[str, Tuple[Path, Path]]) -> None:
+        for temp_path, _ in restored.values():
+            if temp_path.exists():
+                temp_path.unlink()
     
     async def list_available_backups(self) -> Dict[str, List[Dict]]:
-        """List all available backups by type"""
+        """
+        List all available backups by type: archives and incremental snapshots
+        
+        Snapshots have ``snapshot`` set, their id as ``filename`` and no ``path``;
+        ``key`` is a short id for either kind (see find_backup).
+        """
         backups = {
             "daily": [],
             "weekly": [],
@@ -364,10 +573,12 @@ class BackupService:
         for backup_type in backups.keys():
             backup_folder = self.backup_dir / backup_type
             if backup_folder.exists():
-                for backup_file in backup_folder.glob("*.zip"):
+                for backup_file in archive_files(backup_folder):
                     backup_info = {
                         "filename": backup_file.name,
                         "path": str(backup_file),
+                        "key": self._backup_key(backup_file.name),
+                        "snapshot": False,
                         "size_mb": self._get_file_size_mb(str(backup_file)),
                         "created_at": datetime.fromtimestamp(backup_file.stat().st_mtime).isoformat(),
                         "age_days": (datetime.now().timestamp() - backup_file.stat().st_mtime) / (24 * 60 * 60)
@@ -375,25 +586,70 @@ class BackupService:
                     
                     # Try to read metadata if available
                     try:
-                        with zipfile.ZipFile(backup_file, 'r') as zipf:
-                            if 'backup_metadata.json' in zipf.namelist():
-                                with zipf.open('backup_metadata.json') as f:
-                                    metadata = json.load(f)
-                                    backup_info.update({
-                                        "user_count": metadata.get("user_count"),
-                                        "journal_entries_count": metadata.get("journal_entries_count"),
-                                        "bot_version": metadata.get("bot_version")
-                                    })
+                        raw_metadata = read_member(backup_file, 'backup_metadata.json')
+                        if raw_metadata is not None:
+                            metadata = json.loads(raw_metadata)
+                            backup_info.update({
+                                "user_count": metadata.get("user_count"),
+                                "journal_entries_count": metadata.get("journal_entries_count"),
+                                "bot_version": metadata.get("bot_version")
+                            })
                     except Exception as e:
                         logger.warning(f"Could not read metadata from {backup_file}: {e}")
                     
                     backups[backup_type].append(backup_info)
-                
-                # Sort by creation time (newest first)
-                backups[backup_type].sort(key=lambda x: x["created_at"], reverse=True)
+        
+        store = self.chunk_store
+        if store.root.exists():
+            for manifest in await asyncio.to_thread(store.list_snapshots):
+                backup_type = manifest.get("backup_type")
+                if backup_type not in backups:
+                    continue
+                created_at = datetime.fromisoformat(manifest["created_at"])
+                backups[backup_type].append({
+                    "filename": manifest["id"],
+                    "path": None,
+                    "key": self._backup_key(manifest["id"]),
+                    "snapshot": True,
+                    "size_mb": sum(entry["size"] for entry in manifest["files"].values()) / (1024 * 1024),
+                    "created_at": created_at.isoformat(),
+                    "age_days": (datetime.now() - created_at).total_seconds() / (24 * 60 * 60),
+                    "user_count": manifest.get("user_count"),
+                    "journal_entries_count": manifest.get("journal_entries_count"),
+                    "bot_version": manifest.get("bot_version")
+                })
+        
+        # Sort by creation time (newest first)
+        for backup_list in backups.values():
+            backup_list.sort(key=lambda x: x["created_at"], reverse=True)
         
         return backups
     
+    @staticmethod
+    def _backup_key(name: str) -> str:
+        """Short id of a backup, small enough for Telegram callback data"""
+        return hashlib.sha1(name.encode('utf-8')).hexdigest()[:10]
+    
+    async def find_backup(self, backup_type: str, key: str) -> Optional[Dict]:
+        """Backup of backup_type with the given key, as listed by list_available_backups"""
+        backups = await self.list_available_backups()
+        return next((backup for backup in backups.get(backup_type, []) if backup["key"] == key), None)
+    
+    async def restore_backup(self, backup: str, confirm_restore: bool = False) -> Tuple[bool, str]:
+        """
+        Restore from a backup archive path or an incremental snapshot id
+        
+        Args:
+            backup: Archive path, or the id of a snapshot in the chunk store
+            confirm_restore: Safety confirmation flag
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        if not os.path.exists(backup) and self.chunk_store.has_snapshot(backup):
+            return await self.restore_incremental_backup(backup, confirm_restore)
+        return await self.restore_from_backup(backup, confirm_restore)
+    
     async def get_backup_status(self) -> Dict:
         """Get current backup system status"""
         status = {
@@ -404,7 +660,9 @@ class BackupService:
             "database_integrity": await self._check_database_integrity(),
             "total_backups": 0,
             "latest_backup": None,
-            "backup_directory_size_mb": 0
+            "backup_directory_size_mb": 0,
+            "incremental_snapshots": 0,
+            "snapshot_store_size_mb": 0
         }
         
         # Count total backups and find latest
@@ -414,7 +672,7 @@ class BackupService:
         for backup_type in ["daily", "weekly", "manual", "emergency"]:
             backup_folder = self.backup_dir / backup_type
             if backup_folder.exists():
-                for backup_file in backup_folder.glob("*.zip"):
+                for backup_file in archive_files(backup_folder):
                     status["total_backups"] += 1
                     status["backup_directory_size_mb"] += self._get_file_size_mb(str(backup_file))
                     
@@ -431,16 +689,37 @@ class BackupService:
         if latest_backup_info:
             status["latest_backup"] = latest_backup_info
         
+        store = self.chunk_store
+        if store.root.exists():
+            status["incremental_snapshots"] = len(store.list_snapshots())
+            status["snapshot_store_size_mb"] = store.size_bytes() / (1024 * 1024)
+            status["backup_directory_size_mb"] += status["snapshot_store_size_mb"]
+        
         return status
     
     # Helper methods
-    async def _check_database_integrity(self) -> bool:
-        """Check SQLite database integrity"""
+    def _checkpoint_database(self) -> None:
+        """Move WAL content into the database file and truncate the WAL"""
         if not os.path.exists(self.db_path):
+            return
+        conn = sqlite3.connect(self.db_path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+        try:
+            busy = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+        finally:
+            conn.close()
+        if busy:
+            raise Exception("Database is busy, WAL checkpoint could not complete")
+    
+    async def _check_database_integrity(self, db_path: Optional[str] = None) -> bool:
+        """Check SQLite database integrity (the live database unless db_path is given)"""
+        return await asyncio.to_thread(self._integrity_ok, db_path or self.db_path)
+    
+    def _integrity_ok(self, db_path: str) -> bool:
+        if not os.path.exists(db_path):
             return False
         
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite3.connect(db_path)
             cursor = conn.cursor()
             cursor.execute("PRAGMA integrity_check")
             result = cursor.fetchone()
@@ -450,63 +729,66 @@ class BackupService:
             logger.error(f"Database integrity check failed: {e}")
             return False
     
-    async def _export_database_to_sql(self, output_path: str) -> None:
-        """Export database to SQL format"""
-        if not os.path.exists(self.db_path):
-            return
-        
-        conn = sqlite3.connect(self.db_path)
-        with open(output_path, 'w', encoding='utf-8') as f:
+    def _write_sql_dump(self, fileobj: BinaryIO, source_path: str) -> None:
+        """Write the database as SQL statements (streamed from iterdump)"""
+        conn = sqlite3.connect(source_path)
+        try:
+            batch = []
             for line in conn.iterdump():
-                f.write(f"{line}\n")
-        conn.close()
+                batch.append(f"{line}\n")
+                if len(batch) >= settings.BACKUP_EXPORT_BATCH_SIZE:
+                    fileobj.write("".join(batch).encode("utf-8"))
+                    batch = []
+            fileobj.write("".join(batch).encode("utf-8"))
+        finally:
+            conn.close()
     
-    async def _export_user_data_to_json(self, output_path: str) -> None:
-        """Export user data to JSON format for human-readable backup"""
-        if not os.path.exists(self.db_path):
-            return
-        
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        export_data = {
-            "users": [],
-            "journal_entries": [],
-            "user_settings": [],
-            "streaks": []
-        }
-        
-        # Export users
-        cursor.execute("SELECT * FROM users")
-        for row in cursor.fetchall():
-            export_data["users"].append(dict(row))
-        
-        # Export journal entries
-        cursor.execute("SELECT * FROM journal_entries")
-        for row in cursor.fetchall():
-            export_data["journal_entries"].append(dict(row))
-        
-        # Export user settings if table exists
+    def _export_tables(self, source_path: str) -> List[str]:
+        """EXPORT_TABLES present in the database (missing legacy tables are skipped)"""
+        conn = sqlite3.connect(source_path)
         try:
-            cursor.execute("SELECT * FROM user_settings")
-            for row in cursor.fetchall():
-                export_data["user_settings"].append(dict(row))
-        except sqlite3.OperationalError:
-            pass  # Table doesn't exist
+            existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        finally:
+            conn.close()
+        return [table for table in self.EXPORT_TABLES if table in existing]
+    
+    def _write_table_ndjson(self, fileobj: BinaryIO, source_path: str, table: str) -> int:
+        """
+        Stream one table as NDJSON, gzip-compressed while writing unless BACKUP_EXPORT_COMPRESSION=none
         
-        # Export streaks if table exists
-        try:
-            cursor.execute("SELECT * FROM streaks")
-            for row in cursor.fetchall():
-                export_data["streaks"].append(dict(row))
-        except sqlite3.OperationalError:
-            pass  # Table doesn't exist
+        Rows are fetched BACKUP_EXPORT_BATCH_SIZE at a time and written as they arrive,
+        so memory stays flat regardless of table size.
         
-        conn.close()
+        Returns:
+            Rows written
+        """
+        compression = settings.BACKUP_EXPORT_COMPRESSION.lower()
+        if compression not in ("gzip", "none"):
+            raise ValueError(f"Unknown BACKUP_EXPORT_COMPRESSION: {compression}")
+        batch_size = max(1, settings.BACKUP_EXPORT_BATCH_SIZE)
+        count = 0
+        
+        conn = sqlite3.connect(source_path)
+        output = gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=6) if compression == "gzip" else fileobj
+        try:
+            cursor = conn.execute(f'SELECT * FROM "{table}"')
+            columns = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                output.write("".join(
+                    json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + "\n"
+                    for row in rows
+                ).encode("utf-8"))
+                count += len(rows)
+        finally:
+            if output is not fileobj:
+                output.close()
+            conn.close()
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False, default=str)
+        logger.debug(f"Exported {count} rows from {table} to NDJSON")
+        return count
     
     async def _get_user_count(self) -> int:
         """Get total number of users"""
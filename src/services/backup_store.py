@@ -0,0 +1,208 @@
+"""
+Content-addressed chunk store for incremental backups
+
+Files are split into fixed-size chunks named by their SHA-256; a chunk already in
+the store is never written again, so a snapshot only costs the chunks that changed
+since any earlier snapshot. Each snapshot is a JSON manifest listing, per file, its
+size, checksum and chunk hashes.
+
+Fixed-size chunks fit SQLite well: the online backup API copies the database page
+for page, so an unchanged page sits at the same offset in every snapshot.
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ..utils.logger import app_logger
+
+logger = app_logger
+
+# zlib level for stored chunks (only new chunks are compressed)
+COMPRESSION_LEVEL = 6
+
+class ChunkStore:
+    """Chunks under ``root/chunks/<aa>/<sha256>``, manifests under ``root/manifests/<id>.json``"""
+
+    def __init__(self, root, chunk_size: int = 256 * 1024):
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+        self.chunks_dir = self.root / "chunks"
+        self.manifests_dir = self.root / "manifests"
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest
+
+    def _manifest_path(self, snapshot_id: str) -> Path:
+        return self.manifests_dir / f"{snapshot_id}.json"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        """Write to a sibling temp file and rename, so readers never see a partial file"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    def put_file(self, source, stats: Optional[Dict] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """
+        Store one file chunk by chunk (blocking)
+
+        Args:
+            source: File to read
+            stats: Optional dict whose new_chunks / new_bytes counters are increased
+            progress: Optional callback(bytes_read, file_size)
+
+        Returns:
+            Manifest entry: size, sha256 and chunk hashes
+        """
+        source = Path(source)
+        size = source.stat().st_size
+        file_hash = hashlib.sha256()
+        chunks = []
+        read = 0
+        with open(source, 'rb') as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                file_hash.update(data)
+                digest = hashlib.sha256(data).hexdigest()
+                chunk_path = self._chunk_path(digest)
+                if not chunk_path.exists():
+                    stored = zlib.compress(data, COMPRESSION_LEVEL)
+                    self._write_atomic(chunk_path, stored)
+                    if stats is not None:
+                        stats['new_chunks'] = stats.get('new_chunks', 0) + 1
+                        stats['new_bytes'] = stats.get('new_bytes', 0) + len(stored)
+                chunks.append(digest)
+                read += len(data)
+                if progress:
+                    progress(read, size)
+        return {'size': read, 'sha256': file_hash.hexdigest(), 'chunks': chunks}
+
+    def create_snapshot(self, snapshot_id: str, files: Dict[str, Path], metadata: Optional[Dict] = None,
+                        progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """
+        Store files and write the snapshot manifest (blocking)
+
+        Args:
+            snapshot_id: Manifest name, unique within the store
+            files: Name in the snapshot -> file on disk
+            metadata: Extra fields saved in the manifest
+        """
+        if self._manifest_path(snapshot_id).exists():
+            raise ValueError(f"Snapshot already exists: {snapshot_id}")
+
+        stats = {'new_chunks': 0, 'new_bytes': 0}
+        entries = {name: self.put_file(path, stats, progress) for name, path in files.items()}
+        manifest = {
+            'id': snapshot_id,
+            'created_at': datetime.now().isoformat(),
+            'chunk_size': self.chunk_size,
+            'files': entries,
+            'new_chunks': stats['new_chunks'],
+            'new_bytes': stats['new_bytes'],
+            **(metadata or {})
+        }
+        # Manifest last: a snapshot exists only once all of its chunks do
+        self._write_atomic(self._manifest_path(snapshot_id),
+                           json.dumps(manifest, indent=1, ensure_ascii=False).encode('utf-8'))
+        total = sum(entry['size'] for entry in entries.values())
+        logger.info(f"Snapshot {snapshot_id}: {len(entries)} files, {total / (1024 * 1024):.1f} MB, "
+                    f"{stats['new_chunks']} new chunks ({stats['new_bytes'] / (1024 * 1024):.2f} MB stored)")
+        return manifest
+
+    def has_snapshot(self, snapshot_id: str) -> bool:
+        return Path(snapshot_id).name == snapshot_id and self._manifest_path(snapshot_id).exists()
+
+    def load_manifest(self, snapshot_id: str) -> Dict:
+        path = self._manifest_path(snapshot_id)
+        if not path.exists():
+            raise FileNotFoundError(f"Snapshot not found: {snapshot_id}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def list_snapshots(self) -> List[Dict]:
+        """Manifests, newest first"""
+        manifests = []
+        for path in self.manifests_dir.glob("*.json"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    manifests.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read snapshot manifest {path}: {e}")
+        manifests.sort(key=lambda manifest: manifest['created_at'], reverse=True)
+        return manifests
+
+    def read_chunks(self, entry: Dict) -> Iterable[bytes]:
+        """Chunks of one manifest entry, each verified against its hash"""
+        for digest in entry['chunks']:
+            with open(self._chunk_path(digest), 'rb') as f:
+                data = zlib.decompress(f.read())
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise ValueError(f"Chunk {digest} is corrupted")
+            yield data
+
+    def restore_file(self, entry: Dict, destination) -> Path:
+        """
+        Reassemble one file from its chunks (blocking)
+
+        Written to a sibling temp file, checked against the manifest size and checksum,
+        then renamed over ``destination``.
+        """
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = destination.with_name(f".{destination.name}.restore")
+        file_hash = hashlib.sha256()
+        size = 0
+        try:
+            with open(temp_path, 'wb') as f:
+                for data in self.read_chunks(entry):
+                    file_hash.update(data)
+                    size += len(data)
+                    f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            if size != entry['size'] or file_hash.hexdigest() != entry['sha256']:
+                raise ValueError(f"Restored file {destination.name} does not match its manifest checksum")
+            os.replace(temp_path, destination)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        return destination
+
+    def delete_snapshot(self, snapshot_id: str):
+        """Remove a manifest (its chunks go on the next collect_garbage)"""
+        path = self._manifest_path(snapshot_id)
+        if path.exists():
+            path.unlink()
+
+    def collect_garbage(self) -> int:
+        """Delete chunks no manifest references; returns the number removed"""
+        referenced = {
+            digest
+            for manifest in self.list_snapshots()
+            for entry in manifest['files'].values()
+            for digest in entry['chunks']
+        }
+        removed = 0
+        for chunk_path in self.chunks_dir.glob("*/*"):
+            if chunk_path.name not in referenced and not chunk_path.name.endswith(".tmp"):
+                chunk_path.unlink()
+                removed += 1
+        if removed:
+            logger.info(f"Removed {removed} unreferenced backup chunks")
+        return removed
+
+    def size_bytes(self) -> int:
+        """Disk used by chunks and manifests"""
+        return sum(path.stat().st_size for path in self.root.rglob("*") if path.is_file())
@@ -2,53 +2,73 @@ from datetime import datetime, time
 from typing import List, Dict
 import random
 from src.services import UserService, MotivationalService
+from src.services.delivery_service import DeliveryEngine
 from src.utils.logger import app_logger
 from config.settings import settings
 
 class BroadcastService:
     """Service untuk mengirim broadcast harian kepada users"""
     
+    DAILY_FALLBACK_TEXT = "🌅 Daily Recovery Reminder - Stay strong and keep going! 💪"
+    
     def __init__(self, bot_application=None):
         self.bot_application = bot_application
         self.user_service = UserService()
         self.motivational_service = MotivationalService()
         
-    async def send_daily_broadcast(self):
-        """Send daily broadcast to all users with reminders enabled"""
+    async def send_daily_broadcast(self, bot=None, slots: List[tuple] = None) -> Dict:
+        """
+        Send daily broadcast to users with reminders enabled
+        
+        Args:
+            bot: Bot used for delivery (defaults to the application bot)
+            slots: Only send to these (timezone, reminder_time) pairs; all users if None
+        """
         try:
-            # Get all users with daily reminders enabled
-            users = self.user_service.get_all_users_with_reminders()
-            
-            if not users:
-                app_logger.info("No users with daily reminders enabled")
-                return
+            # Stream users with daily reminders enabled, flagged with today's mood check-in status
+            audience = self.user_service.iter_users_with_reminders(include_checkin_status=True, slots=slots)
             
             # Generate daily content
             broadcast_content = self._generate_daily_content()
             
-            # Get users who haven't checked in today for mood prompts
-            users_without_checkin = self.user_service.get_users_without_checkin_today()
+            def build_payload(user):
+                # Prompt mood check-in only for users who haven't checked in today
+                return self._build_personalized_broadcast(
+                    user.telegram_id, broadcast_content, not user.checked_in_today
+                )
             
-            sent_count = 0
-            failed_count = 0
+            return await self._get_delivery_engine(bot).broadcast(
+                audience, build_payload,
+                job_name="Daily broadcast",
+                fallback_text=self.DAILY_FALLBACK_TEXT
+            )
             
-            for user in users:
-                try:
-                    # Check if user needs mood check-in prompt
-                    needs_mood_checkin = user.telegram_id in [u.telegram_id for u in users_without_checkin]
-                    
-                    # Send personalized broadcast
-                    await self._send_personalized_broadcast(user.telegram_id, broadcast_content, needs_mood_checkin)
-                    sent_count += 1
-                    app_logger.debug(f"Daily broadcast sent to user {user.telegram_id}")
-                except Exception as e:
-                    failed_count += 1
-                    app_logger.error(f"Failed to send broadcast to user {user.telegram_id}: {e}")
+        except Exception as e:
+            app_logger.error(f"Error in daily broadcast: {e}")
+            return {}
+    
+    async def send_text_broadcast(self, text: str, job_name: str = "Text broadcast", bot=None) -> Dict:
+        """Send the same Markdown text to all users with reminders enabled"""
+        try:
+            users = self.user_service.iter_users_with_reminders()
             
-            app_logger.info(f"Daily broadcast completed: {sent_count} sent, {failed_count} failed")
+            return await self._get_delivery_engine(bot).broadcast(
+                users,
+                lambda user: {'chat_id': user.telegram_id, 'text': text, 'parse_mode': 'Markdown'},
+                job_name=job_name
+            )
             
         except Exception as e:
-            app_logger.error(f"Error in daily broadcast: {e}")
+            app_logger.error(f"Error in {job_name}: {e}")
+            return {}
+    
+    def _get_delivery_engine(self, bot=None) -> DeliveryEngine:
+        """Create a delivery engine bound to the given bot or the application bot"""
+        if bot is None:
+            if self.bot_application is None:
+                raise RuntimeError("BroadcastService needs a bot application to deliver messages")
+            bot = self.bot_application.bot
+        return DeliveryEngine(bot)
     
     def _generate_daily_content(self) -> Dict:
         """Generate daily broadcast content"""
@@ -230,63 +250,53 @@ class BroadcastService:
         
         return random.choice(ctas)
     
-    async def _send_personalized_broadcast(self, telegram_id: int, content: Dict, needs_mood_checkin: bool = False):
-        """Send personalized broadcast message with mood check-in if needed"""
+    def _build_personalized_broadcast(self, telegram_id: int, content: Dict, needs_mood_checkin: bool = False) -> Dict:
+        """Build personalized broadcast payload with mood check-in prompt if needed"""
         from telegram import InlineKeyboardButton, InlineKeyboardMarkup
         
-        try:
-            # Format the base message
-            message = self._format_daily_message(content)
+        # Format the base message
+        message = self._format_daily_message(content)
+        
+        # Create base keyboard
+        keyboard = [
+            [
+                InlineKeyboardButton("💪 Daily Goals", callback_data="daily_goals"),
+                InlineKeyboardButton("📊 My Progress", callback_data="check_progress")
+            ],
+            [
+                InlineKeyboardButton("🎯 Coping Tools", callback_data="coping_strategies"),
+                InlineKeyboardButton("🆘 Need Help?", callback_data="emergency_help")
+            ]
+        ]
+        
+        # Add mood check-in prompt if user hasn't checked in today
+        if needs_mood_checkin:
+            mood_message = (
+                "\n\n🌡️ **Daily Mood Check-in**\n"
+                "Belum mood check-in hari ini? Yuk track perasaanmu untuk recovery insights yang better!\n\n"
+                "💡 **Quick tip:** Regular mood tracking helps identify patterns dan triggers. "
+                "Consistency is key untuk sustainable recovery! 🔑"
+            )
+            message += mood_message
             
-            # Create base keyboard
-            keyboard = [
-                [
-                    InlineKeyboardButton("💪 Daily Goals", callback_data="daily_goals"),
-                    InlineKeyboardButton("📊 My Progress", callback_data="check_progress")
-                ],
+            # Add mood check-in buttons at the top
+            mood_keyboard = [
                 [
-                    InlineKeyboardButton("🎯 Coping Tools", callback_data="coping_strategies"),
-                    InlineKeyboardButton("🆘 Need Help?", callback_data="emergency_help")
+                    InlineKeyboardButton("🌡️ Quick Check-in", callback_data="quick_mood_checkin"),
+                    InlineKeyboardButton("📝 Detail Check-in", callback_data="detailed_mood_checkin")
                 ]
             ]
-            
-            # Add mood check-in prompt if user hasn't checked in today
-            if needs_mood_checkin:
-                mood_message = (
-                    "\n\n🌡️ **Daily Mood Check-in**\n"
-                    "Belum mood check-in hari ini? Yuk track perasaanmu untuk recovery insights yang better!\n\n"
-                    "💡 **Quick tip:** Regular mood tracking helps identify patterns dan triggers. "
-                    "Consistency is key untuk sustainable recovery! 🔑"
-                )
-                message += mood_message
-                
-                # Add mood check-in buttons at the top
-                mood_keyboard = [
-                    [
-                        InlineKeyboardButton("🌡️ Quick Check-in", callback_data="quick_mood_checkin"),
-                        InlineKeyboardButton("📝 Detail Check-in", callback_data="detailed_mood_checkin")
-                    ]
-                ]
-                keyboard = mood_keyboard + keyboard
-            
-            # Send message with keyboard
-            await self.bot_application.bot.send_message(
-                chat_id=telegram_id,
-                text=message,
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode='Markdown'
-            )
-            
-        except Exception as e:
-            app_logger.error(f"Error sending personalized broadcast to user {telegram_id}: {e}")
-            # Fallback to simple message
-            await self.bot_application.bot.send_message(
-                chat_id=telegram_id,
-                text="🌅 Daily Recovery Reminder - Stay strong and keep going! 💪"
-            )
-
-    async def _send_message_to_user(self, telegram_id: int, content: Dict):
-        """Send formatted message to specific user"""
+            keyboard = mood_keyboard + keyboard
+        
+        return {
+            'chat_id': telegram_id,
+            'text': message,
+            'reply_markup': InlineKeyboardMarkup(keyboard),
+            'parse_mode': 'Markdown'
+        }
+    
+    def _build_user_message(self, telegram_id: int, content: Dict) -> Dict:
+        """Build formatted message payload for specific user"""
         
         # Format the complete message
         message = f"""
@@ -326,37 +336,38 @@ class BroadcastService:
 **Remember: Every day clean adalah victory. Kamu doing amazing! 🙏**
         """
         
-        # Send the message
-        await self.bot_application.bot.send_message(
-            chat_id=telegram_id,
-            text=message.strip(),
-            parse_mode='Markdown'
-        )
+        return {
+            'chat_id': telegram_id,
+            'text': message.strip(),
+            'parse_mode': 'Markdown'
+        }
     
-    async def send_weekly_summary(self):
+    async def send_weekly_summary(self, bot=None) -> Dict:
         """Send weekly summary to all users (Sunday evening)"""
         try:
-            users = self.user_service.get_all_users_with_reminders()
+            users = self.user_service.iter_users_with_reminders()
             
             weekly_content = self._generate_weekly_summary()
+            summary_content = {
+                "greeting": "📊 **Weekly Recovery Summary**",
+                "date": f"Week of {datetime.now().strftime('%B %d, %Y')}",
+                "quote": {"text": "Progress, not perfection. Every step forward counts.", "author": "Recovery Wisdom"},
+                "tip": weekly_content['tip'],
+                "day_content": weekly_content['summary'],
+                "recovery_fact": weekly_content['stats'],
+                "inspiration": weekly_content['inspiration'],
+                "call_to_action": "🎯 **Week Ahead**: Plan untuk minggu depan dan set 3 goals spesifik!"
+            }
             
-            for user in users:
-                try:
-                    await self._send_message_to_user(user.telegram_id, {
-                        "greeting": "📊 **Weekly Recovery Summary**",
-                        "date": f"Week of {datetime.now().strftime('%B %d, %Y')}",
-                        "quote": {"text": "Progress, not perfection. Every step forward counts.", "author": "Recovery Wisdom"},
-                        "tip": weekly_content['tip'],
-                        "day_content": weekly_content['summary'],
-                        "recovery_fact": weekly_content['stats'],
-                        "inspiration": weekly_content['inspiration'],
-                        "call_to_action": "🎯 **Week Ahead**: Plan untuk minggu depan dan set 3 goals spesifik!"
-                    })
-                except Exception as e:
-                    app_logger.error(f"Failed to send weekly summary to user {user.telegram_id}: {e}")
+            return await self._get_delivery_engine(bot).broadcast(
+                users,
+                lambda user: self._build_user_message(user.telegram_id, summary_content),
+                job_name="Weekly summary"
+            )
                     
         except Exception as e:
             app_logger.error(f"Error in weekly summary: {e}")
+            return {}
     
     def _generate_weekly_summary(self) -> Dict:
         """Generate weekly summary content"""
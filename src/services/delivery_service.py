@@ -0,0 +1,198 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+from config.settings import settings
+from src.utils.logger import app_logger
+
+class TokenBucket:
+    """Async token bucket untuk membatasi laju pengiriman pesan"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        """Add tokens earned since the last refill"""
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def pause(self, seconds: float):
+        """Block all acquirers for the given number of seconds (flood control)"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    async def acquire(self):
+        """Wait until one token is available and consume it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class DeliveryEngine:
+    """Bounded-concurrency, rate-limited message delivery untuk broadcast"""
+
+    def __init__(self, bot, concurrency: int = None, global_rate: float = None,
+                 per_chat_interval: float = None, max_retries: int = None,
+                 progress_every: int = None):
+        self.bot = bot
+        self.concurrency = concurrency or settings.BROADCAST_CONCURRENCY
+        self.per_chat_interval = per_chat_interval if per_chat_interval is not None else settings.BROADCAST_PER_CHAT_INTERVAL
+        self.max_retries = max_retries if max_retries is not None else settings.BROADCAST_MAX_RETRIES
+        self.progress_every = progress_every or settings.BROADCAST_PROGRESS_EVERY
+        self.limiter = TokenBucket(global_rate or settings.BROADCAST_GLOBAL_RATE)
+        self._chat_last_sent: Dict[int, float] = {}
+
+    async def broadcast(self, recipients: Iterable[Any], build_payload: Callable[[Any], Optional[Dict]],
+                        job_name: str = "broadcast", fallback_text: str = None,
+                        on_progress: Callable[[Dict], Any] = None) -> Dict:
+        """
+        Deliver one message per recipient through the worker pool
+
+        Args:
+            recipients: Iterable of recipients (consumed lazily)
+            build_payload: Returns ``send_message`` kwargs for a recipient, or None to skip
+            job_name: Name used in progress logs
+            fallback_text: Plain text resent when Telegram rejects the formatted message
+            on_progress: Optional callback (sync or async) receiving the running report
+
+        Returns:
+            Report dict with total, sent, failed, skipped, retried and duration
+        """
+        report = {'job': job_name, 'total': 0, 'sent': 0, 'failed': 0,
+                  'skipped': 0, 'retried': 0, 'duration': 0.0}
+        started_at = time.monotonic()
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker():
+            while True:
+                recipient = await queue.get()
+                try:
+                    if recipient is None:
+                        return
+                    await self._deliver_one(recipient, build_payload, fallback_text, report)
+                    done = report['sent'] + report['failed'] + report['skipped']
+                    if done % self.progress_every == 0:
+                        await self._report_progress(report, started_at, on_progress)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            for recipient in recipients:
+                report['total'] += 1
+                await queue.put(recipient)
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._chat_last_sent.clear()
+
+        report['duration'] = round(time.monotonic() - started_at, 2)
+        await self._report_progress(report, started_at, on_progress)
+        app_logger.info(
+            f"{job_name} completed: {report['sent']} sent, {report['failed']} failed, "
+            f"{report['skipped']} skipped, {report['retried']} retries in {report['duration']}s"
+        )
+        return report
+
+    async def _deliver_one(self, recipient, build_payload, fallback_text, report: Dict):
+        """Build and send a single message, retrying on flood control and network errors"""
+        try:
+            payload = build_payload(recipient)
+        except Exception as e:
+            report['failed'] += 1
+            app_logger.error(f"Failed to build message for {recipient}: {e}")
+            return
+
+        if not payload:
+            report['skipped'] += 1
+            return
+
+        chat_id = payload['chat_id']
+        attempt = 0
+        while True:
+            try:
+                await self._wait_for_chat(chat_id)
+                await self.limiter.acquire()
+                await self.bot.send_message(**payload)
+                report['sent'] += 1
+                app_logger.debug(f"Message delivered to user {chat_id}")
+                return
+            except RetryAfter as e:
+                retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+                if attempt >= self.max_retries:
+                    report['failed'] += 1
+                    app_logger.error(f"Giving up on user {chat_id} after {attempt} flood-control retries")
+                    return
+                app_logger.warning(f"Flood control hit, pausing delivery for {retry_after}s")
+                self.limiter.pause(retry_after)
+            except Forbidden as e:
+                report['failed'] += 1
+                app_logger.info(f"User {chat_id} blocked the bot: {e}")
+                return
+            except BadRequest as e:
+                if fallback_text and payload.get('text') != fallback_text:
+                    app_logger.warning(f"Formatted message rejected for user {chat_id}, sending fallback: {e}")
+                    payload = {'chat_id': chat_id, 'text': fallback_text}
+                    continue
+                report['failed'] += 1
+                app_logger.error(f"Failed to send message to user {chat_id}: {e}")
+                return
+            except (TimedOut, NetworkError) as e:
+                if attempt >= self.max_retries:
+                    report['failed'] += 1
+                    app_logger.error(f"Giving up on user {chat_id} after {attempt} retries: {e}")
+                    return
+                await asyncio.sleep(min(30, 2 ** attempt))
+            except Exception as e:
+                report['failed'] += 1
+                app_logger.error(f"Failed to send message to user {chat_id}: {e}")
+                return
+
+            attempt += 1
+            report['retried'] += 1
+
+    async def _wait_for_chat(self, chat_id: int):
+        """Respect Telegram's per-chat limit of roughly one message per second"""
+        last_sent = self._chat_last_sent.get(chat_id)
+        now = time.monotonic()
+        if last_sent is not None and now - last_sent < self.per_chat_interval:
+            await asyncio.sleep(self.per_chat_interval - (now - last_sent))
+        self._chat_last_sent[chat_id] = time.monotonic()
+
+        # Forget chats whose interval has elapsed so streamed audiences keep memory flat
+        if len(self._chat_last_sent) > self.concurrency * 100:
+            cutoff = time.monotonic() - self.per_chat_interval
+            self._chat_last_sent = {
+                chat: sent_at for chat, sent_at in self._chat_last_sent.items() if sent_at > cutoff
+            }
+
+    async def _report_progress(self, report: Dict, started_at: float, on_progress):
+        """Log progress and forward it to the optional callback"""
+        elapsed = time.monotonic() - started_at
+        done = report['sent'] + report['failed'] + report['skipped']
+        rate = done / elapsed if elapsed > 0 else 0
+        app_logger.info(f"{report['job']} progress: {done}/{report['total']} processed ({rate:.1f} msg/s)")
+
+        if on_progress:
+            try:
+                result = on_progress(dict(report))
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                app_logger.error(f"Progress callback failed: {e}")
@@ -1,31 +1,68 @@
-from datetime import datetime
-from typing import List, Optional
+import json
+import math
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import DateTime, Integer, String, bindparam, func, select, text, tuple_
+from config.settings import settings
 from src.database.database import db
-from src.database.models import JournalEntry
+from src.database.migrations import JOURNAL_FTS_TABLE
+from src.database.models import JournalEntry, UserAggregate
+from src.utils.constants import HIGHLIGHT_END, HIGHLIGHT_START
+from src.services.aggregate_service import AggregateService
+from src.services.trigger_service import SOURCE_JOURNAL, TriggerService
+from src.utils.cache import TTLCache
 from src.utils.logger import app_logger
 
+_EPOCH = datetime(1970, 1, 1)
+
 class JournalService:
     """Service untuk mengelola journal entries"""
     
+    JOURNAL_PAGE_SIZE = 5
+    SEARCH_PAGE_SIZE = 5
+    SEARCH_MAX_TERMS = 8
+    
+    # (terms, ranked [(id, score)]) of each user's latest search, so page turns skip ranking
+    search_cache = TTLCache(maxsize=settings.JOURNAL_SEARCH_CACHE_SIZE, ttl=settings.JOURNAL_SEARCH_CACHE_TTL)
+    
     def __init__(self):
         pass
     
-    def create_journal_entry(self, telegram_id: int, entry_text: str, mood_score: Optional[int] = None) -> bool:
+    @staticmethod
+    def _entry_tags(entry_text: str, triggers: Optional[list]) -> List[str]:
+        """Explicit triggers plus #hashtags written in the entry"""
+        return TriggerService.normalize(list(triggers or []) + TriggerService.extract_hashtags(entry_text))
+    
+    def create_journal_entry(self, telegram_id: int, entry_text: str, mood_score: Optional[int] = None,
+                             triggers: Optional[list] = None) -> bool:
         """Create new journal entry"""
         session = db.get_session()
         
         try:
             # Create new journal entry
+            created_at = datetime.utcnow()
+            tags = self._entry_tags(entry_text, triggers)
             new_entry = JournalEntry(
                 user_id=telegram_id,  # Using telegram_id as user_id for simplicity
                 telegram_id=telegram_id,
                 entry_text=entry_text,
                 mood_score=mood_score,
-                created_at=datetime.utcnow()
+                triggers=json.dumps(tags) if tags else None,
+                created_at=created_at
             )
             
             session.add(new_entry)
+            session.flush()
+            dialect_name = session.bind.dialect.name
+            session.execute(AggregateService.journal_entry_added(
+                dialect_name, telegram_id, entry_text, mood_score, created_at
+            ))
+            for statement in TriggerService.record_statements(
+                    dialect_name, telegram_id, SOURCE_JOURNAL, new_entry.id, created_at, tags):
+                session.execute(statement)
             session.commit()
+            JournalService.search_cache.invalidate(telegram_id)
             
             app_logger.info(f"Journal entry created for user {telegram_id}")
             return True
@@ -37,6 +74,40 @@ class JournalService:
         finally:
             db.close_session(session)
     
+    async def create_journal_entry_async(self, telegram_id: int, entry_text: str, mood_score: Optional[int] = None,
+                                         triggers: Optional[list] = None) -> bool:
+        """Create new journal entry without blocking the event loop"""
+        try:
+            created_at = datetime.utcnow()
+            tags = self._entry_tags(entry_text, triggers)
+            async with db.get_async_session() as session:
+                new_entry = JournalEntry(
+                    user_id=telegram_id,  # Using telegram_id as user_id for simplicity
+                    telegram_id=telegram_id,
+                    entry_text=entry_text,
+                    mood_score=mood_score,
+                    triggers=json.dumps(tags) if tags else None,
+                    created_at=created_at
+                )
+                session.add(new_entry)
+                await session.flush()
+                dialect_name = session.bind.dialect.name
+                await session.execute(AggregateService.journal_entry_added(
+                    dialect_name, telegram_id, entry_text, mood_score, created_at
+                ))
+                for statement in TriggerService.record_statements(
+                        dialect_name, telegram_id, SOURCE_JOURNAL, new_entry.id, created_at, tags):
+                    await session.execute(statement)
+                await session.commit()
+            JournalService.search_cache.invalidate(telegram_id)
+            
+            app_logger.info(f"Journal entry created for user {telegram_id}")
+            return True
+            
+        except Exception as e:
+            app_logger.error(f"Error creating journal entry: {e}")
+            return False
+    
     def get_user_entries(self, telegram_id: int, limit: int = 10) -> List[JournalEntry]:
         """Get recent journal entries for user"""
         session = db.get_session()
@@ -56,58 +127,344 @@ class JournalService:
         finally:
             db.close_session(session)
     
-    def get_entry_count(self, telegram_id: int) -> int:
-        """Get total journal entry count for user"""
+    async def get_user_entries_async(self, telegram_id: int, limit: int = 10) -> List[JournalEntry]:
+        """Get recent journal entries for user without blocking the event loop"""
+        try:
+            async with db.get_async_session() as session:
+                result = await session.scalars(
+                    select(JournalEntry)
+                    .where(JournalEntry.telegram_id == telegram_id)
+                    .order_by(JournalEntry.created_at.desc())
+                    .limit(limit)
+                )
+                return list(result)
+            
+        except Exception as e:
+            app_logger.error(f"Error getting journal entries: {e}")
+            return []
+    
+    @staticmethod
+    def encode_cursor(entry) -> str:
+        """Compact page cursor for callback_data: hex microsecond timestamp and id"""
+        timestamp = int((entry.created_at - _EPOCH) / timedelta(microseconds=1))
+        return f"{timestamp:x}.{entry.id:x}"
+    
+    @staticmethod
+    def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+        """Inverse of encode_cursor; None for a missing or malformed cursor"""
+        try:
+            timestamp, entry_id = cursor.split(".")
+            return _EPOCH + timedelta(microseconds=int(timestamp, 16)), int(entry_id, 16)
+        except (AttributeError, ValueError, OverflowError):
+            return None
+    
+    @staticmethod
+    def _page_statement(telegram_id: int, position: Optional[Tuple[datetime, int]], newer: bool, limit: int):
+        """Keyset page on (telegram_id, created_at, id): one index range scan, whatever the depth"""
+        key = tuple_(JournalEntry.created_at, JournalEntry.id)
+        statement = select(JournalEntry).where(JournalEntry.telegram_id == telegram_id)
+        if newer:
+            return statement.where(key > tuple_(*position))\
+                .order_by(JournalEntry.created_at.asc(), JournalEntry.id.asc()).limit(limit)
+        if position is not None:
+            statement = statement.where(key < tuple_(*position))
+        return statement.order_by(JournalEntry.created_at.desc(), JournalEntry.id.desc()).limit(limit)
+    
+    def _build_page(self, entries: List[JournalEntry], position, newer: bool, page_size: int) -> dict:
+        """Page dict (newest first) with the cursors for the older/newer buttons"""
+        has_extra = len(entries) > page_size
+        entries = entries[:page_size]
+        if newer:
+            entries.reverse()
+            has_older, has_newer = True, has_extra
+        else:
+            has_older, has_newer = has_extra, position is not None
+        
+        return {
+            'entries': entries,
+            'older_cursor': self.encode_cursor(entries[-1]) if entries and has_older else None,
+            'newer_cursor': self.encode_cursor(entries[0]) if entries and has_newer else None
+        }
+    
+    def get_entries_page(self, telegram_id: int, cursor: str = None, newer: bool = False,
+                         page_size: int = None) -> dict:
+        """
+        Page through a user's journal history, newest first
+        
+        Args:
+            cursor: Cursor from a previous page (None for the latest entries)
+            newer: Page towards newer entries instead of older ones
+        
+        Returns:
+            Dict with entries, older_cursor and newer_cursor (None when there is no such page)
+        """
+        page_size = page_size or self.JOURNAL_PAGE_SIZE
+        position = self.decode_cursor(cursor)
+        newer = newer and position is not None
         session = db.get_session()
         
         try:
-            count = session.query(JournalEntry)\
-                .filter(JournalEntry.telegram_id == telegram_id)\
-                .count()
-            
-            return count
+            entries = list(session.scalars(self._page_statement(telegram_id, position, newer, page_size + 1)))
+            if not entries and position is not None:
+                # Cursor points past the data (e.g. entries deleted): start over from the latest page
+                position, newer = None, False
+                entries = list(session.scalars(self._page_statement(telegram_id, None, False, page_size + 1)))
+            return self._build_page(entries, position, newer, page_size)
             
         except Exception as e:
-            app_logger.error(f"Error getting entry count: {e}")
-            return 0
+            app_logger.error(f"Error getting journal page: {e}")
+            return self._build_page([], None, False, page_size)
         finally:
             db.close_session(session)
     
-    def get_entry_stats(self, telegram_id: int) -> dict:
-        """Get journal statistics for user"""
-        session = db.get_session()
+    async def get_entries_page_async(self, telegram_id: int, cursor: str = None, newer: bool = False,
+                                     page_size: int = None) -> dict:
+        """Page through a user's journal history without blocking the event loop"""
+        page_size = page_size or self.JOURNAL_PAGE_SIZE
+        position = self.decode_cursor(cursor)
+        newer = newer and position is not None
         
         try:
-            entries = session.query(JournalEntry)\
-                .filter(JournalEntry.telegram_id == telegram_id)\
-                .all()
+            async with db.get_async_session() as session:
+                entries = list(await session.scalars(self._page_statement(telegram_id, position, newer, page_size + 1)))
+                if not entries and position is not None:
+                    position, newer = None, False
+                    entries = list(await session.scalars(self._page_statement(telegram_id, None, False, page_size + 1)))
+            return self._build_page(entries, position, newer, page_size)
             
-            if not entries:
-                return {
-                    'total_entries': 0,
-                    'total_words': 0,
-                    'average_words': 0,
-                    'first_entry': None,
-                    'last_entry': None,
-                    'average_mood': None
-                }
-            
-            total_words = sum(len(entry.entry_text.split()) for entry in entries)
-            mood_scores = [entry.mood_score for entry in entries if entry.mood_score is not None]
-            
-            stats = {
-                'total_entries': len(entries),
-                'total_words': total_words,
-                'average_words': total_words // len(entries) if entries else 0,
-                'first_entry': entries[-1].created_at if entries else None,
-                'last_entry': entries[0].created_at if entries else None,
-                'average_mood': sum(mood_scores) / len(mood_scores) if mood_scores else None
-            }
+        except Exception as e:
+            app_logger.error(f"Error getting journal page: {e}")
+            return self._build_page([], None, False, page_size)
+    
+    def get_entry_count(self, telegram_id: int) -> int:
+        """Get total journal entry count for user"""
+        try:
+            aggregate = AggregateService.get_aggregates(telegram_id)
+            return aggregate.journal_entries if aggregate else 0
+            
+        except Exception as e:
+            app_logger.error(f"Error getting entry count: {e}")
+            return 0
+    
+    async def get_entry_count_async(self, telegram_id: int) -> int:
+        """Get total journal entry count for user without blocking the event loop"""
+        try:
+            aggregate = await AggregateService.get_aggregates_async(telegram_id)
+            return aggregate.journal_entries if aggregate else 0
             
-            return stats
+        except Exception as e:
+            app_logger.error(f"Error getting entry count: {e}")
+            return 0
+    
+    def get_entry_stats(self, telegram_id: int) -> dict:
+        """Get journal statistics for user (one primary-key lookup on user_aggregates)"""
+        try:
+            return self._build_entry_stats(AggregateService.get_aggregates(telegram_id))
             
         except Exception as e:
             app_logger.error(f"Error getting entry stats: {e}")
             return {}
+    
+    async def get_entry_stats_async(self, telegram_id: int) -> dict:
+        """Get journal statistics for user without blocking the event loop"""
+        try:
+            return self._build_entry_stats(await AggregateService.get_aggregates_async(telegram_id))
+            
+        except Exception as e:
+            app_logger.error(f"Error getting entry stats: {e}")
+            return {}
+    
+    def _build_entry_stats(self, aggregate: Optional[UserAggregate]) -> dict:
+        """Build journal statistics from the user's aggregate row"""
+        if not aggregate or not aggregate.journal_entries:
+            return {
+                'total_entries': 0,
+                'total_words': 0,
+                'average_words': 0,
+                'first_entry': None,
+                'last_entry': None,
+                'average_mood': None
+            }
+        
+        return {
+            'total_entries': aggregate.journal_entries,
+            'total_words': aggregate.journal_words,
+            'average_words': aggregate.journal_words // aggregate.journal_entries,
+            'first_entry': aggregate.journal_first_at,
+            'last_entry': aggregate.journal_last_at,
+            'average_mood': (aggregate.journal_mood_sum / aggregate.journal_mood_count
+                             if aggregate.journal_mood_count else None)
+        }
+    
+    @staticmethod
+    def _search_terms(search_text: str) -> List[tuple]:
+        """Split a query into (term, is_prefix) pairs; a trailing ``*`` asks for prefix matching"""
+        terms = re.findall(r"([^\W_]+)(\*?)", search_text.lower())
+        return [(term, bool(star)) for term, star in terms[:JournalService.SEARCH_MAX_TERMS]]
+    
+    @staticmethod
+    def _fts_query(telegram_id: int, terms: List[tuple]) -> str:
+        """Build a safe FTS5 MATCH expression restricted to the user's own rows"""
+        phrases = " ".join(f'"{term}"*' if prefix else f'"{term}"' for term, prefix in terms)
+        return f'{{telegram_id}}: "{int(telegram_id)}" AND {{entry_text}}: ({phrases})'
+    
+    @staticmethod
+    def _search_statement(dialect_name: str, telegram_id: int, terms: List[tuple]):
+        """Statement returning the (id, entry_text) of every matching entry of the user"""
+        if dialect_name != 'sqlite':
+            # No FTS5 outside SQLite: substring match on every term
+            return select(JournalEntry.id, JournalEntry.entry_text)\
+                .where(JournalEntry.telegram_id == telegram_id,
+                       *[JournalEntry.entry_text.ilike(f"%{term}%") for term, _ in terms])
+        
+        # bm25() is not used here: it counts each term's doclist over the whole table,
+        # which dominates latency with many users. Ranking is done per user in _rank_entries.
+        return text(f"""
+            SELECT j.id, j.entry_text
+            FROM {JOURNAL_FTS_TABLE}
+            JOIN journal_entries AS j ON j.id = {JOURNAL_FTS_TABLE}.rowid
+            WHERE {JOURNAL_FTS_TABLE} MATCH :match
+        """).bindparams(
+            bindparam('match', JournalService._fts_query(telegram_id, terms))
+        ).columns(id=Integer, entry_text=String)
+    
+    @staticmethod
+    def _snippet_statement(dialect_name: str, telegram_id: int, terms: List[tuple], ids: List[int]):
+        """Statement returning (id, created_at, snippet) of the given entries that still match"""
+        if dialect_name != 'sqlite':
+            return select(JournalEntry.id, JournalEntry.created_at,
+                          func.substr(JournalEntry.entry_text, 1, 200).label('snippet'))\
+                .where(JournalEntry.id.in_(ids), JournalEntry.telegram_id == telegram_id,
+                       *[JournalEntry.entry_text.ilike(f"%{term}%") for term, _ in terms])
+        
+        return text(f"""
+            SELECT j.id, j.created_at,
+                   snippet({JOURNAL_FTS_TABLE}, 0, :hl_start, :hl_end, '…', 16) AS snippet
+            FROM {JOURNAL_FTS_TABLE}
+            JOIN journal_entries AS j ON j.id = {JOURNAL_FTS_TABLE}.rowid
+            WHERE {JOURNAL_FTS_TABLE} MATCH :match AND {JOURNAL_FTS_TABLE}.rowid IN :ids
+        """).bindparams(
+            bindparam('match', JournalService._fts_query(telegram_id, terms)),
+            bindparam('ids', ids, expanding=True),
+            bindparam('hl_start', HIGHLIGHT_START), bindparam('hl_end', HIGHLIGHT_END)
+        ).columns(id=Integer, created_at=DateTime, snippet=String)
+    
+    @staticmethod
+    def _bm25_scores(rows, terms: List[tuple], total_entries: int, average_length: float,
+                     k1: float = 1.2, b: float = 0.75) -> List[float]:
+        """Okapi BM25 of each row, with document frequencies taken from the user's own entries"""
+        documents = [re.findall(r"[^\W_]+", (row.entry_text or "").lower()) for row in rows]
+        average_length = average_length or 1.0
+        scores = [0.0] * len(rows)
+        
+        for term, prefix in terms:
+            matches = (lambda token: token.startswith(term)) if prefix else (lambda token: token == term)
+            frequencies = [sum(1 for token in tokens if matches(token)) for tokens in documents]
+            document_count = sum(1 for frequency in frequencies if frequency)
+            idf = math.log((total_entries - document_count + 0.5) / (document_count + 0.5) + 1)
+            for i, (frequency, tokens) in enumerate(zip(frequencies, documents)):
+                if frequency:
+                    norm = k1 * (1 - b + b * len(tokens) / average_length)
+                    scores[i] += idf * frequency * (k1 + 1) / (frequency + norm)
+        return scores
+    
+    @staticmethod
+    def _rank_entries(rows, terms: List[tuple], aggregate: Optional[UserAggregate]) -> List[tuple]:
+        """(id, score) of every candidate row by bm25, best first and newest on ties"""
+        if aggregate and aggregate.journal_entries:
+            total_entries = max(aggregate.journal_entries, len(rows))
+            average_length = aggregate.journal_words / aggregate.journal_entries
+        else:
+            total_entries = len(rows)
+            average_length = sum(len((row.entry_text or "").split()) for row in rows) / (len(rows) or 1)
+        
+        scores = JournalService._bm25_scores(rows, terms, total_entries, average_length)
+        ranked = sorted(zip(scores, rows), key=lambda pair: (-pair[0], -(pair[1].id or 0)))
+        return [(row.id, score) for score, row in ranked]
+    
+    @staticmethod
+    def _page_ids(ranked: List[tuple], page: int, page_size: int) -> List[int]:
+        offset = page * page_size
+        return [entry_id for entry_id, _ in ranked[offset:offset + page_size]]
+    
+    @staticmethod
+    def _build_search_page(ranked: List[tuple], rows, page: int, page_size: int) -> dict:
+        """One page of ranked results; entries changed since ranking and no longer matching are skipped"""
+        offset = page * page_size
+        by_id = {row.id: row for row in rows}
+        return {
+            'results': [{'id': entry_id, 'created_at': by_id[entry_id].created_at,
+                         'snippet': by_id[entry_id].snippet, 'score': score}
+                        for entry_id, score in ranked[offset:offset + page_size] if entry_id in by_id],
+            'page': page,
+            'has_more': len(ranked) > offset + page_size
+        }
+    
+    @staticmethod
+    def _cached_ranking(telegram_id: int, terms: List[tuple]) -> Optional[List[tuple]]:
+        """Ranking of the user's latest search when it was for the same terms"""
+        cached = JournalService.search_cache.get(telegram_id)
+        if cached and cached[0] == tuple(terms):
+            return cached[1]
+        return None
+    
+    def search_entries(self, telegram_id: int, search_text: str, page: int = 0,
+                       page_size: int = None) -> dict:
+        """
+        Full-text search over a user's journal entries (bm25 ranking)
+        
+        Terms are matched as whole words; ``urg*`` matches by prefix. The ranking is
+        cached per user, so turning pages only loads snippets for that page.
+        
+        Returns:
+            Dict with results (id, created_at, highlighted snippet, score), page and has_more
+        """
+        page_size = page_size or self.SEARCH_PAGE_SIZE
+        terms = self._search_terms(search_text)
+        if not terms:
+            return self._build_search_page([], [], page, page_size)
+        session = db.get_session()
+        
+        try:
+            dialect_name = session.bind.dialect.name
+            ranked = self._cached_ranking(telegram_id, terms)
+            if ranked is None:
+                rows = session.execute(self._search_statement(dialect_name, telegram_id, terms)).all()
+                ranked = self._rank_entries(rows, terms, session.get(UserAggregate, telegram_id))
+                self.search_cache.set(telegram_id, (tuple(terms), ranked))
+            
+            ids = self._page_ids(ranked, page, page_size)
+            rows = session.execute(self._snippet_statement(dialect_name, telegram_id, terms, ids)).all() if ids else []
+            return self._build_search_page(ranked, rows, page, page_size)
+            
+        except Exception as e:
+            app_logger.error(f"Error searching journal entries: {e}")
+            return self._build_search_page([], [], page, page_size)
         finally:
             db.close_session(session)
+    
+    async def search_entries_async(self, telegram_id: int, search_text: str, page: int = 0,
+                                   page_size: int = None) -> dict:
+        """Full-text search over a user's journal entries without blocking the event loop"""
+        page_size = page_size or self.SEARCH_PAGE_SIZE
+        terms = self._search_terms(search_text)
+        if not terms:
+            return self._build_search_page([], [], page, page_size)
+        
+        try:
+            async with db.get_async_session() as session:
+                dialect_name = session.bind.dialect.name
+                ranked = self._cached_ranking(telegram_id, terms)
+                if ranked is None:
+                    rows = (await session.execute(self._search_statement(dialect_name, telegram_id, terms))).all()
+                    ranked = self._rank_entries(rows, terms, await session.get(UserAggregate, telegram_id))
+                    self.search_cache.set(telegram_id, (tuple(terms), ranked))
+                
+                ids = self._page_ids(ranked, page, page_size)
+                statement = self._snippet_statement(dialect_name, telegram_id, terms, ids)
+                rows = (await session.execute(statement)).all() if ids else []
+                return self._build_search_page(ranked, rows, page, page_size)
+            
+        except Exception as e:
+            app_logger.error(f"Error searching journal entries: {e}")
+            return self._build_search_page([], [], page, page_size)
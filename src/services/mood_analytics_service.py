@@ -0,0 +1,187 @@
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+from sqlalchemy import select
+from config.settings import settings
+from src.database.database import db
+from src.database.models import MoodEntry
+from src.utils.cache import TTLCache
+
+WEEKDAY_NAMES = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+# Columns fetched in one query, in this order
+_METRICS = ('mood_score', 'energy_level', 'stress_level', 'sleep_quality', 'urge_intensity')
+
+class MoodAnalyticsService:
+    """Vectorized per-user mood analytics dari tabel mood_entries"""
+
+    # Results per telegram_id; dropped when the user records a new check-in
+    analytics_cache = TTLCache(maxsize=settings.MOOD_ANALYTICS_CACHE_SIZE, ttl=settings.MOOD_ANALYTICS_CACHE_TTL)
+
+    # Minimum paired samples before a correlation or slope is reported
+    MIN_SAMPLES = 5
+
+    @staticmethod
+    def invalidate(telegram_id: int):
+        """Forget cached analytics after a new check-in"""
+        MoodAnalyticsService.analytics_cache.invalidate(telegram_id)
+
+    @staticmethod
+    def _statement(telegram_id: int):
+        return select(MoodEntry.created_at, *[getattr(MoodEntry, name) for name in _METRICS])\
+            .where(MoodEntry.user_id == telegram_id)\
+            .order_by(MoodEntry.created_at)
+
+    @staticmethod
+    def get_user_analytics(telegram_id: int, tz_name: str = None) -> Dict:
+        """Mood analytics for one user (cached)"""
+        tz_name = tz_name or settings.TIMEZONE
+        cached = MoodAnalyticsService.analytics_cache.get(telegram_id)
+        if cached is not None and cached['timezone'] == tz_name:
+            return cached
+
+        session = db.get_session()
+        try:
+            rows = session.execute(MoodAnalyticsService._statement(telegram_id)).all()
+        finally:
+            db.close_session(session)
+
+        return MoodAnalyticsService._store(telegram_id, rows, tz_name)
+
+    @staticmethod
+    async def get_user_analytics_async(telegram_id: int, tz_name: str = None) -> Dict:
+        """Mood analytics for one user (cached) without blocking the event loop"""
+        tz_name = tz_name or settings.TIMEZONE
+        cached = MoodAnalyticsService.analytics_cache.get(telegram_id)
+        if cached is not None and cached['timezone'] == tz_name:
+            return cached
+
+        async with db.get_async_session() as session:
+            rows = (await session.execute(MoodAnalyticsService._statement(telegram_id))).all()
+
+        return MoodAnalyticsService._store(telegram_id, rows, tz_name)
+
+    @staticmethod
+    def _store(telegram_id: int, rows, tz_name: str) -> Dict:
+        analytics = MoodAnalyticsService.compute(rows, tz_name)
+        MoodAnalyticsService.analytics_cache.set(telegram_id, analytics)
+        return analytics
+
+    @staticmethod
+    def compute(rows, tz_name: str = None, now: datetime = None) -> Dict:
+        """
+        Compute analytics from (created_at, mood, energy, stress, sleep, urge) rows
+
+        Args:
+            rows: Rows ordered by created_at (naive UTC datetimes)
+            tz_name: User timezone used for weekday/hour patterns
+            now: Reference time (naive UTC), defaults to utcnow
+
+        Returns:
+            Dict with averages, rolling windows, patterns, correlations and trends
+        """
+        tz_name = tz_name or settings.TIMEZONE
+        analytics = {'timezone': tz_name, 'entries': len(rows)}
+        if not rows:
+            return analytics
+
+        columns = list(zip(*rows))
+        created = np.array(columns[0], dtype='datetime64[s]')
+        metrics = {name: np.array([np.nan if v is None else v for v in values], dtype=float)
+                   for name, values in zip(_METRICS, columns[1:])}
+        mood = metrics['mood_score']
+
+        now = np.datetime64(now or datetime.utcnow(), 's')
+        age_days = (now - created) / np.timedelta64(1, 'D')
+
+        analytics.update({
+            'first_entry': rows[0][0],
+            'last_entry': rows[-1][0],
+            'averages': {name: MoodAnalyticsService._mean(values) for name, values in metrics.items()},
+            'rolling': {
+                'last_7d': MoodAnalyticsService._mean(mood[age_days < 7]),
+                'prev_7d': MoodAnalyticsService._mean(mood[(age_days >= 7) & (age_days < 14)]),
+                'last_30d': MoodAnalyticsService._mean(mood[age_days < 30]),
+                'moving_7': MoodAnalyticsService._moving_average(mood, 7),
+            },
+        })
+
+        # Weekday / hour patterns in the user's local time
+        local = created + MoodAnalyticsService._utc_offsets(created, tz_name)
+        local_days = local.astype('datetime64[D]')
+        weekdays = (local_days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+        hours = ((local - local_days) // np.timedelta64(1, 'h')).astype(np.int64)
+        analytics['weekday_mood'] = MoodAnalyticsService._group_mean(mood, weekdays, 7)
+        analytics['hour_mood'] = MoodAnalyticsService._group_mean(mood, hours, 24)
+
+        urge = metrics['urge_intensity']
+        analytics['correlations'] = {
+            'sleep_urge': MoodAnalyticsService._correlation(metrics['sleep_quality'], urge),
+            'stress_urge': MoodAnalyticsService._correlation(metrics['stress_level'], urge),
+            'sleep_mood': MoodAnalyticsService._correlation(metrics['sleep_quality'], mood),
+            'stress_mood': MoodAnalyticsService._correlation(metrics['stress_level'], mood),
+        }
+
+        # Trend slopes in points per week, over days since the first entry
+        elapsed_days = (created - created[0]) / np.timedelta64(1, 'D')
+        analytics['trends'] = {
+            name: MoodAnalyticsService._slope(elapsed_days, metrics[name], per=7)
+            for name in ('mood_score', 'stress_level', 'urge_intensity')
+        }
+        return analytics
+
+    @staticmethod
+    def _mean(values: np.ndarray) -> Optional[float]:
+        values = values[~np.isnan(values)]
+        return round(float(values.mean()), 2) if values.size else None
+
+    @staticmethod
+    def _moving_average(values: np.ndarray, window: int) -> Optional[float]:
+        """Latest moving average over the last `window` entries"""
+        values = values[~np.isnan(values)]
+        if values.size < window:
+            return None
+        return round(float(np.convolve(values, np.ones(window) / window, mode='valid')[-1]), 2)
+
+    @staticmethod
+    def _group_mean(values: np.ndarray, groups: np.ndarray, size: int) -> Dict[int, float]:
+        """Mean of values per integer group (weekday, hour), skipping empty groups"""
+        valid = ~np.isnan(values)
+        sums = np.bincount(groups[valid], weights=values[valid], minlength=size)
+        counts = np.bincount(groups[valid], minlength=size)
+        return {int(group): round(float(sums[group] / counts[group]), 2)
+                for group in np.flatnonzero(counts)}
+
+    @staticmethod
+    def _correlation(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+        valid = ~(np.isnan(x) | np.isnan(y))
+        if valid.sum() < MoodAnalyticsService.MIN_SAMPLES:
+            return None
+        x, y = x[valid], y[valid]
+        if x.std() == 0 or y.std() == 0:
+            return None
+        return round(float(np.corrcoef(x, y)[0, 1]), 2)
+
+    @staticmethod
+    def _slope(x: np.ndarray, y: np.ndarray, per: float = 1) -> Optional[float]:
+        valid = ~np.isnan(y)
+        if valid.sum() < MoodAnalyticsService.MIN_SAMPLES or np.ptp(x[valid]) == 0:
+            return None
+        return round(float(np.polyfit(x[valid], y[valid], 1)[0] * per), 3)
+
+    @staticmethod
+    def _utc_offsets(created: np.ndarray, tz_name: str) -> np.ndarray:
+        """UTC offsets per entry, resolved once per distinct UTC day"""
+        try:
+            tz = ZoneInfo(tz_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            tz = ZoneInfo(settings.TIMEZONE)
+
+        days, index = np.unique(created.astype('datetime64[D]'), return_inverse=True)
+        offsets = np.array([
+            int(datetime.fromisoformat(str(day)).replace(hour=12, tzinfo=timezone.utc)
+                .astimezone(tz).utcoffset().total_seconds())
+            for day in days
+        ], dtype='timedelta64[s]')
+        return offsets[index]
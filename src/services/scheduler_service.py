@@ -1,34 +1,38 @@
 import asyncio
-from datetime import datetime, time
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from config.settings import settings
 from src.services.broadcast_service import BroadcastService
+from src.services.streak_service import StreakService
 from src.utils.logger import app_logger
 
 class SchedulerService:
     """Service untuk mengatur jadwal broadcast dan task otomatis"""
     
+    # Longest gap (minutes) of missed reminder buckets to catch up after a stall
+    MAX_REMINDER_CATCH_UP = 60
+    
     def __init__(self, bot_application=None):
         self.scheduler = AsyncIOScheduler()
         self.broadcast_service = BroadcastService(bot_application)
         self.bot_application = bot_application
+        self._last_reminder_dispatch = None
         
     def start_scheduler(self):
         """Start the scheduler dengan semua scheduled tasks"""
         try:
-            # Daily broadcast - setiap hari jam yang ditentukan di settings
-            reminder_time = settings.DAILY_REMINDER_TIME.split(':')
-            hour = int(reminder_time[0])
-            minute = int(reminder_time[1])
-            
-            # Daily morning broadcast
+            # Daily broadcast - dispatch setiap menit ke bucket user yang reminder_time lokalnya jatuh di menit ini
             self.scheduler.add_job(
-                func=self.broadcast_service.send_daily_broadcast,
-                trigger=CronTrigger(hour=hour, minute=minute),
+                func=self._dispatch_due_reminders,
+                trigger=CronTrigger(minute='*', second=0),
                 id='daily_broadcast',
-                name='Daily Morning Broadcast',
-                misfire_grace_time=3600  # 1 hour grace time
+                name='Daily Reminder Dispatcher',
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=60
             )
             
             # Weekly summary - setiap Minggu jam 18:00
@@ -58,6 +62,17 @@ class SchedulerService:
                 misfire_grace_time=1800
             )
             
+            # Nightly streak refresh - recompute current/longest streak untuk semua user
+            self.scheduler.add_job(
+                func=self._refresh_streaks,
+                trigger=CronTrigger(hour=0, minute=5),
+                id='streak_refresh',
+                name='Nightly Streak Refresh',
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=3600
+            )
+            
             # Start the scheduler
             self.scheduler.start()
             app_logger.info("Scheduler started successfully with all broadcast tasks")
@@ -74,57 +89,90 @@ class SchedulerService:
         except Exception as e:
             app_logger.error(f"Error stopping scheduler: {e}")
     
-    async def _send_afternoon_boost(self):
-        """Send afternoon motivation boost to active users"""
+    @staticmethod
+    def _slot_to_utc_minute(tz_name: str, reminder_time: str, now_utc: datetime) -> str:
+        """Convert a user's local reminder time to today's UTC minute (HH:MM)"""
+        try:
+            tz = ZoneInfo(tz_name or settings.TIMEZONE)
+        except (ZoneInfoNotFoundError, ValueError):
+            tz = ZoneInfo(settings.TIMEZONE)
+        
         try:
-            from src.services import UserService
-            user_service = UserService()
-            users = user_service.get_all_users_with_reminders()
+            local_time = datetime.strptime(reminder_time or settings.DAILY_REMINDER_TIME, "%H:%M").time()
+        except ValueError:
+            local_time = datetime.strptime(settings.DAILY_REMINDER_TIME, "%H:%M").time()
+        
+        local_date = now_utc.astimezone(tz).date()
+        local_dt = datetime.combine(local_date, local_time, tzinfo=tz)
+        return local_dt.astimezone(timezone.utc).strftime("%H:%M")
+    
+    @classmethod
+    def build_reminder_buckets(cls, slots: List[Tuple[str, str]], now_utc: datetime = None) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Group (timezone, reminder_time) slots by the UTC minute they are due
+        
+        Returns:
+            Dict mapping UTC "HH:MM" to the slots due in that minute
+        """
+        now_utc = now_utc or datetime.now(timezone.utc)
+        buckets = {}
+        for slot in slots:
+            utc_minute = cls._slot_to_utc_minute(slot[0], slot[1], now_utc)
+            buckets.setdefault(utc_minute, []).append(slot)
+        return buckets
+    
+    async def _dispatch_due_reminders(self, now_utc: datetime = None):
+        """Send daily broadcast to every reminder bucket that became due since the last run"""
+        try:
+            now_utc = (now_utc or datetime.now(timezone.utc)).replace(second=0, microsecond=0)
+            
+            # Catch up on minutes missed while the loop was busy, but never re-send a minute
+            start = now_utc
+            if self._last_reminder_dispatch is not None:
+                start = max(self._last_reminder_dispatch + timedelta(minutes=1),
+                            now_utc - timedelta(minutes=self.MAX_REMINDER_CATCH_UP))
+            self._last_reminder_dispatch = now_utc
             
-            boost_message = self._generate_afternoon_boost()
+            due_minutes = set()
+            minute = start
+            while minute <= now_utc:
+                due_minutes.add(minute.strftime("%H:%M"))
+                minute += timedelta(minutes=1)
             
-            sent_count = 0
-            for user in users:
-                try:
-                    await self.bot_application.bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=boost_message,
-                        parse_mode='Markdown'
-                    )
-                    sent_count += 1
-                except Exception as e:
-                    app_logger.error(f"Failed to send afternoon boost to {user.telegram_id}: {e}")
+            buckets = self.build_reminder_buckets(self.broadcast_service.user_service.get_reminder_slots(), now_utc)
+            due_slots = [slot for utc_minute in sorted(due_minutes) for slot in buckets.get(utc_minute, [])]
             
-            app_logger.info(f"Afternoon boost sent to {sent_count} users")
+            if not due_slots:
+                return
+            
+            app_logger.info(f"Dispatching daily reminders for {len(due_slots)} timezone/time slots")
+            await self.broadcast_service.send_daily_broadcast(slots=due_slots)
             
         except Exception as e:
-            app_logger.error(f"Error in afternoon boost: {e}")
+            app_logger.error(f"Error dispatching daily reminders: {e}")
     
-    async def _send_evening_reflection(self):
-        """Send evening reflection prompt to users"""
+    async def _refresh_streaks(self):
+        """Recompute stored streak columns for all users in a worker thread"""
         try:
-            from src.services import UserService
-            user_service = UserService()
-            users = user_service.get_all_users_with_reminders()
-            
-            reflection_message = self._generate_evening_reflection()
-            
-            sent_count = 0
-            for user in users:
-                try:
-                    await self.bot_application.bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=reflection_message,
-                        parse_mode='Markdown'
-                    )
-                    sent_count += 1
-                except Exception as e:
-                    app_logger.error(f"Failed to send evening reflection to {user.telegram_id}: {e}")
-            
-            app_logger.info(f"Evening reflection sent to {sent_count} users")
-            
+            report = await asyncio.to_thread(StreakService.refresh_streaks)
+            app_logger.info(
+                f"Nightly streak refresh: {report['updated']} users updated "
+                f"in {report['chunks']} chunks, {report['duration']}s"
+            )
+            return report
         except Exception as e:
-            app_logger.error(f"Error in evening reflection: {e}")
+            app_logger.error(f"Error refreshing streaks: {e}")
+            return {}
+    
+    async def _send_afternoon_boost(self):
+        """Send afternoon motivation boost to active users"""
+        boost_message = self._generate_afternoon_boost()
+        await self.broadcast_service.send_text_broadcast(boost_message, job_name="Afternoon boost")
+    
+    async def _send_evening_reflection(self):
+        """Send evening reflection prompt to users"""
+        reflection_message = self._generate_evening_reflection()
+        await self.broadcast_service.send_text_broadcast(reflection_message, job_name="Evening reflection")
     
     def _generate_afternoon_boost(self) -> str:
         """Generate afternoon motivation boost message"""
@@ -285,27 +333,7 @@ Sweet dreams, and tomorrow we rise stronger! 🌅
     
     async def _send_custom_broadcast(self, message: str):
         """Send custom broadcast message"""
-        try:
-            from src.services import UserService
-            user_service = UserService()
-            users = user_service.get_all_users_with_reminders()
-            
-            sent_count = 0
-            for user in users:
-                try:
-                    await self.bot_application.bot.send_message(
-                        chat_id=user.telegram_id,
-                        text=message,
-                        parse_mode='Markdown'
-                    )
-                    sent_count += 1
-                except Exception as e:
-                    app_logger.error(f"Failed to send custom broadcast to {user.telegram_id}: {e}")
-            
-            app_logger.info(f"Custom broadcast sent to {sent_count} users")
-            
-        except Exception as e:
-            app_logger.error(f"Error in custom broadcast: {e}")
+        await self.broadcast_service.send_text_broadcast(message, job_name="Custom broadcast")
     
     def list_scheduled_jobs(self) -> list:
         """Get list of all scheduled jobs"""
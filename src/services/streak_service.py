@@ -1,33 +1,34 @@
+import json
+import time
 from datetime import datetime, timedelta
 from typing import Optional
+from sqlalchemy import Integer, case, cast, func, or_, select, update
 from sqlalchemy.orm import Session
+from config.settings import settings
 from src.database.models import User, RelapseRecord
 from src.database.database import db
+from src.services.trigger_service import SOURCE_RELAPSE, TriggerService
+from src.services.user_service import UserService
 
 class StreakService:
     """Service untuk mengelola streak tracking"""
     
+    @staticmethod
+    def streak_days(clean_start_date: Optional[datetime], now: datetime = None) -> int:
+        """Current clean streak in days, as a pure function of clean_start_date"""
+        if not clean_start_date:
+            return 0
+        return max(0, ((now or datetime.utcnow()) - clean_start_date).days)
+    
     @staticmethod
     def calculate_current_streak(telegram_id: int) -> int:
-        """Calculate current clean streak in days"""
+        """Calculate current clean streak in days (read-only; persisted by the nightly job)"""
         session = db.get_session()
         try:
-            user = session.query(User).filter(User.telegram_id == telegram_id).first()
-            if not user:
-                return 0
-            
-            if not user.clean_start_date:
-                return 0
-            
-            # Calculate days since last clean start
-            now = datetime.utcnow()
-            streak_days = (now - user.clean_start_date).days
-            
-            # Update current streak in database
-            user.current_streak = streak_days
-            session.commit()
-            
-            return streak_days
+            clean_start_date = session.query(User.clean_start_date)\
+                .filter(User.telegram_id == telegram_id)\
+                .scalar()
+            return StreakService.streak_days(clean_start_date)
         finally:
             db.close_session(session)
     
@@ -40,69 +41,188 @@ class StreakService:
             if not user:
                 return False
             
-            # Calculate current streak before reset
-            current_streak = StreakService.calculate_current_streak(telegram_id)
-            
-            # Update longest streak if current is longer
-            if current_streak > user.longest_streak:
-                user.longest_streak = current_streak
-            
-            # Create relapse record
-            relapse = RelapseRecord(
-                user_id=user.id,
-                telegram_id=telegram_id,
-                relapse_date=datetime.utcnow(),
-                streak_broken=current_streak,
-                notes=notes,
-                triggers=str(triggers) if triggers else None
-            )
-            session.add(relapse)
-            
-            # Reset user streak
-            user.last_relapse_date = datetime.utcnow()
-            user.clean_start_date = datetime.utcnow()
-            user.current_streak = 0
-            user.total_relapses += 1
-            user.updated_at = datetime.utcnow()
-            
+            record = StreakService._apply_relapse(session, user, notes, triggers)
+            session.flush()
+            for statement in StreakService._relapse_trigger_statements(session, record):
+                session.execute(statement)
             session.commit()
+            UserService.invalidate_user(telegram_id)
             return True
         finally:
             db.close_session(session)
     
+    @staticmethod
+    def _apply_relapse(session, user: User, notes: str = None, triggers: list = None):
+        """Add the relapse record and reset the user's streak (caller commits); returns the record"""
+        now = datetime.utcnow()
+        
+        # Calculate current streak before reset
+        current_streak = StreakService.streak_days(user.clean_start_date, now)
+        
+        # Update longest streak if current is longer
+        if current_streak > (user.longest_streak or 0):
+            user.longest_streak = current_streak
+        
+        # Create relapse record
+        tags = TriggerService.normalize(triggers)
+        record = RelapseRecord(
+            user_id=user.id,
+            telegram_id=user.telegram_id,
+            relapse_date=now,
+            streak_broken=current_streak,
+            notes=notes,
+            triggers=json.dumps(tags) if tags else None
+        )
+        session.add(record)
+        
+        # Reset user streak
+        user.last_relapse_date = now
+        user.clean_start_date = now
+        user.current_streak = 0
+        user.total_relapses = (user.total_relapses or 0) + 1
+        user.updated_at = now
+        return record
+    
+    @staticmethod
+    def _relapse_trigger_statements(session, record: RelapseRecord) -> list:
+        """Trigger tag statements for a flushed relapse record"""
+        return TriggerService.record_statements(
+            session.bind.dialect.name, record.telegram_id, SOURCE_RELAPSE, record.id,
+            record.relapse_date, TriggerService.parse_triggers(record.triggers)
+        )
+    
     @staticmethod
     def get_streak_stats(telegram_id: int) -> dict:
-        """Get comprehensive streak statistics"""
+        """Get comprehensive streak statistics (single query, no writes)"""
         session = db.get_session()
         try:
             user = session.query(User).filter(User.telegram_id == telegram_id).first()
             if not user:
                 return {}
             
-            current_streak = StreakService.calculate_current_streak(telegram_id)
-            
-            # Get total days since first start (including relapses)
-            total_days = 0
-            if user.created_at:
-                total_days = (datetime.utcnow() - user.created_at).days
-            
-            # Calculate success rate
-            success_rate = 0
-            if total_days > 0:
-                clean_days = total_days - (user.total_relapses * 1)  # Simplified calculation
-                success_rate = max(0, (clean_days / total_days) * 100)
+            return StreakService._build_streak_stats(user)
+        finally:
+            db.close_session(session)
+    
+    @staticmethod
+    def _build_streak_stats(user: User) -> dict:
+        """Build streak statistics dict for a loaded user"""
+        current_streak = StreakService.streak_days(user.clean_start_date)
+        
+        # Get total days since first start (including relapses)
+        total_days = 0
+        if user.created_at:
+            total_days = (datetime.utcnow() - user.created_at).days
+        
+        # Calculate success rate
+        success_rate = 0
+        if total_days > 0:
+            clean_days = total_days - (user.total_relapses * 1)  # Simplified calculation
+            success_rate = max(0, (clean_days / total_days) * 100)
+        
+        return {
+            'current_streak': current_streak,
+            'longest_streak': max(user.longest_streak or 0, current_streak),
+            'total_relapses': user.total_relapses,
+            'success_rate': round(success_rate, 1),
+            'clean_start_date': user.clean_start_date,
+            'last_relapse_date': user.last_relapse_date,
+            'total_days': total_days
+        }
+    
+    @staticmethod
+    async def calculate_current_streak_async(telegram_id: int) -> int:
+        """Calculate current clean streak in days without blocking the event loop"""
+        async with db.get_async_session() as session:
+            clean_start_date = await session.scalar(
+                select(User.clean_start_date).where(User.telegram_id == telegram_id)
+            )
+        return StreakService.streak_days(clean_start_date)
+    
+    @staticmethod
+    async def record_relapse_async(telegram_id: int, notes: str = None, triggers: list = None) -> bool:
+        """Record a relapse and reset streak without blocking the event loop"""
+        async with db.get_async_session() as session:
+            user = await session.scalar(select(User).where(User.telegram_id == telegram_id))
+            if not user:
+                return False
             
-            return {
-                'current_streak': current_streak,
-                'longest_streak': user.longest_streak,
-                'total_relapses': user.total_relapses,
-                'success_rate': round(success_rate, 1),
-                'clean_start_date': user.clean_start_date,
-                'last_relapse_date': user.last_relapse_date,
-                'total_days': total_days
-            }
+            record = StreakService._apply_relapse(session, user, notes, triggers)
+            await session.flush()
+            for statement in StreakService._relapse_trigger_statements(session, record):
+                await session.execute(statement)
+            await session.commit()
+            UserService.invalidate_user(telegram_id)
+            return True
+    
+    @staticmethod
+    async def get_streak_stats_async(telegram_id: int) -> dict:
+        """Get comprehensive streak statistics without blocking the event loop"""
+        async with db.get_async_session() as session:
+            user = await session.scalar(select(User).where(User.telegram_id == telegram_id))
+        if not user:
+            return {}
+        
+        return StreakService._build_streak_stats(user)
+    
+    @staticmethod
+    def refresh_streaks(chunk_size: int = None, now: datetime = None) -> dict:
+        """
+        Recompute current_streak and longest_streak for every user
+        
+        Reads compute the streak from clean_start_date, so the stored columns are
+        refreshed here (nightly) for analytics and leaderboard queries. Each chunk
+        is one set-based UPDATE over an id range, committed on its own so the
+        write lock is only held briefly.
+        
+        Returns:
+            Report dict with updated, chunks and duration
+        """
+        chunk_size = chunk_size or settings.STREAK_REFRESH_CHUNK_SIZE
+        now = now or datetime.utcnow()
+        started_at = time.monotonic()
+        report = {'updated': 0, 'chunks': 0, 'duration': 0.0}
+        
+        session = db.get_session()
+        try:
+            min_id, max_id = session.query(func.min(User.id), func.max(User.id)).one()
+            if min_id is not None:
+                streak = StreakService._streak_days_expression(session.bind.dialect.name, now)
+                longest = func.coalesce(User.longest_streak, 0)
+                
+                for chunk_start in range(min_id, max_id + 1, chunk_size):
+                    result = session.execute(
+                        update(User)
+                        .where(User.id >= chunk_start, User.id < chunk_start + chunk_size)
+                        .where(User.clean_start_date.isnot(None))
+                        .where(or_(
+                            User.current_streak.is_(None),
+                            User.current_streak != streak,
+                            longest < streak
+                        ))
+                        .values(
+                            current_streak=streak,
+                            longest_streak=case((streak > longest, streak), else_=longest)
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                    session.commit()
+                    report['updated'] += result.rowcount
+                    report['chunks'] += 1
         finally:
             db.close_session(session)
+        
+        report['duration'] = round(time.monotonic() - started_at, 3)
+        return report
+    
+    @staticmethod
+    def _streak_days_expression(dialect_name: str, now: datetime):
+        """SQL expression equal to streak_days(User.clean_start_date, now)"""
+        if dialect_name == 'sqlite':
+            days = cast(func.julianday(now) - func.julianday(User.clean_start_date), Integer)
+        else:
+            days = cast(func.floor(func.extract('epoch', now - User.clean_start_date) / 86400), Integer)
+        return case((days > 0, days), else_=0)
     
     @staticmethod
     def get_streak_milestones(current_streak: int) -> dict:
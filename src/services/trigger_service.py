@@ -0,0 +1,267 @@
+import ast
+import json
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from config.settings import settings
+from src.database.database import db
+from src.database.models import (JournalEntry, MoodEntry, RelapseRecord, TriggerLink, TriggerStat,
+                                 TriggerTag, TriggerTotal)
+from src.utils.logger import app_logger
+
+# telegram_id used for rows holding counts over all users
+GLOBAL_SCOPE = 0
+
+SOURCE_JOURNAL = 'journal'
+SOURCE_RELAPSE = 'relapse'
+SOURCE_MOOD = 'mood'
+
+MAX_TAG_LENGTH = 100
+
+_HASHTAG = re.compile(r"#([^\W\d_][\w-]*)")
+
+def _upsert(dialect_name: str, table):
+    """Dialect-specific INSERT supporting ON CONFLICT"""
+    return postgresql.insert(table) if dialect_name == 'postgresql' else sqlite.insert(table)
+
+class TriggerService:
+    """Service untuk trigger tags dan statistik trigger yang di-update saat record dibuat"""
+
+    @staticmethod
+    def normalize(triggers: Iterable) -> List[str]:
+        """Lowercase, trim and de-duplicate trigger names (order kept)"""
+        tags = []
+        for trigger in triggers or ():
+            tag = " ".join(str(trigger).split()).lower().strip("#")[:MAX_TAG_LENGTH]
+            if tag and tag not in tags:
+                tags.append(tag)
+        return tags
+
+    @staticmethod
+    def parse_triggers(raw) -> List[str]:
+        """
+        Parse stored triggers into normalized tags
+
+        Accepts a list, JSON text ('["stres"]'), the legacy ``str(list)`` format
+        ("['stres', 'bosan']") or plain comma-separated text.
+        """
+        if raw is None:
+            return []
+        if isinstance(raw, (list, tuple, set)):
+            return TriggerService.normalize(raw)
+
+        raw = str(raw).strip()
+        if not raw:
+            return []
+        if raw[0] in '[(':
+            for parse in (json.loads, ast.literal_eval):
+                try:
+                    value = parse(raw)
+                except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+                    continue
+                if isinstance(value, (list, tuple)):
+                    return TriggerService.normalize(value)
+            raw = raw.strip('[]()')
+        return TriggerService.normalize(part.strip(" '\"") for part in raw.split(','))
+
+    @staticmethod
+    def extract_hashtags(text: Optional[str]) -> List[str]:
+        """Triggers tagged in free text, e.g. "urge kuat #stres #bosan" """
+        return TriggerService.normalize(_HASHTAG.findall(text or ""))
+
+    @staticmethod
+    def record_statements(dialect_name: str, telegram_id: int, source: str, source_id: int,
+                          occurred_at: datetime, tags: List[str]) -> list:
+        """
+        Statements linking one record to its tags and updating user + global counts
+
+        Executed in the caller's transaction, after the record has an id.
+        """
+        if not tags:
+            return []
+
+        is_relapse = 1 if source == SOURCE_RELAPSE else 0
+        hour = occurred_at.hour
+        scopes = (telegram_id, GLOBAL_SCOPE)
+
+        tag_insert = _upsert(dialect_name, TriggerTag.__table__)\
+            .values([{'name': tag, 'created_at': datetime.utcnow()} for tag in tags])\
+            .on_conflict_do_nothing(index_elements=['name'])
+
+        link_insert = TriggerLink.__table__.insert().values([
+            {'source': source, 'source_id': source_id, 'tag': tag,
+             'telegram_id': telegram_id, 'occurred_at': occurred_at}
+            for tag in tags
+        ])
+
+        stat_table = TriggerStat.__table__
+        stat_insert = _upsert(dialect_name, stat_table).values([
+            {'telegram_id': scope, 'tag': tag, 'hour': hour, 'occurrences': 1, 'relapses': is_relapse}
+            for scope in scopes for tag in tags
+        ])
+        stat_upsert = stat_insert.on_conflict_do_update(
+            index_elements=['telegram_id', 'tag', 'hour'],
+            set_={
+                'occurrences': stat_table.c.occurrences + stat_insert.excluded.occurrences,
+                'relapses': stat_table.c.relapses + stat_insert.excluded.relapses
+            }
+        )
+
+        total_table = TriggerTotal.__table__
+        total_insert = _upsert(dialect_name, total_table).values([
+            {'telegram_id': scope, 'records': 1, 'relapse_records': is_relapse} for scope in scopes
+        ])
+        total_upsert = total_insert.on_conflict_do_update(
+            index_elements=['telegram_id'],
+            set_={
+                'records': total_table.c.records + 1,
+                'relapse_records': total_table.c.relapse_records + is_relapse
+            }
+        )
+
+        return [tag_insert, link_insert, stat_upsert, total_upsert]
+
+    @staticmethod
+    def _local_hour_shift(tz_name: Optional[str]) -> int:
+        """Whole-hour offset used to show UTC hour buckets in the user's timezone"""
+        try:
+            tz = ZoneInfo(tz_name or settings.TIMEZONE)
+        except (ZoneInfoNotFoundError, ValueError):
+            tz = ZoneInfo(settings.TIMEZONE)
+        offset = datetime.now(timezone.utc).astimezone(tz).utcoffset()
+        return int(offset.total_seconds() // 3600)
+
+    @staticmethod
+    def build_report(stats: Iterable, total: Optional[TriggerTotal], tz_name: str = None, limit: int = 5) -> Dict:
+        """
+        Frequencies, time-of-day distribution and trigger→relapse lift from stat rows
+
+        lift = P(relapse | trigger) / P(relapse) over records with triggers;
+        None while there is no relapse to compare against.
+        """
+        records = total.records if total else 0
+        relapse_records = total.relapse_records if total else 0
+        base_rate = relapse_records / records if records else 0
+
+        counts, relapses = Counter(), Counter()
+        hours = [0] * 24
+        shift = TriggerService._local_hour_shift(tz_name)
+        for stat in stats:
+            counts[stat.tag] += stat.occurrences
+            relapses[stat.tag] += stat.relapses
+            hours[(stat.hour + shift) % 24] += stat.occurrences
+
+        triggers = [
+            {
+                'tag': tag,
+                'count': count,
+                'relapses': relapses[tag],
+                'lift': (relapses[tag] / count) / base_rate if base_rate else None
+            }
+            for tag, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        ]
+        return {
+            'records': records,
+            'relapse_records': relapse_records,
+            'triggers': triggers,
+            'hours': hours
+        }
+
+    @staticmethod
+    def _stats_statement(telegram_id: int):
+        return select(TriggerStat).where(TriggerStat.telegram_id == telegram_id)
+
+    @staticmethod
+    def get_trigger_report(telegram_id: int = GLOBAL_SCOPE, tz_name: str = None, limit: int = 5) -> Dict:
+        """Trigger report for one user (GLOBAL_SCOPE for all users)"""
+        session = db.get_session()
+        try:
+            stats = session.scalars(TriggerService._stats_statement(telegram_id)).all()
+            total = session.get(TriggerTotal, telegram_id)
+            return TriggerService.build_report(stats, total, tz_name, limit)
+        finally:
+            db.close_session(session)
+
+    @staticmethod
+    async def get_trigger_report_async(telegram_id: int = GLOBAL_SCOPE, tz_name: str = None, limit: int = 5) -> Dict:
+        """Trigger report without blocking the event loop"""
+        async with db.get_async_session() as session:
+            stats = (await session.scalars(TriggerService._stats_statement(telegram_id))).all()
+            total = await session.get(TriggerTotal, telegram_id)
+        return TriggerService.build_report(stats, total, tz_name, limit)
+
+    @staticmethod
+    def rebuild(connection, batch_size: int = 1000) -> int:
+        """
+        Re-derive tags, links and counts from the triggers columns (legacy formats included)
+
+        Args:
+            connection: Connection inside a transaction (e.g. ``engine.begin()``)
+            batch_size: Source rows streamed per fetch
+
+        Returns:
+            Number of records with at least one trigger
+        """
+        for model in (TriggerLink, TriggerStat, TriggerTotal):
+            connection.execute(delete(model.__table__))
+
+        sources = [
+            (SOURCE_JOURNAL, select(JournalEntry.id, JournalEntry.telegram_id, JournalEntry.triggers,
+                                    JournalEntry.created_at).where(JournalEntry.triggers.isnot(None))),
+            (SOURCE_RELAPSE, select(RelapseRecord.id, RelapseRecord.telegram_id, RelapseRecord.triggers,
+                                    RelapseRecord.relapse_date).where(RelapseRecord.triggers.isnot(None))),
+            (SOURCE_MOOD, select(MoodEntry.id, MoodEntry.user_id, MoodEntry.triggers_today,
+                                 MoodEntry.created_at).where(MoodEntry.triggers_today.isnot(None))),
+        ]
+
+        tags, links = set(), []
+        stats, totals = Counter(), Counter()
+        records = 0
+        for source, statement in sources:
+            is_relapse = 1 if source == SOURCE_RELAPSE else 0
+            for source_id, telegram_id, raw, occurred_at in connection.execution_options(yield_per=batch_size).execute(statement):
+                record_tags = TriggerService.parse_triggers(raw)
+                if not record_tags or occurred_at is None:
+                    continue
+                records += 1
+                tags.update(record_tags)
+                for scope in (telegram_id, GLOBAL_SCOPE):
+                    totals[(scope, 'records')] += 1
+                    totals[(scope, 'relapse_records')] += is_relapse
+                    for tag in record_tags:
+                        stats[(scope, tag, occurred_at.hour, 'occurrences')] += 1
+                        stats[(scope, tag, occurred_at.hour, 'relapses')] += is_relapse
+                links.extend({'source': source, 'source_id': source_id, 'tag': tag,
+                              'telegram_id': telegram_id, 'occurred_at': occurred_at} for tag in record_tags)
+                if len(links) >= batch_size:
+                    connection.execute(TriggerLink.__table__.insert(), links)
+                    links = []
+        if links:
+            connection.execute(TriggerLink.__table__.insert(), links)
+
+        if tags:
+            now = datetime.utcnow()
+            connection.execute(
+                _upsert(connection.dialect.name, TriggerTag.__table__).on_conflict_do_nothing(index_elements=['name']),
+                [{'name': tag, 'created_at': now} for tag in sorted(tags)]
+            )
+        stat_rows = [
+            {'telegram_id': scope, 'tag': tag, 'hour': hour, 'occurrences': count,
+             'relapses': stats[(scope, tag, hour, 'relapses')]}
+            for (scope, tag, hour, field), count in stats.items() if field == 'occurrences'
+        ]
+        if stat_rows:
+            connection.execute(TriggerStat.__table__.insert(), stat_rows)
+        total_rows = [
+            {'telegram_id': scope, 'records': count, 'relapse_records': totals[(scope, 'relapse_records')]}
+            for (scope, field), count in totals.items() if field == 'records'
+        ]
+        if total_rows:
+            connection.execute(TriggerTotal.__table__.insert(), total_rows)
+
+        app_logger.info(f"Rebuilt trigger tags for {records} records ({len(tags)} distinct triggers)")
+        return records
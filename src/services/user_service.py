@@ -1,16 +1,49 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import Date, and_, case, literal, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
+from config.settings import settings
 from src.database.models import User
 from src.database.database import db
+from src.services.mood_analytics_service import MoodAnalyticsService
+from src.utils.cache import TTLCache
 
 class UserService:
     """Service untuk mengelola user data"""
     
+    AUDIENCE_CHUNK_SIZE = 1000
+    
+    # Write-through cache of detached User profiles keyed by telegram_id
+    profile_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+    
+    @staticmethod
+    def _cached_profile(telegram_id: int, username: str, first_name: str, last_name: str) -> Optional[User]:
+        """Get cached user if its Telegram profile fields are unchanged"""
+        user = UserService.profile_cache.get(telegram_id)
+        if user is not None and (user.username, user.first_name, user.last_name) == (username, first_name, last_name):
+            return user
+        return None
+    
+    @staticmethod
+    def invalidate_user(telegram_id: int):
+        """Drop a user from the profile cache after a write"""
+        UserService.profile_cache.invalidate(telegram_id)
+    
+    @staticmethod
+    def get_cache_stats() -> dict:
+        """Get profile cache hit/miss counters"""
+        return UserService.profile_cache.stats()
+    
     @staticmethod
     def get_or_create_user(telegram_id: int, username: str = None, 
                           first_name: str = None, last_name: str = None) -> User:
         """Get existing user or create new one"""
+        cached = UserService._cached_profile(telegram_id, username, first_name, last_name)
+        if cached is not None:
+            return cached
+        
         session = db.get_session()
         try:
             user = session.query(User).filter(User.telegram_id == telegram_id).first()
@@ -26,37 +59,91 @@ class UserService:
                 session.add(user)
                 session.commit()
                 session.refresh(user)
-            else:
-                # Update user info if changed
-                updated = False
-                if user.username != username:
-                    user.username = username
-                    updated = True
-                if user.first_name != first_name:
-                    user.first_name = first_name
-                    updated = True
-                if user.last_name != last_name:
-                    user.last_name = last_name
-                    updated = True
-                
-                if updated:
-                    user.updated_at = datetime.utcnow()
-                    session.commit()
-                    session.refresh(user)
+            elif UserService._apply_profile_changes(user, username, first_name, last_name):
+                session.commit()
+                session.refresh(user)
             
+            UserService.profile_cache.set(telegram_id, user)
             return user
         finally:
             db.close_session(session)
     
+    @staticmethod
+    async def get_or_create_user_async(telegram_id: int, username: str = None,
+                                       first_name: str = None, last_name: str = None) -> User:
+        """Get existing user or create new one without blocking the event loop"""
+        cached = UserService._cached_profile(telegram_id, username, first_name, last_name)
+        if cached is not None:
+            return cached
+        
+        async with db.get_async_session() as session:
+            user = await session.scalar(select(User).where(User.telegram_id == telegram_id))
+            
+            if not user:
+                user = User(
+                    telegram_id=telegram_id,
+                    username=username,
+                    first_name=first_name,
+                    last_name=last_name,
+                    clean_start_date=datetime.utcnow()
+                )
+                session.add(user)
+                await session.commit()
+                await session.refresh(user)
+            elif UserService._apply_profile_changes(user, username, first_name, last_name):
+                await session.commit()
+                await session.refresh(user)
+            
+            UserService.profile_cache.set(telegram_id, user)
+            return user
+    
+    @staticmethod
+    def _apply_profile_changes(user: User, username: str, first_name: str, last_name: str) -> bool:
+        """Update user info if changed; returns True when something was modified"""
+        updated = False
+        if user.username != username:
+            user.username = username
+            updated = True
+        if user.first_name != first_name:
+            user.first_name = first_name
+            updated = True
+        if user.last_name != last_name:
+            user.last_name = last_name
+            updated = True
+        
+        if updated:
+            user.updated_at = datetime.utcnow()
+        return updated
+    
     @staticmethod
     def get_user(telegram_id: int) -> Optional[User]:
         """Get user by telegram ID"""
+        cached = UserService.profile_cache.get(telegram_id)
+        if cached is not None:
+            return cached
+        
         session = db.get_session()
         try:
-            return session.query(User).filter(User.telegram_id == telegram_id).first()
+            user = session.query(User).filter(User.telegram_id == telegram_id).first()
+            if user:
+                UserService.profile_cache.set(telegram_id, user)
+            return user
         finally:
             db.close_session(session)
     
+    @staticmethod
+    async def get_user_async(telegram_id: int) -> Optional[User]:
+        """Get user by telegram ID without blocking the event loop"""
+        cached = UserService.profile_cache.get(telegram_id)
+        if cached is not None:
+            return cached
+        
+        async with db.get_async_session() as session:
+            user = await session.scalar(select(User).where(User.telegram_id == telegram_id))
+        if user:
+            UserService.profile_cache.set(telegram_id, user)
+        return user
+    
     @staticmethod
     def update_user_preferences(telegram_id: int, daily_reminders: bool = None,
                               reminder_time: str = None, timezone: str = None) -> bool:
@@ -76,6 +163,7 @@ class UserService:
             
             user.updated_at = datetime.utcnow()
             session.commit()
+            UserService.invalidate_user(telegram_id)
             return True
         finally:
             db.close_session(session)
@@ -90,17 +178,124 @@ class UserService:
             db.close_session(session)
     
     @staticmethod
-    def has_checked_in_today(telegram_id: int) -> bool:
-        """Check if user has done mood check-in today"""
+    def _today_checkin_day(timezones, now: datetime = None):
+        """Today's check-in day in each user's timezone, as a SQL expression on User.timezone"""
+        now = now or datetime.utcnow()
+        default_day = literal(UserService.checkin_day(None, now), Date)
+        days = {tz: literal(UserService.checkin_day(tz, now), Date) for tz in timezones if tz}
+        return case(days, value=User.timezone, else_=default_day) if days else default_day
+    
+    @staticmethod
+    def _checked_in_today_condition(session: Session, slots: list[tuple[str, str]] = None):
+        """
+        Join condition matching a reminder user's mood entry for today in their own timezone
+        
+        Today is resolved once per distinct reminder timezone (from ``slots`` when given)
+        and looked up through the unique (user_id, checkin_day) index.
+        """
+        from src.database.models import MoodEntry
+        if slots is not None:
+            timezones = {tz for tz, _ in slots}
+        else:
+            timezones = {tz for (tz,) in session.query(User.timezone).filter(User.daily_reminders == True).distinct()}
+        
+        return and_(
+            MoodEntry.user_id == User.telegram_id,
+            MoodEntry.checkin_day == UserService._today_checkin_day(timezones)
+        )
+    
+    @staticmethod
+    def count_users_with_reminders() -> int:
+        """Count users who have daily reminders enabled"""
+        session = db.get_session()
+        try:
+            return session.query(User).filter(User.daily_reminders == True).count()
+        finally:
+            db.close_session(session)
+    
+    @staticmethod
+    def get_reminder_slots() -> list[tuple[str, str]]:
+        """Get distinct (timezone, reminder_time) pairs of users with reminders enabled"""
+        session = db.get_session()
+        try:
+            return [
+                (tz, reminder_time) for tz, reminder_time in
+                session.query(User.timezone, User.reminder_time)
+                    .filter(User.daily_reminders == True)
+                    .distinct()
+                    .all()
+            ]
+        finally:
+            db.close_session(session)
+    
+    @staticmethod
+    def iter_users_with_reminders(chunk_size: int = None, include_checkin_status: bool = False,
+                                  slots: list[tuple[str, str]] = None) -> Iterator:
+        """
+        Stream users with daily reminders enabled as lightweight rows
+        
+        Rows are fetched in keyset-paginated chunks ordered by ``User.id`` with a
+        short-lived session per chunk, so memory stays flat regardless of user count.
+        
+        Args:
+            chunk_size: Rows per chunk (defaults to AUDIENCE_CHUNK_SIZE)
+            include_checkin_status: Add a ``checked_in_today`` column from today's mood entries
+            slots: Only include users matching one of these (timezone, reminder_time) pairs
+            
+        Yields:
+            Rows of (id, telegram_id, timezone, reminder_time, first_name[, checked_in_today])
+        """
+        from src.database.models import MoodEntry
+        chunk_size = chunk_size or UserService.AUDIENCE_CHUNK_SIZE
+        last_id = 0
+        checked_in_today = None
+        
+        while True:
+            session = db.get_session()
+            try:
+                columns = [User.id, User.telegram_id, User.timezone, User.reminder_time, User.first_name]
+                if include_checkin_status:
+                    if checked_in_today is None:
+                        checked_in_today = UserService._checked_in_today_condition(session, slots)
+                    query = session.query(*columns, MoodEntry.id.isnot(None).label('checked_in_today'))\
+                        .outerjoin(MoodEntry, checked_in_today)
+                else:
+                    query = session.query(*columns)
+                
+                query = query.filter(User.daily_reminders == True, User.id > last_id)
+                if slots is not None:
+                    query = query.filter(or_(*[
+                        and_(User.timezone == tz, User.reminder_time == reminder_time)
+                        for tz, reminder_time in slots
+                    ]))
+                
+                rows = query\
+                    .order_by(User.id)\
+                    .limit(chunk_size)\
+                    .all()
+            finally:
+                db.close_session(session)
+            
+            if not rows:
+                return
+            
+            yield from rows
+            
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1].id
+    
+    @staticmethod
+    def has_checked_in_today(telegram_id: int, tz_name: str = None) -> bool:
+        """Check if user has done mood check-in today (in the user's timezone)"""
         session = db.get_session()
         try:
             from src.database.models import MoodEntry
-            today = datetime.now().date()
+            tz_name = tz_name or UserService._timezone_of(UserService.get_user(telegram_id))
             
-            mood_entry = session.query(MoodEntry).filter(
+            mood_entry = session.query(MoodEntry.id).filter(
                 MoodEntry.user_id == telegram_id,
-                MoodEntry.created_at >= datetime.combine(today, datetime.min.time()),
-                MoodEntry.created_at < datetime.combine(today + timedelta(days=1), datetime.min.time())
+                MoodEntry.checkin_day == UserService.checkin_day(tz_name)
             ).first()
             
             return mood_entry is not None
@@ -109,67 +304,142 @@ class UserService:
         finally:
             db.close_session(session)
     
+    @staticmethod
+    async def has_checked_in_today_async(telegram_id: int, tz_name: str = None) -> bool:
+        """Check if user has done mood check-in today without blocking the event loop"""
+        try:
+            from src.database.models import MoodEntry
+            tz_name = tz_name or UserService._timezone_of(await UserService.get_user_async(telegram_id))
+            
+            async with db.get_async_session() as session:
+                entry_id = await session.scalar(
+                    select(MoodEntry.id).where(
+                        MoodEntry.user_id == telegram_id,
+                        MoodEntry.checkin_day == UserService.checkin_day(tz_name)
+                    ).limit(1)
+                )
+            return entry_id is not None
+        except Exception:
+            return False
+    
+    @staticmethod
+    def get_checked_in_today_ids() -> set[int]:
+        """Get telegram IDs of all users who have done mood check-in today (each in their timezone)"""
+        session = db.get_session()
+        try:
+            from src.database.models import MoodEntry
+            now = datetime.utcnow()
+            
+            # Today's entry was first written after the user's local midnight, at most 25h ago (DST)
+            rows = session.query(MoodEntry.user_id, MoodEntry.checkin_day, User.timezone)\
+                .outerjoin(User, User.telegram_id == MoodEntry.user_id)\
+                .filter(MoodEntry.created_at >= now - timedelta(hours=25))\
+                .all()
+            return {user_id for user_id, day, tz in rows if day == UserService.checkin_day(tz, now)}
+        except Exception:
+            return set()
+        finally:
+            db.close_session(session)
+    
     @staticmethod
     def get_users_without_checkin_today() -> list[User]:
         """Get users with reminders enabled who haven't checked in today"""
         session = db.get_session()
         try:
             from src.database.models import MoodEntry
-            today = datetime.now().date()
-            
-            # Get all users with reminders
-            users_with_reminders = session.query(User).filter(User.daily_reminders == True).all()
             
-            users_without_checkin = []
-            for user in users_with_reminders:
-                # Check if user has mood entry today
-                mood_entry = session.query(MoodEntry).filter(
-                    MoodEntry.user_id == user.telegram_id,
-                    MoodEntry.created_at >= datetime.combine(today, datetime.min.time()),
-                    MoodEntry.created_at < datetime.combine(today + timedelta(days=1), datetime.min.time())
-                ).first()
-                
-                if not mood_entry:
-                    users_without_checkin.append(user)
-            
-            return users_without_checkin
+            # Anti-join: users with reminders and no mood entry for their today
+            return session.query(User)\
+                .outerjoin(MoodEntry, UserService._checked_in_today_condition(session))\
+                .filter(User.daily_reminders == True, MoodEntry.id.is_(None))\
+                .all()
         except Exception:
             return []
         finally:
             db.close_session(session)
     
     @staticmethod
-    def record_mood_checkin(telegram_id: int, mood_score: int, notes: str = None) -> bool:
-        """Record daily mood check-in"""
+    def _timezone_of(user: Optional[User]) -> str:
+        """User timezone, else the default timezone"""
+        return (user.timezone if user is not None else None) or settings.TIMEZONE
+    
+    @staticmethod
+    def checkin_day(tz_name: str = None, now: datetime = None) -> date:
+        """Local calendar day of a check-in made at ``now`` (naive UTC)"""
+        try:
+            tz = ZoneInfo(tz_name or settings.TIMEZONE)
+        except (ZoneInfoNotFoundError, ValueError):
+            tz = ZoneInfo(settings.TIMEZONE)
+        return (now or datetime.utcnow()).replace(tzinfo=timezone.utc).astimezone(tz).date()
+    
+    @staticmethod
+    def _mood_checkin_upsert(dialect_name: str, telegram_id: int, mood_score: int, fields: dict,
+                             tz_name: str, now: datetime):
+        """
+        ``INSERT ... ON CONFLICT (user_id, checkin_day) DO UPDATE`` for one check-in
+        
+        user_aggregates follows through the mood_entries triggers (see migrations), so
+        this is the only statement a check-in runs.
+        """
+        from src.database.models import MoodEntry
+        
+        table = MoodEntry.__table__
+        insert = (postgresql.insert(table) if dialect_name == 'postgresql' else sqlite.insert(table)).values(
+            user_id=telegram_id, mood_score=mood_score, checkin_day=UserService.checkin_day(tz_name, now),
+            created_at=now, updated_at=now, **fields
+        )
+        return insert.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.checkin_day],
+            set_={name: insert.excluded[name] for name in ('mood_score', *fields, 'updated_at')}
+        )
+    
+    @staticmethod
+    def save_mood_checkin(telegram_id: int, mood_score: int, tz_name: str = None, **fields) -> bool:
+        """
+        Insert or overwrite today's check-in in one upsert (shared by quick and detailed check-ins)
+        
+        Args:
+            fields: Other MoodEntry columns to set (notes, energy_level, ...); columns
+                not given keep their value when today's entry is overwritten
+        """
+        now = datetime.utcnow()
+        tz_name = tz_name or UserService._timezone_of(UserService.get_user(telegram_id))
         session = db.get_session()
         try:
-            from src.database.models import MoodEntry
-            
-            # Check if already checked in today
-            today = datetime.now().date()
-            existing_entry = session.query(MoodEntry).filter(
-                MoodEntry.user_id == telegram_id,
-                MoodEntry.created_at >= datetime.combine(today, datetime.min.time()),
-                MoodEntry.created_at < datetime.combine(today + timedelta(days=1), datetime.min.time())
-            ).first()
-            
-            if existing_entry:
-                # Update existing entry
-                existing_entry.mood_score = mood_score
-                existing_entry.notes = notes
-                existing_entry.updated_at = datetime.utcnow()
-            else:
-                # Create new entry
-                mood_entry = MoodEntry(
-                    user_id=telegram_id,
-                    mood_score=mood_score,
-                    notes=notes
-                )
-                session.add(mood_entry)
-            
+            session.execute(UserService._mood_checkin_upsert(
+                session.bind.dialect.name, telegram_id, mood_score, fields, tz_name, now
+            ))
             session.commit()
+            MoodAnalyticsService.invalidate(telegram_id)
             return True
-        except Exception:
-            return False
         finally:
             db.close_session(session)
+    
+    @staticmethod
+    async def save_mood_checkin_async(telegram_id: int, mood_score: int, tz_name: str = None, **fields) -> bool:
+        """Insert or overwrite today's check-in in one upsert without blocking the event loop"""
+        now = datetime.utcnow()
+        tz_name = tz_name or UserService._timezone_of(await UserService.get_user_async(telegram_id))
+        async with db.get_async_session() as session:
+            await session.execute(UserService._mood_checkin_upsert(
+                session.bind.dialect.name, telegram_id, mood_score, fields, tz_name, now
+            ))
+            await session.commit()
+        MoodAnalyticsService.invalidate(telegram_id)
+        return True
+    
+    @staticmethod
+    def record_mood_checkin(telegram_id: int, mood_score: int, notes: str = None) -> bool:
+        """Record daily mood check-in"""
+        try:
+            return UserService.save_mood_checkin(telegram_id, mood_score, notes=notes)
+        except Exception:
+            return False
+    
+    @staticmethod
+    async def record_mood_checkin_async(telegram_id: int, mood_score: int, notes: str = None) -> bool:
+        """Record daily mood check-in without blocking the event loop"""
+        try:
+            return await UserService.save_mood_checkin_async(telegram_id, mood_score, notes=notes)
+        except Exception:
+            return False
@@ -5,6 +5,8 @@ from .helpers import (
     format_duration, calculate_success_rate, get_motivational_emoji,
     format_time_ago, sanitize_input, validate_mood_score, get_mood_emoji
 )
+from .cache import TTLCache
+from .conversation_state import ConversationStateStore, MemoryStateStore, SQLiteStateStore, conversation_state
 from .constants import *
 
 __all__ = [
@@ -18,5 +20,10 @@ __all__ = [
     'format_time_ago',
     'sanitize_input',
     'validate_mood_score',
-    'get_mood_emoji'
+    'get_mood_emoji',
+    'TTLCache',
+    'ConversationStateStore',
+    'MemoryStateStore',
+    'SQLiteStateStore',
+    'conversation_state'
 ]
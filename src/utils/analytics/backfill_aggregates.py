@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Backfill User Aggregates
+Rebuild user_aggregates from journal_entries and mood_entries
+"""
+
+import sys
+import os
+import time
+import argparse
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from src.database.database import db
+from src.services.aggregate_service import AggregateService
+
+def backfill(telegram_id: int = None, batch_size: int = 1000) -> int:
+    """Rebuild aggregates in one transaction; returns the number of rows written"""
+    db.create_tables()
+    with db.engine.begin() as connection:
+        return AggregateService.rebuild(connection, telegram_id=telegram_id, batch_size=batch_size)
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Rebuild per-user journal and mood aggregates")
+    parser.add_argument("--user", type=int, help="Only rebuild this telegram_id")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Journal rows streamed per fetch")
+    args = parser.parse_args()
+    
+    print("🕐 Aggregate backfill started at:", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    started_at = time.monotonic()
+    
+    try:
+        written = backfill(args.user, args.batch_size)
+    except Exception as e:
+        print(f"❌ Backfill failed: {e}")
+        sys.exit(1)
+    
+    print(f"✅ {written} aggregate rows rebuilt in {time.monotonic() - started_at:.2f}s")
+
+if __name__ == "__main__":
+    main()
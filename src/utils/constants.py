@@ -15,6 +15,7 @@ COMMANDS = {
     'relapse': 'Lapor relapse',
     'stats': 'Lihat statistik',
     'journal': 'Buka menu journaling',
+    'searchjournal': 'Cari journal entries',
     'tips': 'Coping strategies',
     'education': 'Materi edukasi'
 }
@@ -27,6 +28,10 @@ DEFAULT_REMINDER_TIME = "08:00"
 
 # Maximum text lengths
 MAX_JOURNAL_LENGTH = 2000
+
+# Journal search snippet highlight markers (converted to Markdown bold for display)
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
 MAX_NOTES_LENGTH = 500
 MAX_USERNAME_LENGTH = 32
 
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+from config.settings import settings
+from src.utils.cache import TTLCache
+
+def _encode(value):
+    """JSON encoder hook for datetimes stored in conversation state"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    raise TypeError(f"Conversation state value of type {type(value).__name__} is not JSON serializable")
+
+def _decode(item: dict):
+    if '__datetime__' in item:
+        return datetime.fromisoformat(item['__datetime__'])
+    if '__date__' in item:
+        return date.fromisoformat(item['__date__'])
+    return item
+
+class ConversationStateStore(ABC):
+    """
+    Per-user state for multi-step flows (journal drafts, mood check-ins)
+
+    Bounded by ``max_entries`` (least recently written users are evicted first)
+    and ``ttl`` seconds since the last write, so abandoned flows disappear.
+    Backends implement ``_load``, ``_save`` and ``_delete``; backends doing
+    blocking I/O override ``_run`` to keep it off the event loop.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    async def get(self, user_id: int) -> Dict[str, Any]:
+        """User's state (a copy; empty when missing or expired)"""
+        return await self._run(self._get, user_id)
+
+    async def update(self, user_id: int, **values) -> Dict[str, Any]:
+        """Merge values into the user's state and refresh its TTL"""
+        return await self._run(self._update, user_id, values)
+
+    async def pop(self, user_id: int, key: str, default: Any = None) -> Any:
+        """Remove one key from the user's state"""
+        return await self._run(self._pop, user_id, key, default)
+
+    async def clear(self, user_id: int):
+        """Drop the user's state (flow finished or cancelled)"""
+        await self._run(self._delete, user_id)
+
+    async def _run(self, operation, *args):
+        """Run one whole state operation"""
+        return operation(*args)
+
+    def _get(self, user_id: int) -> Dict[str, Any]:
+        return dict(self._load(user_id) or {})
+
+    def _update(self, user_id: int, values: dict) -> Dict[str, Any]:
+        state = self._get(user_id)
+        state.update(values)
+        self._save(user_id, state)
+        return state
+
+    def _pop(self, user_id: int, key: str, default: Any) -> Any:
+        state = self._get(user_id)
+        if key not in state:
+            return default
+        value = state.pop(key)
+        if state:
+            self._save(user_id, state)
+        else:
+            self._delete(user_id)
+        return value
+
+    @abstractmethod
+    def _load(self, user_id: int) -> Optional[dict]:
+        """Stored state, or None when missing or expired"""
+
+    @abstractmethod
+    def _save(self, user_id: int, state: dict):
+        """Replace the user's state and refresh its TTL"""
+
+    @abstractmethod
+    def _delete(self, user_id: int):
+        """Remove the user's state"""
+
+class MemoryStateStore(ConversationStateStore):
+    """In-process LRU backend (state is lost on restart)"""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 21600):
+        super().__init__(max_entries, ttl)
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl)
+
+    def _load(self, user_id: int) -> Optional[dict]:
+        return self._cache.get(user_id)
+
+    def _save(self, user_id: int, state: dict):
+        self._cache.set(user_id, dict(state))
+
+    def _delete(self, user_id: int):
+        self._cache.invalidate(user_id)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def stats(self) -> dict:
+        return dict(self._cache.stats(), backend='memory')
+
+class SQLiteStateStore(ConversationStateStore):
+    """
+    SQLite backend (state survives restarts)
+
+    Uses its own small database file, opened on first use. Operations run in a
+    worker thread so a slow disk never blocks the event loop; the lock keeps each
+    read-modify-write atomic.
+    """
+
+    # Expired rows are swept once every this many writes
+    PURGE_EVERY = 500
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: float = 21600):
+        super().__init__(max_entries, ttl)
+        self.path = path
+        self._connection = None
+        self._lock = threading.RLock()
+        self._size = 0
+        self._writes = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS conversation_state (
+                    user_id INTEGER PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_conversation_state_expires_at ON conversation_state (expires_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_conversation_state_updated_at ON conversation_state (updated_at)")
+            connection.execute("DELETE FROM conversation_state WHERE expires_at < ?", (time.time(),))
+            self._size = connection.execute("SELECT COUNT(*) FROM conversation_state").fetchone()[0]
+            self._connection = connection
+        return self._connection
+
+    async def _run(self, operation, *args):
+        return await asyncio.to_thread(self._locked, operation, *args)
+
+    def _locked(self, operation, *args):
+        with self._lock:
+            return operation(*args)
+
+    def _load(self, user_id: int) -> Optional[dict]:
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT data, expires_at FROM conversation_state WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                connection.execute("DELETE FROM conversation_state WHERE user_id = ?", (user_id,))
+                self._size -= 1
+                return None
+            return json.loads(row[0], object_hook=_decode)
+
+    def _save(self, user_id: int, state: dict):
+        data = json.dumps(state, default=_encode)
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            updated = connection.execute(
+                "UPDATE conversation_state SET data = ?, expires_at = ?, updated_at = ? WHERE user_id = ?",
+                (data, now + self.ttl, now, user_id)
+            ).rowcount
+            if not updated:
+                connection.execute(
+                    "INSERT INTO conversation_state (user_id, data, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+                    (user_id, data, now + self.ttl, now)
+                )
+                self._size += 1
+
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._size -= connection.execute("DELETE FROM conversation_state WHERE expires_at < ?", (now,)).rowcount
+            if self._size > self.max_entries:
+                evicted = connection.execute(
+                    "DELETE FROM conversation_state WHERE user_id IN "
+                    "(SELECT user_id FROM conversation_state ORDER BY updated_at LIMIT ?)",
+                    (self._size - self.max_entries,)
+                ).rowcount
+                self._size -= evicted
+                self.evictions += evicted
+
+    def _delete(self, user_id: int):
+        with self._lock:
+            self._size -= self._connect().execute(
+                "DELETE FROM conversation_state WHERE user_id = ?", (user_id,)
+            ).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._connect()
+            return self._size
+
+    def stats(self) -> dict:
+        return {'backend': 'sqlite', 'size': len(self), 'max_entries': self.max_entries,
+                'evictions': self.evictions, 'path': self.path}
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+def create_state_store(backend: str = None) -> ConversationStateStore:
+    """Build the store selected by CONVERSATION_STATE_BACKEND ("sqlite" or "memory")"""
+    backend = (backend or settings.CONVERSATION_STATE_BACKEND).lower()
+    if backend == 'memory':
+        return MemoryStateStore(settings.CONVERSATION_STATE_MAX_ENTRIES, settings.CONVERSATION_STATE_TTL)
+    if backend == 'sqlite':
+        return SQLiteStateStore(settings.CONVERSATION_STATE_PATH, settings.CONVERSATION_STATE_MAX_ENTRIES,
+                                settings.CONVERSATION_STATE_TTL)
+    raise ValueError(f"Unknown CONVERSATION_STATE_BACKEND: {backend}")
+
+# Shared by every handler; the SQLite file is only opened on first use
+conversation_state = create_state_store()
@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any
 from telegram import User
+from telegram.helpers import escape_markdown
+from src.utils.constants import HIGHLIGHT_END, HIGHLIGHT_START
 
 def get_user_info(user: User) -> Dict[str, Any]:
     """Extract user information from Telegram User object"""
@@ -202,3 +204,21 @@ def get_mood_emoji(score: int) -> str:
         return "🙂"
     else:
         return "😊"
+
+def format_journal_search_results(search_text: str, search: dict) -> str:
+    """Format JournalService.search_entries results as a Markdown message"""
+    header = f"🔍 **Hasil pencarian:** {escape_markdown(search_text)}\n"
+    if not search['results']:
+        if search['page'] == 0:
+            return header + "\nTidak ada journal entry yang cocok. Coba kata kunci lain."
+        return header + "\nTidak ada hasil lagi."
+    
+    lines = [header, f"📄 Halaman {search['page'] + 1}\n"]
+    for result in search['results']:
+        date_str = result['created_at'].strftime("%d/%m/%Y %H:%M") if result['created_at'] else "-"
+        # Escape the text, then turn FTS5 highlight markers into bold
+        snippet = escape_markdown(result['snippet'] or "")
+        snippet = snippet.replace(HIGHLIGHT_START, "*").replace(HIGHLIGHT_END, "*")
+        lines.append(f"**{date_str}**\n{snippet}\n")
+    
+    return "\n".join(lines)
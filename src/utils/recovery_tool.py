@@ -3,6 +3,7 @@ Data Recovery and Restore Utilities for PMO Recovery Bot
 Advanced tools for data recovery and system repair
 """
 
+import asyncio
 import os
 import json
 import sqlite3
@@ -10,8 +11,8 @@ import shutil
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
-import zipfile
 
+from ..services.backup_archive import archive_files, extract_archive
 from ..utils.logger import app_logger
 
 logger = app_logger
@@ -351,8 +352,7 @@ class DataRecoveryTool:
             # Extract and validate backup
             temp_extract_dir = self.recovery_dir / f"temp_extract_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             
-            with zipfile.ZipFile(backup_path, 'r') as zipf:
-                zipf.extractall(temp_extract_dir)
+            await asyncio.to_thread(extract_archive, backup_path, temp_extract_dir)
             
             # Find database file in backup
             backup_db_path = temp_extract_dir / "database" / "pmo_recovery.db"
@@ -452,7 +452,7 @@ class DataRecoveryTool:
                 backup_count = 0
                 for backup_type_dir in backup_dir.iterdir():
                     if backup_type_dir.is_dir():
-                        backup_count += len(list(backup_type_dir.glob("*.zip")))
+                        backup_count += len(archive_files(backup_type_dir))
                 info["available_backups"] = backup_count
             
         except Exception as e:
@@ -470,7 +470,7 @@ class DataRecoveryTool:
             for backup_type in ["emergency", "daily", "weekly", "manual"]:
                 type_dir = backup_dir / backup_type
                 if type_dir.exists():
-                    backups = list(type_dir.glob("*.zip"))
+                    backups = archive_files(type_dir)
                     if backups:
                         latest_backup = max(backups, key=lambda x: x.stat().st_mtime)
                         age_hours = (datetime.now().timestamp() - latest_backup.stat().st_mtime) / 3600
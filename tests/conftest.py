@@ -0,0 +1,48 @@
+"""
+Shared pytest fixtures
+"""
+import asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Point the global db (sync and async sessions) at a fresh SQLite file and return its engine"""
+    from src.database.database import db
+    from src.database.engine import create_async_db_engine, create_db_engine
+    from src.database.migrations import run_migrations
+    from src.database.models import Base
+    from src.services.journal_service import JournalService
+    from src.services.mood_analytics_service import MoodAnalyticsService
+    from src.services.user_service import UserService
+
+    database_url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_db_engine(database_url)
+    # NullPool: tests call asyncio.run() repeatedly and aiosqlite connections are bound to one loop
+    async_engine = create_async_db_engine(database_url, poolclass=NullPool)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)  # triggers and indexes, as on a real install
+
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(db, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    monkeypatch.setattr(db, "async_engine", async_engine)
+    monkeypatch.setattr(db, "AsyncSessionLocal", async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    ))
+    UserService.profile_cache.clear()
+    MoodAnalyticsService.analytics_cache.clear()
+    JournalService.search_cache.clear()
+    yield engine
+    UserService.profile_cache.clear()
+    MoodAnalyticsService.analytics_cache.clear()
+    JournalService.search_cache.clear()
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
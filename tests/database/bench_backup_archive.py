@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Backup Archive Benchmark - wall time dan compression ratio per format archive
+
+Usage: python tests/database/bench_backup_archive.py [--entries 300000] [--workers 0]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.settings import settings
+from src.services.backup_archive import ARCHIVE_EXTENSIONS, available_formats, build_archive
+from src.services.backup_service import BackupService
+
+WORDS = ("urge malam pagi stres kerja tidur olahraga meditasi syukur keluarga teman fokus lelah "
+         "bosan scroll kuat bertahan relapse trigger doa jalan kopi buku musik sendiri cemas "
+         "senang tenang marah capek semangat rencana target minggu hari").split()
+
+def _seed(path: str, entries: int, users: int):
+    """Synthetic users, journal entries and mood check-ins"""
+    rng = random.Random(42)
+    start = datetime(2020, 1, 1)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, telegram_id INTEGER, first_name TEXT)")
+    connection.execute("CREATE TABLE journal_entries (id INTEGER PRIMARY KEY, telegram_id INTEGER, "
+                       "entry_text TEXT, created_at TEXT)")
+    connection.execute("CREATE TABLE mood_entries (id INTEGER PRIMARY KEY, user_id INTEGER, mood_score INTEGER, "
+                       "created_at TEXT)")
+    connection.executemany("INSERT INTO users (telegram_id, first_name) VALUES (?, ?)",
+                           [(i, f"user{i}") for i in range(1, users + 1)])
+    connection.executemany(
+        "INSERT INTO journal_entries (telegram_id, entry_text, created_at) VALUES (?, ?, ?)",
+        ((rng.randint(1, users), " ".join(rng.choices(WORDS, k=rng.randint(8, 40))),
+          (start + timedelta(minutes=i)).isoformat(sep=" ")) for i in range(entries))
+    )
+    connection.executemany(
+        "INSERT INTO mood_entries (user_id, mood_score, created_at) VALUES (?, ?, ?)",
+        ((rng.randint(1, users), rng.randint(1, 10), (start + timedelta(minutes=i)).isoformat(sep=" "))
+         for i in range(entries // 2))
+    )
+    connection.commit()
+    connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backup archive formats")
+    parser.add_argument("--entries", type=int, default=300_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--workers", type=int, default=0, help="compression threads, 0 = all cores")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        os.chdir(tmp)
+        db_path = str(tmp / "live.db")
+        _seed(db_path, args.entries, args.users)
+        print(f"Database: {os.path.getsize(db_path) / (1024 * 1024):.1f} MB, {args.entries:,} journal entries")
+
+        settings.BACKUP_STEP_SLEEP = 0
+        service = BackupService(db_path)
+        members = asyncio.run(service._database_members(tmp / "snapshot.db"))
+
+        # Single-threaded zip is the old _create_zip_archive baseline
+        runs = [("zip", 1)] + [(fmt, workers) for fmt in available_formats() if (fmt, workers) != ("zip", 1)]
+        for fmt, threads in runs:
+            report = build_archive(tmp / f"bench{ARCHIVE_EXTENSIONS[fmt]}", members, fmt, workers=threads)
+            print(f"{fmt:8} {threads:2} threads: {report['seconds']:6.2f}s, "
+                  f"{report['bytes_in'] / (1024 * 1024):7.1f} MB -> {report['bytes_out'] / (1024 * 1024):6.1f} MB, "
+                  f"ratio {report['bytes_in'] / report['bytes_out']:.2f}")
+        if "tar.zst" not in available_formats():
+            print("tar.zst skipped: pip install zstandard")
+
+if __name__ == "__main__":
+    main()
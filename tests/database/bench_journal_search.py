@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Journal Search Benchmark - latency /searchjournal di atas FTS5 dengan banyak entries
+
+Usage: python tests/database/bench_journal_search.py [--entries 1000000] [--users 10000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy.orm import sessionmaker
+from src.database.database import db
+from src.database.engine import create_db_engine
+from src.database.migrations import run_migrations
+from src.database.models import Base
+from src.services.journal_service import JournalService
+
+WORDS = ("urge malam pagi stres kerja tidur olahraga meditasi syukur keluarga teman fokus lelah "
+         "bosan scroll kuat bertahan relapse trigger doa jalan kopi buku musik sendiri cemas "
+         "senang tenang marah capek semangat rencana target minggu hari").split()
+
+def _seed(path: str, entries: int, users: int):
+    """Insert synthetic journal entries directly (FTS triggers fire on each insert)"""
+    rng = random.Random(42)
+    start = datetime(2020, 1, 1)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=OFF")
+    batch = []
+    for i in range(entries):
+        text = " ".join(rng.choices(WORDS, k=rng.randint(8, 40)))
+        created_at = (start + timedelta(minutes=i)).isoformat(sep=" ")
+        telegram_id = rng.randint(1, users)
+        batch.append((telegram_id, telegram_id, text, created_at))
+        if len(batch) == 10000:
+            connection.executemany(
+                "INSERT INTO journal_entries (user_id, telegram_id, entry_text, created_at) VALUES (?, ?, ?, ?)", batch
+            )
+            batch.clear()
+    if batch:
+        connection.executemany(
+            "INSERT INTO journal_entries (user_id, telegram_id, entry_text, created_at) VALUES (?, ?, ?, ?)", batch
+        )
+    connection.commit()
+    connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FTS5 journal search")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = create_db_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+        db.engine = engine
+        db.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        started_at = time.perf_counter()
+        _seed(path, args.entries, args.users)
+        print(f"Seeded {args.entries:,} entries for {args.users:,} users in {time.perf_counter() - started_at:.1f}s")
+
+        journal_service = JournalService()
+        rng = random.Random(7)
+        timings = []
+        for _ in range(args.queries):
+            search_text = " ".join(rng.sample(WORDS, rng.randint(1, 2)))
+            telegram_id = rng.randint(1, args.users)
+            started_at = time.perf_counter()
+            journal_service.search_entries(telegram_id, search_text, page=rng.randint(0, 2))
+            timings.append((time.perf_counter() - started_at) * 1000)
+
+        timings.sort()
+        print(f"{args.queries} searches: median {statistics.median(timings):.2f} ms, "
+              f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms, max {timings[-1]:.2f} ms")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
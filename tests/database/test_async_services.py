@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Async Services Test - AsyncSession (aiosqlite) versions of the service methods
+"""
+
+import asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.services.user_service import UserService
+from src.services.streak_service import StreakService
+from src.services.journal_service import JournalService
+from src.bot.handlers.mood_checkin_handlers import MoodCheckInHandlers
+
+def test_user_lifecycle_async(temp_db):
+    """Async user creation, profile update and lookup match the sync API"""
+    async def scenario():
+        user = await UserService.get_or_create_user_async(1, username="andi", first_name="Andi")
+        assert user.id and user.clean_start_date is not None
+
+        updated = await UserService.get_or_create_user_async(1, username="andi_baru", first_name="Andi")
+        assert updated.id == user.id and updated.username == "andi_baru"
+
+        assert (await UserService.get_user_async(1)).username == "andi_baru"
+        assert await UserService.get_user_async(999) is None
+
+    asyncio.run(scenario())
+    # Written through aiosqlite, visible through the sync engine
+    assert UserService.get_user(1).username == "andi_baru"
+
+def test_concurrent_handlers_do_not_collide(temp_db):
+    """Many concurrent async lookups run on one loop without errors"""
+    async def scenario():
+        await asyncio.gather(*[UserService.get_or_create_user_async(i) for i in range(1, 21)])
+        return await asyncio.gather(*[UserService.get_user_async(i) for i in range(1, 21)])
+
+    users = asyncio.run(scenario())
+    assert [user.telegram_id for user in users] == list(range(1, 21))
+
+def test_streak_and_journal_async(temp_db):
+    """Streak and journal async methods produce the same results as sync ones"""
+    journal_service = JournalService()
+
+    async def scenario():
+        await UserService.get_or_create_user_async(7)
+        assert await StreakService.calculate_current_streak_async(7) == 0
+        assert await StreakService.record_relapse_async(7, notes="stress")
+
+        for text in ["hari pertama yang berat", "hari kedua lebih baik"]:
+            assert await journal_service.create_journal_entry_async(7, text, mood_score=6)
+
+        return (
+            await StreakService.get_streak_stats_async(7),
+            await journal_service.get_user_entries_async(7, limit=5),
+            await journal_service.get_entry_count_async(7),
+            await journal_service.get_entry_stats_async(7),
+        )
+
+    stats, entries, count, journal_stats = asyncio.run(scenario())
+    assert stats['total_relapses'] == 1
+    assert stats == StreakService.get_streak_stats(7)
+    assert [entry.entry_text for entry in entries] == ["hari kedua lebih baik", "hari pertama yang berat"]
+    assert count == 2
+    assert journal_stats == journal_service.get_entry_stats(7)
+    assert journal_stats['total_words'] == 8
+
+def test_mood_checkin_async(temp_db):
+    """Quick and detailed async check-ins update the same daily entry"""
+    handlers = MoodCheckInHandlers()
+
+    async def scenario():
+        assert not await UserService.has_checked_in_today_async(5)
+        assert await UserService.record_mood_checkin_async(5, 4)
+        assert await UserService.has_checked_in_today_async(5)
+        assert await handlers._record_detailed_mood_checkin(5, 8, energy_level=7, urge_intensity=2)
+
+    asyncio.run(scenario())
+    assert UserService.get_checked_in_today_ids() == {5}
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
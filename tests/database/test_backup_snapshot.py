@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Backup Snapshot Test - online backup API, konsisten saat ada writes dan tidak memblokir event loop
+"""
+
+import asyncio
+import sqlite3
+import sys
+import os
+import threading
+import zipfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.settings import settings
+from src.services.backup_service import BackupService
+
+def _make_database(path, rows):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, payload BLOB)")
+    connection.execute("CREATE TABLE journal_entries (id INTEGER PRIMARY KEY, entry_text TEXT)")
+    connection.executemany("INSERT INTO users (payload) VALUES (randomblob(1000))", [()] * rows)
+    connection.commit()
+    connection.close()
+
+def test_snapshot_is_consistent_under_writes(tmp_path, monkeypatch):
+    """Commits during the copy neither tear nor restart the snapshot; progress reaches the total"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "BACKUP_PAGES_PER_STEP", 16)
+    monkeypatch.setattr(settings, "BACKUP_STEP_SLEEP", 0.001)
+    db_path = str(tmp_path / "live.db")
+    _make_database(db_path, 2000)
+
+    stop = threading.Event()
+    writes = []
+
+    def writer():
+        connection = sqlite3.connect(db_path, timeout=5)
+        while not stop.is_set():
+            connection.execute("INSERT INTO users (payload) VALUES (randomblob(1000))")
+            connection.commit()
+            writes.append(1)
+        connection.close()
+
+    progress = []
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        report = BackupService(db_path)._snapshot_database(tmp_path / "snapshot.db",
+                                                           lambda copied, total: progress.append((copied, total)))
+    finally:
+        stop.set()
+        thread.join()
+
+    assert writes
+    assert report['steps'] == len(progress) > 1
+    assert progress[-1][0] == progress[-1][1] == report['pages']
+    snapshot = sqlite3.connect(tmp_path / "snapshot.db")
+    assert snapshot.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    assert snapshot.execute("SELECT COUNT(*) FROM users").fetchone()[0] >= 2000
+    snapshot.close()
+
+def test_full_backup_keeps_event_loop_responsive(tmp_path, monkeypatch):
+    """The copy, integrity check, exports and archive run in worker threads"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "BACKUP_PAGES_PER_STEP", 8)
+    monkeypatch.setattr(settings, "BACKUP_STEP_SLEEP", 0.002)
+    db_path = str(tmp_path / "live.db")
+    _make_database(db_path, 1000)
+    service = BackupService(db_path)
+
+    async def run():
+        ticks = 0
+        backup = asyncio.create_task(service.create_full_backup("manual", archive_format="zip"))
+        while not backup.done():
+            ticks += 1
+            await asyncio.sleep(0.001)
+        return ticks, await backup
+
+    ticks, (success, backup_path) = asyncio.run(run())
+    assert success, backup_path
+    assert ticks > 10
+    with zipfile.ZipFile(backup_path) as archive:
+        assert archive.testzip() is None
+        names = archive.namelist()
+    assert names[0] == "backup_metadata.json"
+    assert {"database/pmo_recovery.db", "database/pmo_recovery_export.sql",
+            "database/export/users.ndjson.gz"} <= set(names)
+    # Only the archive is left behind: no staging directory, no snapshot file
+    assert [path.name for path in (tmp_path / "backups" / "manual").iterdir()] == [os.path.basename(backup_path)]
+    assert not list(tmp_path.glob("temp_backup_*"))
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
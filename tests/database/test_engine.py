@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Engine Test - shared engine, SQLite PRAGMA profile dan concurrent writes
+"""
+
+import sys
+import os
+import tempfile
+import threading
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+from src.database import models
+from src.database.database import db
+from src.database.engine import create_db_engine, get_engine
+
+def test_single_shared_engine():
+    """models.py and database.py share one engine and pool"""
+    assert db.engine is get_engine()
+    assert models.engine is get_engine()
+
+def test_sqlite_pragma_profile():
+    """New SQLite connections get WAL, NORMAL sync, busy timeout, cache and mmap"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'pragma.db')}")
+        with engine.connect() as connection:
+            pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("busy_timeout") >= 1000
+            assert pragma("cache_size") < 0
+        engine.dispose()
+
+def test_concurrent_writes_and_reads():
+    """Concurrent writers wait for the lock instead of failing, and readers don't block them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'concurrency.db')}")
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE counters (worker INTEGER, n INTEGER)"))
+
+        errors = []
+
+        def writer(worker):
+            try:
+                for n in range(50):
+                    with engine.begin() as connection:
+                        connection.execute(text("INSERT INTO counters VALUES (:w, :n)"), {"w": worker, "n": n})
+            except Exception as e:
+                errors.append(e)
+
+        # Hold a read transaction open while writers commit
+        reader = engine.connect()
+        read_tx = reader.begin()
+        reader.execute(text("SELECT COUNT(*) FROM counters")).scalar()
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        read_tx.rollback()
+        reader.close()
+
+        assert not errors, errors
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT COUNT(*) FROM counters")).scalar() == 400
+        engine.dispose()
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Fast Restore Test - streaming extraction, verifikasi checksum manifest dan atomic swap
+"""
+
+import asyncio
+import json
+import sqlite3
+import sys
+import os
+import zipfile
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from config.settings import settings
+from src.services.backup_archive import MANIFEST_NAME
+from src.services.backup_service import BackupService
+
+def _names(path):
+    connection = sqlite3.connect(path)
+    try:
+        return [row[0] for row in connection.execute("SELECT first_name FROM users ORDER BY id")]
+    finally:
+        connection.close()
+
+def _rename_user(name):
+    connection = sqlite3.connect("data/pmo_recovery.db")
+    connection.execute("UPDATE users SET first_name = ? WHERE id = 1", (name,))
+    connection.commit()
+    connection.close()
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "BACKUP_STEP_SLEEP", 0)
+    os.makedirs("data")
+    os.makedirs("logs")
+    with open("data/quotes.json", "w") as f:
+        json.dump(["asli"], f)
+    with open("logs/bot.log", "w") as f:
+        f.write("log\n")
+
+    connection = sqlite3.connect("data/pmo_recovery.db")
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, first_name TEXT)")
+    connection.execute("CREATE TABLE journal_entries (id INTEGER PRIMARY KEY, entry_text TEXT)")
+    connection.executemany("INSERT INTO users (first_name) VALUES (?)", [("Andi",), ("Budi",)])
+    connection.commit()
+    connection.close()
+    return BackupService("data/pmo_recovery.db")
+
+@pytest.mark.parametrize("archive_format", ["zip", "tar.zst"])
+def test_restore_swaps_in_verified_files(service, tmp_path, archive_format):
+    """Only restorable members are extracted; replaced files land in a pre-restore snapshot"""
+    if archive_format == "tar.zst":
+        pytest.importorskip("zstandard")
+    success, backup_path = asyncio.run(service.create_full_backup("manual", archive_format=archive_format))
+    assert success, backup_path
+
+    _rename_user("Diubah")
+    with open("data/quotes.json", "w") as f:
+        json.dump(["baru"], f)
+    os.remove("logs/bot.log")
+
+    success, message = asyncio.run(service.restore_from_backup(backup_path, confirm_restore=True))
+    assert success, message
+    assert _names("data/pmo_recovery.db") == ["Andi", "Budi"]
+    with open("data/quotes.json") as f:
+        assert json.load(f) == ["asli"]
+    # Logs, exports and the SQL dump are not extracted
+    assert not os.path.exists("logs/bot.log")
+    assert not list(tmp_path.rglob("*.restore")) and not list(tmp_path.glob("temp_restore_*"))
+
+    snapshot_dir, = (service.backup_dir / "emergency").glob("pre_restore_*")
+    assert _names(snapshot_dir / "database" / "pmo_recovery.db") == ["Diubah", "Budi"]
+    with open(snapshot_dir / "data" / "quotes.json") as f:
+        assert json.load(f) == ["baru"]
+
+def test_open_connections_follow_the_restored_database(service):
+    """A connection opened before the restore reads and writes the restored database, not an orphan"""
+    success, backup_path = asyncio.run(service.create_full_backup("manual", archive_format="zip"))
+    _rename_user("Diubah")
+    live = sqlite3.connect("data/pmo_recovery.db")
+    try:
+        assert live.execute("SELECT first_name FROM users WHERE id = 1").fetchone() == ("Diubah",)
+
+        success, message = asyncio.run(service.restore_from_backup(backup_path, confirm_restore=True))
+        assert success, message
+
+        assert live.execute("SELECT first_name FROM users WHERE id = 1").fetchone() == ("Andi",)
+        live.execute("INSERT INTO users (first_name) VALUES ('Citra')")
+        live.commit()
+    finally:
+        live.close()
+    assert _names("data/pmo_recovery.db") == ["Andi", "Budi", "Citra"]
+    assert sqlite3.connect("data/pmo_recovery.db").execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+def test_checksum_mismatch_leaves_live_files_untouched(service, tmp_path):
+    success, backup_path = asyncio.run(service.create_full_backup("manual", archive_format="zip"))
+    tampered_path = tmp_path / "tampered.zip"
+    with zipfile.ZipFile(backup_path) as source, zipfile.ZipFile(tampered_path, "w") as target:
+        for info in source.infolist():
+            data = source.read(info)
+            if info.filename == "data/quotes.json":
+                data = b'["palsu"]'
+            target.writestr(info.filename, data)
+        assert MANIFEST_NAME in source.namelist()
+
+    _rename_user("Sekarang")
+    success, message = asyncio.run(service.restore_from_backup(str(tampered_path), confirm_restore=True))
+    assert not success and "Checksum mismatch" in message
+    assert _names("data/pmo_recovery.db") == ["Sekarang", "Budi"]
+    with open("data/quotes.json") as f:
+        assert json.load(f) == ["asli"]
+    assert not list(tmp_path.rglob("*.restore"))
+    assert not (service.backup_dir / "emergency").exists() or \
+        not list((service.backup_dir / "emergency").glob("pre_restore_*"))
+
+def test_restore_requires_confirmation(service):
+    success, message = asyncio.run(service.restore_from_backup("missing.zip"))
+    assert not success and "confirm_restore" in message
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Incremental Backup Test - chunk store dedup, restore snapshot dan garbage collection
+"""
+
+import asyncio
+import json
+import sqlite3
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from config.settings import settings
+from src.services.backup_service import BackupService
+from src.services.backup_store import ChunkStore
+
+def _rows(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT id, entry_text FROM journal_entries ORDER BY id").fetchall()
+    finally:
+        connection.close()
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """BackupService on a WAL database with ~4 MB of journal entries, run from tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "BACKUP_CHUNK_SIZE", 64 * 1024)
+    monkeypatch.setattr(settings, "BACKUP_STEP_SLEEP", 0)
+    os.makedirs("data")
+    with open("data/quotes.json", "w") as f:
+        json.dump(["tetap kuat"], f)
+
+    connection = sqlite3.connect("data/pmo_recovery.db")
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY)")
+    connection.execute("CREATE TABLE journal_entries (id INTEGER PRIMARY KEY, entry_text TEXT)")
+    connection.executemany("INSERT INTO journal_entries (entry_text) VALUES (?)",
+                           [(f"catatan {i} " * 40,) for i in range(10000)])
+    connection.commit()
+    connection.close()
+    return BackupService("data/pmo_recovery.db")
+
+def test_second_snapshot_stores_only_churn(service):
+    """An unchanged database adds no chunks; a small update adds a few"""
+    success, first = asyncio.run(service.create_incremental_backup("daily"))
+    assert success
+    store = service.chunk_store
+    first_manifest = store.load_manifest(first)
+    assert set(first_manifest["files"]) == {"database/pmo_recovery.db", "data/quotes.json"}
+    assert first_manifest["new_chunks"] == len({d for e in first_manifest["files"].values() for d in e["chunks"]})
+
+    success, second = asyncio.run(service.create_incremental_backup("daily"))
+    assert store.load_manifest(second)["new_chunks"] <= 1  # page 1 header only
+
+    connection = sqlite3.connect("data/pmo_recovery.db")
+    connection.execute("UPDATE journal_entries SET entry_text = 'diubah' WHERE id = 5000")
+    connection.commit()
+    connection.close()
+    success, third = asyncio.run(service.create_incremental_backup("daily"))
+    third_manifest = store.load_manifest(third)
+    assert 1 <= third_manifest["new_chunks"] <= 4
+    assert len(third_manifest["files"]["database/pmo_recovery.db"]["chunks"]) > 50
+
+    # Restoring the first snapshot brings back the original row
+    assert asyncio.run(service.restore_incremental_backup(first))[0] is False
+    success, message = asyncio.run(service.restore_incremental_backup(first, confirm_restore=True))
+    assert success, message
+    assert _rows("data/pmo_recovery.db")[4999][1].startswith("catatan 4999")
+    assert len(store.list_snapshots()) == 3
+    emergency = list((service.backup_dir / "emergency").glob("pre_restore_*/database/pmo_recovery.db"))
+    assert len(emergency) == 1 and _rows(emergency[0])[4999][1] == "diubah"
+
+def test_snapshots_are_listed_and_restorable(service):
+    """Daily snapshots show up next to archives and restore by id or listing key"""
+    success, snapshot_id = asyncio.run(service.create_incremental_backup("daily"))
+    success, archive_path = asyncio.run(service.create_full_backup("daily"))
+    daily = asyncio.run(service.list_available_backups())["daily"]
+    assert {(backup["filename"], backup["snapshot"]) for backup in daily} == \
+        {(snapshot_id, True), (os.path.basename(archive_path), False)}
+
+    snapshot = next(backup for backup in daily if backup["snapshot"])
+    assert snapshot["path"] is None and snapshot["size_mb"] > 1
+    assert asyncio.run(service.find_backup("daily", snapshot["key"]))["filename"] == snapshot_id
+
+    connection = sqlite3.connect("data/pmo_recovery.db")
+    connection.execute("DELETE FROM journal_entries WHERE id > 10")
+    connection.commit()
+    connection.close()
+    success, message = asyncio.run(service.restore_backup(snapshot_id, confirm_restore=True))
+    assert success and snapshot_id in message
+    assert len(_rows("data/pmo_recovery.db")) == 10000
+
+def test_restore_detects_corrupted_chunk(service, tmp_path):
+    store = service.chunk_store
+    success, snapshot_id = asyncio.run(service.create_incremental_backup("manual"))
+    entry = store.load_manifest(snapshot_id)["files"]["data/quotes.json"]
+    chunk_path = store._chunk_path(entry["chunks"][0])
+    chunk_path.write_bytes(chunk_path.read_bytes()[:-1])
+
+    with pytest.raises(Exception):
+        store.restore_file(entry, tmp_path / "quotes.json")
+    assert not (tmp_path / "quotes.json").exists()
+
+def test_retention_collects_unreferenced_chunks(tmp_path):
+    store = ChunkStore(tmp_path / "store", chunk_size=4)
+    (tmp_path / "a.txt").write_bytes(b"aaaabbbbcccc")
+    (tmp_path / "b.txt").write_bytes(b"aaaadddd")
+    store.create_snapshot("one", {"a.txt": tmp_path / "a.txt"})
+    manifest = store.create_snapshot("two", {"b.txt": tmp_path / "b.txt"})
+    assert manifest["new_chunks"] == 1
+
+    store.delete_snapshot("one")
+    assert store.collect_garbage() == 2
+    store.restore_file(manifest["files"]["b.txt"], tmp_path / "restored.txt")
+    assert (tmp_path / "restored.txt").read_bytes() == b"aaaadddd"
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
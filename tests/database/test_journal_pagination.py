@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Journal Pagination Test - keyset cursors untuk older/newer journal pages
+"""
+
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.bot.keyboards.inline_keyboards import BotKeyboards
+from src.database.database import db
+from src.database.models import JournalEntry
+from src.services.journal_service import JournalService
+
+def _seed(telegram_id, count):
+    """Entries one hour apart; every pair shares a timestamp so the id breaks ties"""
+    base = datetime(2024, 1, 1, 8, 0, 0, 123456)
+    session = db.get_session()
+    try:
+        session.add_all([JournalEntry(user_id=telegram_id, telegram_id=telegram_id, entry_text=f"entry {i}",
+                                      created_at=base + timedelta(hours=i // 2)) for i in range(count)])
+        session.commit()
+    finally:
+        db.close_session(session)
+
+def _texts(page):
+    return [entry.entry_text for entry in page['entries']]
+
+def test_walk_older_and_back_newer(temp_db):
+    """Pages are disjoint, newest first, and the newer button returns to the same page"""
+    _seed(31, 12)
+    _seed(32, 3)
+    journal_service = JournalService()
+
+    pages = [journal_service.get_entries_page(31)]
+    while pages[-1]['older_cursor']:
+        pages.append(journal_service.get_entries_page(31, pages[-1]['older_cursor']))
+
+    assert [_texts(page) for page in pages] == [
+        [f"entry {i}" for i in range(11, 6, -1)],
+        [f"entry {i}" for i in range(6, 1, -1)],
+        ["entry 1", "entry 0"],
+    ]
+    assert pages[0]['newer_cursor'] is None and pages[-1]['older_cursor'] is None
+
+    back = journal_service.get_entries_page(31, pages[2]['newer_cursor'], newer=True)
+    assert _texts(back) == _texts(pages[1])
+    assert back['older_cursor'] == pages[1]['older_cursor']
+
+    first = asyncio.run(journal_service.get_entries_page_async(31, pages[1]['newer_cursor'], newer=True))
+    assert _texts(first) == _texts(pages[0]) and first['newer_cursor'] is None
+
+def test_cursor_fits_callback_data_and_survives_bad_input(temp_db):
+    """Cursors round-trip, fit Telegram's 64-byte callback_data and malformed ones reset to page one"""
+    _seed(33, 7)
+    journal_service = JournalService()
+    page = journal_service.get_entries_page(33, page_size=3)
+    entry = page['entries'][-1]
+    assert journal_service.decode_cursor(page['older_cursor']) == (entry.created_at, entry.id)
+
+    markup = BotKeyboards.journal_history_pagination(page['older_cursor'], page['older_cursor'])
+    for button in markup.inline_keyboard[0]:
+        assert len(button.callback_data.encode()) <= 64
+
+    assert journal_service.decode_cursor("not-a-cursor") is None
+    assert _texts(journal_service.get_entries_page(33, "zz.zz", page_size=3)) == _texts(page)
+    # A cursor older than every entry falls back to the latest page
+    assert _texts(journal_service.get_entries_page(33, "1.1", page_size=3)) == _texts(page)
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Journal Search Test - FTS5 index, triggers, bm25 ranking dan pagination
+"""
+
+import asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import event
+from src.database.database import db
+from src.database.migrations import run_migrations
+from src.database.models import JournalEntry
+from src.services.journal_service import JournalService
+from src.utils.constants import HIGHLIGHT_END, HIGHLIGHT_START
+from src.utils.helpers import format_journal_search_results
+
+def _add_entries(telegram_id, texts):
+    session = db.get_session()
+    try:
+        session.add_all([JournalEntry(user_id=telegram_id, telegram_id=telegram_id, entry_text=t) for t in texts])
+        session.commit()
+    finally:
+        db.close_session(session)
+
+def test_search_ranks_and_highlights(temp_db):
+    """Entries are matched by word or explicit prefix, ranked by bm25 and restricted to the user"""
+    _add_entries(21, ["olahraga pagi membuat fokus", "urge malam kuat, urge datang lagi setelah scroll",
+                      "urge kecil siang hari"])
+    run_migrations(temp_db)  # backfills the index for rows written before it existed
+    _add_entries(22, ["urge punya user lain"])
+
+    journal_service = JournalService()
+    assert journal_service.search_entries(21, "urg")['results'] == []
+    search = journal_service.search_entries(21, "urg*")
+    assert [r['snippet'].count(HIGHLIGHT_START) for r in search['results']] == [2, 1]
+    assert "olahraga" not in str(search['results'])
+    assert search['has_more'] is False
+
+    async_search = asyncio.run(journal_service.search_entries_async(21, "urge malam"))
+    assert len(async_search['results']) == 1
+
+    message = format_journal_search_results("urge_*", search)
+    assert "urge\\_\\*" in message
+    assert "*urge*" in message and HIGHLIGHT_END not in message
+
+    assert journal_service.search_entries(21, "   !!! ")['results'] == []
+
+def test_index_follows_updates_and_pagination(temp_db):
+    """Triggers keep the index in sync; pages are disjoint"""
+    run_migrations(temp_db)
+    _add_entries(23, [f"catatan syukur nomor {i}" for i in range(12)])
+
+    journal_service = JournalService()
+    pages = [journal_service.search_entries(23, "syukur", page=page) for page in range(3)]
+    ids = [r['id'] for page in pages for r in page['results']]
+    assert len(ids) == len(set(ids)) == 12
+    assert [page['has_more'] for page in pages] == [True, True, False]
+
+    session = db.get_session()
+    try:
+        entry = session.query(JournalEntry).filter(JournalEntry.telegram_id == 23).first()
+        entry.entry_text = "catatan baru tentang meditasi"
+        session.delete(session.query(JournalEntry).filter(JournalEntry.telegram_id == 23).all()[-1])
+        session.commit()
+    finally:
+        db.close_session(session)
+
+    assert len(journal_service.search_entries(23, "meditasi")['results']) == 1
+    total = sum(len(journal_service.search_entries(23, "syukur", page=p)['results']) for p in range(3))
+    assert total == 10
+
+def test_page_turns_reuse_the_ranking(temp_db):
+    """Later pages only load their own snippets; a new entry drops the cached ranking"""
+    run_migrations(temp_db)
+    _add_entries(24, [f"hari ke-{i} tetap kuat" for i in range(8)])
+    journal_service = JournalService()
+    first = journal_service.search_entries(24, "kuat")
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(temp_db, "before_cursor_execute", listener)
+    try:
+        second = journal_service.search_entries(24, "kuat", page=1)
+    finally:
+        event.remove(temp_db, "before_cursor_execute", listener)
+    assert len(statements) == 1 and "snippet(" in statements[0]
+    assert len(first['results']) == 5 and len(second['results']) == 3
+    assert not {r['id'] for r in first['results']} & {r['id'] for r in second['results']}
+
+    assert journal_service.create_journal_entry(24, "paling kuat hari ini, kuat sekali")
+    assert "paling" in journal_service.search_entries(24, "kuat")['results'][0]['snippet']
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Mood Check-in Upsert Test - satu row per (user_id, checkin_day) lewat INSERT ... ON CONFLICT
+"""
+
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import event
+from src.bot.handlers.mood_checkin_handlers import MoodCheckInHandlers
+from src.database.database import db
+from src.database.migrations import MOOD_DUPLICATES_TABLE, _add_mood_checkin_day
+from src.database.models import MoodEntry, User
+from src.services.aggregate_service import AggregateService
+from src.services.user_service import UserService
+
+def _entries(telegram_id):
+    session = db.get_session()
+    try:
+        return session.query(MoodEntry).filter(MoodEntry.user_id == telegram_id).order_by(MoodEntry.id).all()
+    finally:
+        db.close_session(session)
+
+def test_checkin_day_uses_user_timezone():
+    """23:30 UTC is already the next day in Jakarta"""
+    now = datetime(2024, 5, 1, 23, 30)
+    assert UserService.checkin_day("UTC", now).day == 1
+    assert UserService.checkin_day("Asia/Jakarta", now).day == 2
+    assert UserService.checkin_day("Not/AZone", now) == UserService.checkin_day(None, now)
+
+def test_quick_and_detailed_checkins_share_one_row(temp_db):
+    """Repeated check-ins on one day overwrite a single row with the upsert as their only write"""
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(temp_db, "before_cursor_execute", listener)
+    try:
+        assert UserService.record_mood_checkin(51, 5, notes="pagi")
+    finally:
+        event.remove(temp_db, "before_cursor_execute", listener)
+    writes = [s for s in statements if not s.lstrip().startswith("SELECT")]
+    assert len(writes) == 1 and "ON CONFLICT" in writes[0]
+    assert (AggregateService.get_aggregates(51).mood_entries, AggregateService.get_aggregates(51).mood_sum) == (1, 5)
+
+    handlers = MoodCheckInHandlers()
+    assert asyncio.run(handlers._record_detailed_mood_checkin(51, 8, energy_level=7, urge_intensity=2, notes="sore"))
+
+    async def double_taps():
+        return await asyncio.gather(*[UserService.record_mood_checkin_async(51, 6) for _ in range(5)])
+    assert asyncio.run(double_taps()) == [True] * 5
+
+    entries = _entries(51)
+    assert len(entries) == 1
+    assert (entries[0].mood_score, entries[0].energy_level, entries[0].urge_intensity) == (6, 7, 2)
+    assert entries[0].notes is None
+
+    aggregate = AggregateService.get_aggregates(51)
+    assert (aggregate.mood_entries, aggregate.mood_sum) == (1, 6)
+
+def test_migration_backfills_and_removes_duplicate_days(temp_db):
+    """Legacy rows get a local checkin_day; duplicate days keep the latest row, the rest are moved aside"""
+    at = datetime(2024, 5, 1, 20, 0)  # 03:00 on May 2nd in Jakarta
+    session = db.get_session()
+    try:
+        session.add(User(telegram_id=52, timezone="Asia/Jakarta"))
+        session.add_all([
+            MoodEntry(user_id=52, mood_score=3, notes="catatan pertama", created_at=at),
+            MoodEntry(user_id=52, mood_score=7, created_at=at + timedelta(hours=1)),
+            MoodEntry(user_id=52, mood_score=5, created_at=at - timedelta(hours=10)),
+        ])
+        session.commit()
+    finally:
+        db.close_session(session)
+
+    with temp_db.begin() as connection:
+        _add_mood_checkin_day(connection)
+
+    entries = _entries(52)
+    assert sorted((e.checkin_day.isoformat(), e.mood_score) for e in entries) == [("2024-05-01", 5), ("2024-05-02", 7)]
+    assert AggregateService.get_aggregates(52).mood_sum == 12
+    with temp_db.connect() as connection:
+        moved = connection.exec_driver_sql(f"SELECT mood_score, notes FROM {MOOD_DUPLICATES_TABLE}").all()
+    assert moved == [(3, "catatan pertama")]
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
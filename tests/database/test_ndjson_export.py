@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+NDJSON Export Test - satu file per tabel, kompresi opsional dan memori konstan
+"""
+
+import gzip
+import json
+import sqlite3
+import sys
+import os
+import tracemalloc
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from config.settings import settings
+from src.services.backup_service import BackupService
+
+def _make_database(path, journal_rows):
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, first_name TEXT)")
+    connection.execute("CREATE TABLE journal_entries (id INTEGER PRIMARY KEY, entry_text TEXT)")
+    connection.execute("CREATE TABLE mood_entries (id INTEGER PRIMARY KEY, mood_score INTEGER)")
+    connection.execute("CREATE TABLE check_ins (id INTEGER PRIMARY KEY, status TEXT)")
+    connection.execute("CREATE TABLE relapse_records (id INTEGER PRIMARY KEY, triggers TEXT)")
+    connection.execute("INSERT INTO users (first_name) VALUES ('Budi ✨')")
+    connection.executemany("INSERT INTO journal_entries (entry_text) VALUES (?)",
+                           [(f"hari ke-{i} " * 50,) for i in range(journal_rows)])
+    connection.executemany("INSERT INTO mood_entries (mood_score) VALUES (?)", [(i % 10,) for i in range(7)])
+    connection.execute("INSERT INTO relapse_records (triggers) VALUES ('[\"stres\"]')")
+    connection.commit()
+    connection.close()
+
+@pytest.mark.parametrize("compression", ["gzip", "none"])
+def test_one_file_per_table(tmp_path, monkeypatch, compression):
+    """Every exported table, including mood/check-in/relapse data, round-trips line by line"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "BACKUP_EXPORT_COMPRESSION", compression)
+    _make_database("live.db", 25)
+
+    service = BackupService("live.db")
+    tables = service._export_tables("live.db")
+    assert tables == ["users", "journal_entries", "mood_entries", "check_ins", "relapse_records"]
+
+    counts = {}
+    for table in tables:
+        with open(tmp_path / table, "wb") as f:
+            counts[table] = service._write_table_ndjson(f, "live.db", table)
+    assert counts == {"users": 1, "journal_entries": 25, "mood_entries": 7, "check_ins": 0, "relapse_records": 1}
+
+    opener = gzip.open if compression == "gzip" else open
+    with opener(tmp_path / "mood_entries", "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["mood_score"] for line in f] == [0, 1, 2, 3, 4, 5, 6]
+    with opener(tmp_path / "users", "rt", encoding="utf-8") as f:
+        assert json.loads(f.readline()) == {"id": 1, "first_name": "Budi ✨"}
+
+def test_peak_memory_independent_of_row_count(tmp_path, monkeypatch):
+    """Python allocations stay bounded by the batch size, not by the table"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "BACKUP_EXPORT_BATCH_SIZE", 200)
+    _make_database("live.db", 20000)  # ~12 MB of journal text
+    service = BackupService("live.db")
+
+    tracemalloc.start()
+    try:
+        with open(tmp_path / "journal_entries.ndjson.gz", "wb") as f:
+            count = service._write_table_ndjson(f, "live.db", "journal_entries")
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert count == 20000
+    assert peak < 2 * 1024 * 1024
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
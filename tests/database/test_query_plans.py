@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Query Plan Test - EXPLAIN hot queries dan pastikan tidak ada full table scan
+"""
+
+import sys
+import os
+import re
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine, event, inspect, text
+from src.database.database import db
+from src.database.models import Base, User, MoodEntry, JournalEntry
+from src.database.migrations import SCHEMA_VERSION, get_schema_version, run_migrations
+from src.services.user_service import UserService
+from src.services.journal_service import JournalService
+
+TABLES = set(Base.metadata.tables)
+
+def _capture_statements(engine, action):
+    """Run action and return the (statement, parameters) pairs it executed"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+def _full_scans(engine, statement, parameters):
+    """Return plan lines that scan a model table without any index"""
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    scans = []
+    for row in plan:
+        detail = row[-1]
+        match = re.match(r"SCAN (?:TABLE )?(\w+)", detail)
+        if match and match.group(1) in TABLES and "INDEX" not in detail:
+            scans.append(detail)
+    return scans
+
+def _seed():
+    session = db.get_session()
+    session.add_all([User(telegram_id=i, daily_reminders=bool(i % 2)) for i in range(1, 21)])
+    session.add_all([MoodEntry(user_id=i, mood_score=5) for i in range(1, 21)])
+    session.add_all([JournalEntry(user_id=i, telegram_id=i, entry_text="hari ini baik") for i in range(1, 21)])
+    session.commit()
+    session.close()
+
+def test_hot_queries_use_indexes(temp_db):
+    """Hot service queries must not regress to full table scans"""
+    _seed()
+    journal_service = JournalService()
+    hot_paths = {
+        'reminder audience': lambda: list(UserService.iter_users_with_reminders(include_checkin_status=True)),
+        'reminder slots': UserService.get_reminder_slots,
+        'slot audience': lambda: list(UserService.iter_users_with_reminders(slots=[("Asia/Jakarta", "08:00")])),
+        'checked in today': UserService.get_checked_in_today_ids,
+        'has checked in': lambda: UserService.has_checked_in_today(3),
+        'user lookup': lambda: UserService.get_user(3),
+        'journal entries': lambda: journal_service.get_user_entries(3, limit=5),
+        'journal count': lambda: journal_service.get_entry_count(3),
+        'journal older page': lambda: journal_service.get_entries_page(3, "5f5e100.7"),
+        'journal newer page': lambda: journal_service.get_entries_page(3, "5f5e100.7", newer=True),
+    }
+
+    for name, action in hot_paths.items():
+        UserService.profile_cache.clear()
+        statements = _capture_statements(temp_db, action)
+        assert statements, f"{name}: no SELECT captured"
+        for statement, parameters in statements:
+            scans = _full_scans(temp_db, statement, parameters)
+            assert not scans, f"{name} does a full table scan: {scans}\n{statement}"
+
+def test_migrations_add_indexes_to_existing_database(temp_db):
+    """Databases created before the index set pick it up once at startup"""
+    with temp_db.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        connection.execute(text("DROP TABLE schema_migrations"))
+
+    assert get_schema_version(temp_db) == 0
+    assert run_migrations(temp_db) == SCHEMA_VERSION
+    assert get_schema_version(temp_db) == SCHEMA_VERSION
+    assert run_migrations(temp_db) == 0
+
+    index_names = {index['name'] for index in inspect(temp_db).get_indexes('mood_entries')}
+    assert 'ix_mood_entries_user_id_created_at' in index_names
+
+def test_migrations_upgrade_baseline_schema(tmp_path):
+    """A database from before any migration (no checkin_day, no indexes) upgrades in one go"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    baseline_tables = ['users', 'journal_entries', 'relapse_records', 'check_ins', 'mood_entries']
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in baseline_tables])
+    with engine.begin() as connection:
+        for name in baseline_tables:
+            for index in Base.metadata.tables[name].indexes:
+                connection.execute(text(f"DROP INDEX {index.name}"))
+        connection.execute(text("ALTER TABLE mood_entries DROP COLUMN checkin_day"))
+        connection.execute(text("INSERT INTO users (telegram_id, first_name, timezone) VALUES (1, 'Budi', 'UTC')"))
+        connection.execute(text(
+            "INSERT INTO mood_entries (user_id, mood_score, created_at) VALUES "
+            "(1, 4, '2024-05-01 08:00:00'), (1, 7, '2024-05-01 20:00:00'), (1, 6, '2024-05-02 08:00:00')"
+        ))
+
+    try:
+        assert run_migrations(engine) == SCHEMA_VERSION
+        with engine.connect() as connection:
+            rows = connection.execute(text("SELECT mood_score, checkin_day FROM mood_entries ORDER BY id")).all()
+        assert [tuple(row) for row in rows] == [(7, '2024-05-01'), (6, '2024-05-02')]
+        index_names = {index['name'] for index in inspect(engine).get_indexes('mood_entries')}
+        assert {'ix_mood_entries_user_id_created_at', 'ux_mood_entries_user_id_checkin_day'} <= index_names
+        journal_indexes = {index['name'] for index in inspect(engine).get_indexes('journal_entries')}
+        assert journal_indexes == {'ix_journal_entries_telegram_id_created_at_id'}
+
+        with engine.begin() as connection:
+            connection.execute(text("UPDATE mood_entries SET mood_score = 9 WHERE checkin_day = '2024-05-02'"))
+            connection.execute(text("INSERT INTO mood_entries (user_id, mood_score, checkin_day, created_at) "
+                                    "VALUES (1, 5, '2024-05-03', '2024-05-03 08:00:00')"))
+            aggregate = connection.execute(text(
+                "SELECT mood_entries, mood_sum, mood_last_at FROM user_aggregates WHERE telegram_id = 1"
+            )).one()
+        assert tuple(aggregate) == (3, 7 + 9 + 5, '2024-05-03 08:00:00')
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
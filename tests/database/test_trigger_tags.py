@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Trigger Tags Test - parsing legacy triggers, incremental stats, lift dan backfill
+"""
+
+import asyncio
+import sys
+import os
+import pytest
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import select
+from src.bot.handlers.callback_handlers import CallbackHandlers
+from src.bot.templates import message_templates, validate_markdown
+from src.database.database import db
+from src.database.models import JournalEntry, MoodEntry, RelapseRecord, TriggerLink, TriggerStat, TriggerTotal
+from src.services.journal_service import JournalService
+from src.services.streak_service import StreakService
+from src.services.trigger_service import GLOBAL_SCOPE, TriggerService
+from src.services.user_service import UserService
+
+def _snapshot(engine):
+    """All trigger rows, for comparing incremental writes with a rebuild"""
+    with engine.connect() as connection:
+        return {model.__tablename__: sorted(tuple(row) for row in connection.execute(select(model.__table__)))
+                for model in (TriggerLink, TriggerStat, TriggerTotal)}
+
+def test_parse_legacy_formats():
+    """JSON, str(list), comma-separated text and hashtags all normalize to the same tags"""
+    assert TriggerService.parse_triggers('["Stres", "bosan "]') == ["stres", "bosan"]
+    assert TriggerService.parse_triggers("['Stres', 'bosan', 'stres']") == ["stres", "bosan"]
+    assert TriggerService.parse_triggers("stres,  Bosan") == ["stres", "bosan"]
+    assert TriggerService.parse_triggers("['sendiri', malam") == ["sendiri", "malam"]
+    assert TriggerService.parse_triggers("") == [] and TriggerService.parse_triggers(None) == []
+    assert TriggerService.extract_hashtags("urge kuat #Bosan #sosial-media, jam #22") == ["bosan", "sosial-media"]
+
+def test_incremental_stats_and_lift(temp_db):
+    """Journal and relapse writes update user and global counts; lift compares with the relapse base rate"""
+    journal_service = JournalService()
+    assert journal_service.create_journal_entry(41, "hari berat #stres #sendiri")
+    assert journal_service.create_journal_entry(41, "capek #stres")
+    assert asyncio.run(journal_service.create_journal_entry_async(41, "tanpa trigger", triggers=["Bosan"]))
+    assert journal_service.create_journal_entry(42, "#stres juga")
+
+    UserService.get_or_create_user(telegram_id=41, first_name="Trigger")
+    assert StreakService.record_relapse(41, triggers=["stres", "Sendiri"])
+
+    report = TriggerService.get_trigger_report(41, "UTC")
+    assert report['records'] == 4 and report['relapse_records'] == 1
+    top = {trigger['tag']: trigger for trigger in report['triggers']}
+    assert top['stres']['count'] == 3 and top['stres']['relapses'] == 1
+    # P(relapse | sendiri) = 1/2, base rate = 1/4
+    assert top['sendiri']['lift'] == 2.0
+    assert top['bosan']['lift'] == 0.0
+    assert sum(report['hours']) == 6
+
+    global_report = TriggerService.get_trigger_report(GLOBAL_SCOPE, "UTC")
+    assert global_report['records'] == 5
+    assert global_report['triggers'][0] == {'tag': 'stres', 'count': 4, 'relapses': 1, 'lift': pytest.approx(1.25)}
+
+    incremental = _snapshot(temp_db)
+    with temp_db.begin() as connection:
+        assert TriggerService.rebuild(connection) == 5
+    assert _snapshot(temp_db) == incremental
+
+    fields = CallbackHandlers._trigger_analysis_fields(report, global_report)
+    message = message_templates.render('trigger_analysis', **fields)
+    assert "stres: 3x" in message and "(lift 2.0)" in message
+    assert validate_markdown(message) is None
+
+def test_backfill_legacy_rows(temp_db):
+    """Rows written before the tag tables existed are parsed by the rebuild"""
+    at = datetime(2024, 3, 1, 22, 30)
+    session = db.get_session()
+    try:
+        session.add_all([
+            RelapseRecord(user_id=1, telegram_id=43, relapse_date=at, streak_broken=3, triggers="['bosan', 'malam']"),
+            JournalEntry(user_id=43, telegram_id=43, entry_text="x", triggers='["bosan"]', created_at=at),
+            MoodEntry(user_id=43, mood_score=4, triggers_today="malam, sendiri", created_at=at),
+            MoodEntry(user_id=43, mood_score=6, triggers_today="[]", created_at=at),
+        ])
+        session.commit()
+    finally:
+        db.close_session(session)
+
+    with temp_db.begin() as connection:
+        assert TriggerService.rebuild(connection) == 3
+
+    report = TriggerService.get_trigger_report(43, "UTC")
+    assert [(t['tag'], t['count'], t['relapses']) for t in report['triggers']] == [
+        ('bosan', 2, 1), ('malam', 2, 1), ('sendiri', 1, 0)
+    ]
+    assert report['hours'][22] == 5
+    assert TriggerService.get_trigger_report(43, "Asia/Jakarta")['hours'][5] == 5
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+User Aggregates Test - incremental journal/mood statistics dan backfill
+"""
+
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import event
+from src.database.database import db
+from src.database.models import JournalEntry, MoodEntry, UserAggregate
+from src.services.aggregate_service import AggregateService
+from src.services.journal_service import JournalService
+from src.services.user_service import UserService
+
+def _aggregate_columns(telegram_id):
+    aggregate = AggregateService.get_aggregates(telegram_id)
+    return {column.name: getattr(aggregate, column.name)
+            for column in UserAggregate.__table__.columns if column.name != 'updated_at'}
+
+def test_aggregates_follow_writes(temp_db):
+    """Journal and mood writes keep the aggregate row equal to a full rebuild"""
+    journal_service = JournalService()
+    assert journal_service.create_journal_entry(11, "hari ini cukup baik", mood_score=6)
+    assert asyncio.run(journal_service.create_journal_entry_async(11, "urge kuat tapi bertahan", mood_score=4))
+    assert journal_service.create_journal_entry(11, "tanpa mood")
+
+    assert UserService.record_mood_checkin(11, 7)
+    assert UserService.record_mood_checkin(11, 9)  # same day: overwrites, sum follows
+    assert asyncio.run(UserService.record_mood_checkin_async(11, 8))
+
+    stats = journal_service.get_entry_stats(11)
+    assert stats['total_entries'] == 3
+    assert stats['total_words'] == 10
+    assert stats['average_words'] == 3
+    assert stats['average_mood'] == 5.0
+    assert stats['first_entry'] <= stats['last_entry']
+    assert journal_service.get_entry_count(11) == 3
+
+    incremental = _aggregate_columns(11)
+    assert incremental['mood_entries'] == 1
+    assert incremental['mood_sum'] == 8
+
+    with temp_db.begin() as connection:
+        assert AggregateService.rebuild(connection) == 1
+    assert _aggregate_columns(11) == incremental
+
+def test_entry_stats_is_one_primary_key_lookup(temp_db):
+    """Stats reads touch only user_aggregates, by primary key"""
+    JournalService().create_journal_entry(12, "satu dua tiga")
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(temp_db, "before_cursor_execute", listener)
+    try:
+        stats = JournalService().get_entry_stats(12)
+    finally:
+        event.remove(temp_db, "before_cursor_execute", listener)
+
+    assert stats['total_words'] == 3
+    assert len(statements) == 1
+    assert "FROM user_aggregates" in statements[0]
+    assert "journal_entries." not in statements[0]
+
+def test_backfill_existing_rows(temp_db):
+    """Rows written before aggregates existed are picked up by the backfill"""
+    session = db.get_session()
+    try:
+        base = datetime(2024, 1, 1)
+        session.add_all([
+            JournalEntry(user_id=13, telegram_id=13, entry_text="a b", mood_score=3, created_at=base),
+            JournalEntry(user_id=13, telegram_id=13, entry_text="c d e", created_at=base + timedelta(days=2)),
+            MoodEntry(user_id=13, mood_score=4, created_at=base),
+            MoodEntry(user_id=14, mood_score=6, created_at=base),
+        ])
+        session.commit()
+    finally:
+        db.close_session(session)
+
+    assert JournalService().get_entry_stats(13)['total_entries'] == 0
+
+    with temp_db.begin() as connection:
+        assert AggregateService.rebuild(connection) == 2
+
+    stats = JournalService().get_entry_stats(13)
+    assert stats['total_entries'] == 2
+    assert stats['total_words'] == 5
+    assert stats['average_mood'] == 3.0
+    assert stats['first_entry'] == base
+    assert stats['last_entry'] == base + timedelta(days=2)
+    assert AggregateService.get_aggregates(14).mood_sum == 6
+    assert AggregateService.get_aggregates(14).journal_entries == 0
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
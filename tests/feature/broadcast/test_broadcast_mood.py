@@ -65,15 +65,21 @@ async def test_broadcast_system():
         # Simulate sending to user who needs mood check-in
         test_user_id = 12345
         
+        engine = broadcast_service._get_delivery_engine()
+        
         print(f"\n📢 SIMULATED BROADCAST TO USER {test_user_id} (NEEDS MOOD CHECK-IN):")
-        await broadcast_service._send_personalized_broadcast(
-            test_user_id, content, needs_mood_checkin=True
+        report = await engine.broadcast(
+            [test_user_id],
+            lambda chat_id: broadcast_service._build_personalized_broadcast(chat_id, content, needs_mood_checkin=True)
         )
+        assert report['sent'] == 1, report
         
         print(f"\n📢 SIMULATED BROADCAST TO USER {test_user_id} (ALREADY CHECKED IN):")
-        await broadcast_service._send_personalized_broadcast(
-            test_user_id, content, needs_mood_checkin=False
+        report = await engine.broadcast(
+            [test_user_id],
+            lambda chat_id: broadcast_service._build_personalized_broadcast(chat_id, content, needs_mood_checkin=False)
         )
+        assert report['sent'] == 1, report
         
         # Test user service mood methods
         print("\n3. Testing user service mood methods...")
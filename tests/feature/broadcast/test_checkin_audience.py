@@ -0,0 +1,109 @@
+"""
+Test script untuk set-based "checked in today" audience split
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from sqlalchemy import event
+from src.database.database import db
+from src.database.models import User, MoodEntry
+from src.services.user_service import UserService
+
+def _seed():
+    session = db.get_session()
+    now = datetime.utcnow()
+    today = UserService.checkin_day("Asia/Jakarta", now)
+    session.add_all([
+        User(telegram_id=1, daily_reminders=True),
+        User(telegram_id=2, daily_reminders=True),
+        User(telegram_id=3, daily_reminders=True),
+        User(telegram_id=4, daily_reminders=False),
+        # User 1 checked in today, user 2 only yesterday, user 4 today but no reminders
+        MoodEntry(user_id=1, mood_score=7, checkin_day=today, created_at=now),
+        MoodEntry(user_id=2, mood_score=5, checkin_day=today - timedelta(days=1), created_at=now - timedelta(days=1)),
+        MoodEntry(user_id=4, mood_score=6, checkin_day=today, created_at=now),
+    ])
+    session.commit()
+    session.close()
+
+def test_audience_split(temp_db):
+    """Reminder audience is flagged by today's check-in status"""
+    _seed()
+
+    rows = list(UserService.iter_users_with_reminders(include_checkin_status=True))
+
+    assert sorted(row.telegram_id for row in rows if not row.checked_in_today) == [2, 3]
+    assert [row.telegram_id for row in rows if row.checked_in_today] == [1]
+    assert sorted(u.telegram_id for u in UserService.get_users_without_checkin_today()) == [2, 3]
+    assert UserService.get_checked_in_today_ids() == {1, 4}
+
+def test_today_is_each_users_local_day(temp_db):
+    """UTC+14 and UTC-11 are always on different dates; only a check-in on the user's own today counts"""
+    now = datetime.utcnow()
+    kiritimati_today = UserService.checkin_day("Pacific/Kiritimati", now)
+    session = db.get_session()
+    session.add_all([
+        User(telegram_id=21, daily_reminders=True, timezone="Pacific/Kiritimati"),
+        User(telegram_id=22, daily_reminders=True, timezone="Pacific/Pago_Pago"),
+        MoodEntry(user_id=21, mood_score=6, checkin_day=kiritimati_today, created_at=now),
+        MoodEntry(user_id=22, mood_score=6, checkin_day=kiritimati_today, created_at=now),
+    ])
+    session.commit()
+    session.close()
+
+    assert [u.telegram_id for u in UserService.get_users_without_checkin_today()] == [22]
+    assert UserService.get_checked_in_today_ids() == {21}
+    assert UserService.has_checked_in_today(21) and not UserService.has_checked_in_today(22)
+    rows = list(UserService.iter_users_with_reminders(include_checkin_status=True))
+    assert [row.telegram_id for row in rows if row.checked_in_today] == [21]
+
+def test_streamed_audience_is_keyset_paginated(temp_db):
+    """Streaming yields lightweight rows in id order, one bounded query per chunk"""
+    _seed()
+    session = db.get_session()
+    session.add_all([User(telegram_id=100 + i, daily_reminders=True) for i in range(7)])
+    session.commit()
+    session.close()
+    statements = []
+    event.listen(temp_db, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    rows = list(UserService.iter_users_with_reminders(chunk_size=3, include_checkin_status=True))
+
+    assert [row.telegram_id for row in rows] == [1, 2, 3] + [100 + i for i in range(7)]
+    assert [row.telegram_id for row in rows if row.checked_in_today] == [1]
+    assert rows[0].timezone == "Asia/Jakarta" and rows[0].reminder_time == "08:00"
+    # Today's day per reminder timezone, then 10 rows in chunks of 3 -> 4 queries bounded by LIMIT and keyed on id
+    timezone_lookup, *chunks = statements
+    assert "DISTINCT users.timezone" in timezone_lookup
+    assert len(chunks) == 4
+    assert all("LIMIT" in statement and "users.id >" in statement for statement in chunks)
+    assert UserService.count_users_with_reminders() == 10
+
+def test_daily_broadcast_consumes_stream(temp_db):
+    """Daily broadcast prompts mood check-in only for users who haven't checked in"""
+    import asyncio
+    from src.services.broadcast_service import BroadcastService
+
+    class RecordingBot:
+        def __init__(self):
+            self.sent = {}
+
+        async def send_message(self, chat_id, text, **kwargs):
+            self.sent[chat_id] = text
+
+    _seed()
+    bot = RecordingBot()
+    report = asyncio.run(BroadcastService().send_daily_broadcast(bot=bot))
+
+    assert report['sent'] == 3
+    assert sorted(bot.sent) == [1, 2, 3]
+    assert "Daily Mood Check-in" not in bot.sent[1]
+    assert "Daily Mood Check-in" in bot.sent[2]
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,99 @@
+"""
+Test script untuk DeliveryEngine (concurrent, rate-limited broadcast delivery)
+"""
+import asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from telegram.error import BadRequest, Forbidden, RetryAfter
+from src.services.delivery_service import DeliveryEngine, TokenBucket
+
+class FakeBot:
+    """Bot palsu yang mencatat pesan dan bisa mensimulasikan error Telegram"""
+
+    def __init__(self, errors=None, delay=0.01):
+        self.errors = errors or {}
+        self.delay = delay
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            pending = self.errors.get(chat_id)
+            if pending:
+                raise pending.pop(0)
+            self.sent.append((chat_id, text))
+        finally:
+            self.in_flight -= 1
+
+def _payload(chat_id):
+    return {'chat_id': chat_id, 'text': f"hello {chat_id}", 'parse_mode': 'Markdown'}
+
+def test_delivers_all_with_bounded_concurrency():
+    """Every recipient gets one message and the worker pool stays bounded"""
+    bot = FakeBot()
+    engine = DeliveryEngine(bot, concurrency=5, global_rate=1000, max_retries=1)
+
+    report = asyncio.run(engine.broadcast(range(50), _payload, job_name="test"))
+
+    assert report['total'] == 50
+    assert report['sent'] == 50
+    assert report['failed'] == 0
+    assert sorted(chat_id for chat_id, _ in bot.sent) == list(range(50))
+    assert bot.max_in_flight <= 5
+
+def test_retry_after_and_fallback():
+    """RetryAfter is retried, BadRequest falls back to plain text, Forbidden fails"""
+    bot = FakeBot(errors={
+        1: [RetryAfter(0.05)],
+        2: [BadRequest("Can't parse entities")],
+        3: [Forbidden("bot was blocked by the user")],
+    })
+    engine = DeliveryEngine(bot, concurrency=3, global_rate=1000, max_retries=2)
+    progress = []
+
+    report = asyncio.run(engine.broadcast(
+        [1, 2, 3, 4], _payload, fallback_text="plain", on_progress=progress.append
+    ))
+
+    assert report['sent'] == 3
+    assert report['failed'] == 1
+    assert report['retried'] == 1
+    assert (2, "plain") in bot.sent
+    assert progress and progress[-1]['sent'] == 3
+
+def test_skipped_recipients():
+    """Recipients whose payload builder returns None are skipped"""
+    bot = FakeBot()
+    engine = DeliveryEngine(bot, concurrency=2, global_rate=1000)
+
+    report = asyncio.run(engine.broadcast(range(10), lambda i: _payload(i) if i % 2 else None))
+
+    assert report['sent'] == 5
+    assert report['skipped'] == 5
+
+def test_token_bucket_limits_rate():
+    """Token bucket enforces the configured rate after the initial burst"""
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for _ in range(11):
+            await bucket.acquire()
+        return loop.time() - started
+
+    assert asyncio.run(run()) >= 0.18
+
+if __name__ == "__main__":
+    test_delivers_all_with_bounded_concurrency()
+    test_retry_after_and_fallback()
+    test_skipped_recipients()
+    test_token_bucket_limits_rate()
+    print("✅ Delivery engine tests passed")
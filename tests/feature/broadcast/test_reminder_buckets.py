@@ -0,0 +1,65 @@
+"""
+Test script untuk per-user timezone-aware reminder buckets
+"""
+import asyncio
+import sys
+import os
+from datetime import datetime, timezone
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from src.database.database import db
+from src.database.models import User
+from src.services.scheduler_service import SchedulerService
+from src.services.user_service import UserService
+
+SUMMER_NOON_UTC = datetime(2024, 7, 1, 12, 0, tzinfo=timezone.utc)
+
+def test_buckets_convert_local_minute_to_utc():
+    """Slots are grouped by the UTC minute of their local reminder time"""
+    buckets = SchedulerService.build_reminder_buckets([
+        ("Asia/Jakarta", "08:00"),
+        ("Asia/Makassar", "09:00"),
+        ("Europe/London", "08:00"),
+        ("Invalid/Zone", "08:00"),
+    ], SUMMER_NOON_UTC)
+
+    # Jakarta (UTC+7) 08:00 and Makassar (UTC+8) 09:00 share the 01:00 UTC bucket;
+    # unknown timezones fall back to the default (Asia/Jakarta)
+    assert sorted(buckets["01:00"]) == [("Asia/Jakarta", "08:00"), ("Asia/Makassar", "09:00"), ("Invalid/Zone", "08:00")]
+    # London is on BST (UTC+1) in July
+    assert buckets["07:00"] == [("Europe/London", "08:00")]
+
+def test_dispatch_sends_only_due_slots(temp_db):
+    """Dispatcher sends each bucket once, catching up on skipped minutes"""
+    session = db.get_session()
+    session.add_all([
+        User(telegram_id=1, timezone="Asia/Jakarta", reminder_time="08:00"),
+        User(telegram_id=2, timezone="Asia/Jakarta", reminder_time="08:01"),
+        User(telegram_id=3, timezone="Europe/London", reminder_time="08:00"),
+        User(telegram_id=4, timezone="Asia/Jakarta", reminder_time="08:00", daily_reminders=False),
+    ])
+    session.commit()
+    session.close()
+
+    scheduler = SchedulerService()
+    calls = []
+
+    async def fake_send_daily_broadcast(bot=None, slots=None):
+        calls.append([row.telegram_id for row in UserService.iter_users_with_reminders(slots=slots)])
+        return {}
+
+    scheduler.broadcast_service.send_daily_broadcast = fake_send_daily_broadcast
+
+    asyncio.run(scheduler._dispatch_due_reminders(datetime(2024, 7, 1, 0, 59, tzinfo=timezone.utc)))
+    asyncio.run(scheduler._dispatch_due_reminders(datetime(2024, 7, 1, 1, 0, tzinfo=timezone.utc)))
+    # 01:01 was skipped (e.g. the loop was busy); 01:02 catches it up
+    asyncio.run(scheduler._dispatch_due_reminders(datetime(2024, 7, 1, 1, 2, tzinfo=timezone.utc)))
+    asyncio.run(scheduler._dispatch_due_reminders(datetime(2024, 7, 1, 7, 0, tzinfo=timezone.utc)))
+
+    assert calls == [[1], [2], [3]]
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -194,7 +194,8 @@ class BackupSystemTest:
                     'backup_metadata.json',
                     'database/pmo_recovery.db',
                     'database/pmo_recovery_export.sql',
-                    'database/user_data_export.json'
+                    'database/export/users.ndjson.gz',
+                    'database/export/journal_entries.ndjson.gz'
                 ]
                 
                 missing_files = []
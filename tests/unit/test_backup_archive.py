@@ -0,0 +1,107 @@
+"""
+Tests for the streaming backup archive builder
+"""
+import hashlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from src.services import backup_archive
+from src.services.backup_archive import (MANIFEST_NAME, ArchiveMember, build_archive, extract_archive,
+                                         extract_verified, iter_members, read_member)
+
+def _members(tmp_path):
+    rng = random.Random(3)
+    words = [b"urge", b"malam", b"stres", b"tenang", b"syukur"]
+    payload = b" ".join(rng.choice(words) for _ in range(200000))  # ~1.2 MB, many deflate blocks
+    (tmp_path / "live.db").write_bytes(payload)
+    (tmp_path / "quotes.json").write_bytes(b'["tetap kuat"]')
+    members = [
+        ArchiveMember("backup_metadata.json", writer=lambda f: f.write(b'{"user_count": 3}')),
+        ArchiveMember("database/pmo_recovery.db", path=tmp_path / "live.db"),
+        ArchiveMember("database/export/users.ndjson.gz", writer=lambda f: f.write(b"\x1f\x8bnot-recompressed")),
+        ArchiveMember("data/quotes.json", path=tmp_path / "quotes.json"),
+    ]
+    return members, payload
+
+def test_zip_parallel_deflate_round_trip(tmp_path):
+    """Blocks deflated on several threads form members any zip reader accepts"""
+    members, payload = _members(tmp_path)
+    report = build_archive(tmp_path / "backup.zip", members, "zip", workers=4, block_size=64 * 1024)
+
+    assert report["members"] == [member.name for member in members] + [MANIFEST_NAME]
+    assert report["bytes_in"] == len(payload) + 17 + 18 + 14
+    assert report["bytes_out"] < len(payload) / 2
+    with zipfile.ZipFile(tmp_path / "backup.zip") as archive:
+        assert archive.testzip() is None
+        assert archive.read("database/pmo_recovery.db") == payload
+        assert archive.getinfo("database/export/users.ndjson.gz").compress_type == zipfile.ZIP_STORED
+    assert read_member(tmp_path / "backup.zip", "backup_metadata.json") == b'{"user_count": 3}'
+    assert read_member(tmp_path / "backup.zip", "missing.json") is None
+    manifest = json.loads(read_member(tmp_path / "backup.zip", MANIFEST_NAME))["members"]
+    assert manifest == report["checksums"]
+    assert manifest["database/pmo_recovery.db"]["sha256"] == hashlib.sha256(payload).hexdigest()
+    assert not list(tmp_path.glob(".*.part"))
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_zip_member_larger_than_block_size_round_trips(tmp_path, monkeypatch, parallel):
+    """zipfile and the external unzip both accept multi-block members, with or without parallel deflate"""
+    if not parallel:
+        monkeypatch.setattr(backup_archive, "_PARALLEL_ZIP_VERSIONS", ((2, 0), (2, 0)))
+    payload = random.Random(5).randbytes(300 * 1024) * 3  # incompressible blocks, then repeats
+    (tmp_path / "live.db").write_bytes(payload)
+    build_archive(tmp_path / "backup.zip", [ArchiveMember("database/pmo_recovery.db", path=tmp_path / "live.db")],
+                  "zip", workers=3, block_size=64 * 1024)
+
+    with zipfile.ZipFile(tmp_path / "backup.zip") as archive:
+        assert archive.testzip() is None
+        assert archive.read("database/pmo_recovery.db") == payload
+    if shutil.which("unzip") is None:
+        pytest.skip("unzip not installed")
+    subprocess.run(["unzip", "-tq", str(tmp_path / "backup.zip")], check=True, capture_output=True)
+    extracted = subprocess.run(["unzip", "-p", str(tmp_path / "backup.zip"), "database/pmo_recovery.db"],
+                               check=True, capture_output=True).stdout
+    assert extracted == payload
+
+def test_failed_build_leaves_no_archive(tmp_path):
+    def broken(fileobj):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        build_archive(tmp_path / "backup.zip", [ArchiveMember("x", writer=broken)], "zip")
+    assert list(tmp_path.iterdir()) == []
+
+def test_tar_zst_round_trip(tmp_path):
+    pytest.importorskip("zstandard")
+    members, payload = _members(tmp_path)
+    build_archive(tmp_path / "backup.tar.zst", members, "tar.zst", workers=2)
+
+    contents = {name: member.read() for name, member in iter_members(tmp_path / "backup.tar.zst")}
+    assert list(contents) == [member.name for member in members] + [MANIFEST_NAME]
+    assert contents["database/pmo_recovery.db"] == payload
+
+def test_extract_verified_streams_selected_members(tmp_path):
+    """Skipped members are never written; selected ones land beside their targets, unrenamed"""
+    members, payload = _members(tmp_path)
+    build_archive(tmp_path / "backup.zip", members, "zip")
+    target = tmp_path / "restore" / "live.db"
+
+    extracted = extract_verified(tmp_path / "backup.zip",
+                                 lambda name: target if name == "database/pmo_recovery.db" else None)
+    temp_path, restored_target = extracted["database/pmo_recovery.db"]
+    assert list(extracted) == ["database/pmo_recovery.db"] and restored_target == target
+    assert temp_path.parent == target.parent and not target.exists()
+    assert temp_path.read_bytes() == payload
+
+def test_extract_rejects_paths_outside_destination(tmp_path):
+    build_archive(tmp_path / "evil.zip", [ArchiveMember("../escape.txt", writer=lambda f: f.write(b"x"))], "zip")
+    with pytest.raises(ValueError):
+        extract_archive(tmp_path / "evil.zip", tmp_path / "out")
+    assert not (tmp_path / "escape.txt").exists()
@@ -0,0 +1,91 @@
+"""
+Test script untuk registry-based CallbackRouter
+"""
+import asyncio
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from src.bot.handlers.callback_handlers import CallbackHandlers
+from src.bot.handlers.callback_router import CallbackRouter, RouteCollisionError, callback_route
+
+class _Handlers:
+    def __init__(self):
+        self.calls = []
+
+    @callback_route("mood_analysis")
+    async def analysis(self, query, context):
+        self.calls.append(("analysis",))
+
+    @callback_route("mood_", prefix=True)
+    async def mood(self, query, context, callback_data):
+        self.calls.append(("mood", callback_data))
+
+    @callback_route("mood_score_", prefix=True, pass_update=True)
+    async def score(self, update, context, callback_data):
+        self.calls.append(("score", callback_data, update.tag))
+
+def test_exact_beats_prefix_and_longest_prefix_wins():
+    """Exact routes win over prefixes, and the longest prefix wins among prefixes"""
+    handlers = _Handlers()
+    router = CallbackRouter.from_handlers(handlers)
+    update = SimpleNamespace(tag="u", callback_query=SimpleNamespace())
+
+    for data in ["mood_analysis", "mood_happy", "mood_score_7"]:
+        assert asyncio.run(router.dispatch(update, None, data)) is True
+    assert asyncio.run(router.dispatch(update, None, "unknown")) is False
+
+    assert handlers.calls == [("analysis",), ("mood", "mood_happy"), ("score", "mood_score_7", "u")]
+    assert router.unmatched == 1
+    stats = router.get_stats()
+    assert stats["mood_*"]["calls"] == 1
+    assert stats["mood_score_*"]["handler"] == "score"
+
+def test_duplicate_routes_fail_at_startup():
+    """Registering the same exact value or prefix twice raises RouteCollisionError"""
+    class _Duplicate:
+        @callback_route("main_menu")
+        async def first(self, query, context):
+            pass
+
+        @callback_route("main_menu")
+        async def second(self, query, context):
+            pass
+
+    with pytest.raises(RouteCollisionError):
+        CallbackRouter.from_handlers(_Duplicate())
+
+    router = CallbackRouter()
+    router.add("freq_", lambda *a: None, prefix=True)
+    with pytest.raises(RouteCollisionError):
+        router.add("freq_", lambda *a: None, prefix=True)
+
+def test_callback_handlers_route_table():
+    """Every button of the bot resolves to the same handler as the old if/elif chain"""
+    router = CallbackHandlers().router
+    expected = {
+        "main_menu": "_main_menu",
+        "emergency_mode": "_emergency_mode",
+        "emergency_contacts": "_handle_emergency",
+        "urge_surfing": "_handle_emergency",
+        "quick_mood_checkin": "_quick_mood_checkin",
+        "quick_mood_good": "_quick_mood_response",
+        "mood_score_4": "_mood_score_selection",
+        "mood_analysis": "_mood_analysis",
+        "mood_sad": "_handle_mood_selection",
+        "trigger_journal": "_trigger_analysis",
+        "language_settings": "_language_settings",
+        "lang_id": "_handle_language_selection",
+        "set_reminder_time": "_set_reminder_time",
+        "freq_daily": "_handle_reminder_frequency",
+    }
+    for data, handler_name in expected.items():
+        assert router.resolve(data).handler.__name__ == handler_name, data
+    assert router.resolve("does_not_exist") is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+"""
+Test script untuk bounded conversation state stores (memory LRU dan SQLite)
+"""
+import asyncio
+import sys
+import os
+import threading
+import time
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from src.utils.conversation_state import ConversationStateStore, MemoryStateStore, SQLiteStateStore, create_state_store
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    stores = []
+
+    def make(max_entries=100, ttl=60):
+        if request.param == 'memory':
+            store = MemoryStateStore(max_entries, ttl)
+        else:
+            store = SQLiteStateStore(str(tmp_path / "state.db"), max_entries, ttl)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        if isinstance(store, SQLiteStateStore):
+            store.close()
+
+def test_update_pop_clear(make_store):
+    """State merges per user, round-trips datetimes and is dropped when a flow ends"""
+    store = make_store()
+    started = datetime(2024, 5, 1, 8, 30)
+
+    async def flow():
+        await store.update(1, state='input_journal', journal_step='waiting_for_text')
+        await store.update(1, journal_text="hari ini baik", started=started)
+        await store.update(2, current_mood_score=7)
+
+        assert await store.get(1) == {'state': 'input_journal', 'journal_step': 'waiting_for_text',
+                                      'journal_text': "hari ini baik", 'started': started}
+        assert await store.pop(1, 'journal_text') == "hari ini baik"
+        assert 'journal_text' not in await store.get(1)
+
+        await store.clear(1)
+        assert await store.get(1) == {} and await store.get(2) == {'current_mood_score': 7}
+        assert await store.pop(3, 'missing', 'default') == 'default'
+
+    asyncio.run(flow())
+
+def test_bounded_by_entries_and_ttl(make_store):
+    """Oldest users are evicted past max_entries; abandoned flows expire after the TTL"""
+    store = make_store(max_entries=3, ttl=0.2)
+    for user_id in range(5):
+        asyncio.run(store.update(user_id, step=user_id))
+        time.sleep(0.001)
+    assert len(store) == 3
+    assert asyncio.run(store.get(0)) == {} and asyncio.run(store.get(4)) == {'step': 4}
+
+    time.sleep(0.25)
+    assert asyncio.run(store.get(4)) == {}
+
+def test_sqlite_state_survives_restart(tmp_path):
+    """A new store on the same file sees drafts written before the restart"""
+    path = str(tmp_path / "state.db")
+    store = SQLiteStateStore(path)
+    asyncio.run(store.update(9, journal_text="draft sebelum restart"))
+    store.close()
+
+    reopened = SQLiteStateStore(path)
+    assert asyncio.run(reopened.get(9)) == {'journal_text': "draft sebelum restart"}
+    assert len(reopened) == 1
+    reopened.close()
+
+def test_sqlite_io_runs_off_the_event_loop(tmp_path, monkeypatch):
+    """SQLite reads and writes happen in a worker thread; concurrent updates all land"""
+    store = SQLiteStateStore(str(tmp_path / "state.db"))
+    threads = set()
+    load = store._load
+    monkeypatch.setattr(store, "_load", lambda user_id: threads.add(threading.get_ident()) or load(user_id))
+
+    async def flow():
+        await asyncio.gather(*(store.update(1, **{f"step_{i}": i}) for i in range(20)))
+        return await store.get(1)
+
+    assert asyncio.run(flow()) == {f"step_{i}": i for i in range(20)}
+    assert threads and threading.get_ident() not in threads
+    store.close()
+
+def test_store_requires_backend_methods():
+    with pytest.raises(TypeError):
+        ConversationStateStore(10, 60)
+
+def test_backend_selection():
+    assert isinstance(create_state_store('memory'), MemoryStateStore)
+    assert isinstance(create_state_store('sqlite'), SQLiteStateStore)
+    with pytest.raises(ValueError):
+        create_state_store('redis')
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
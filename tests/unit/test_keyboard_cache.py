@@ -0,0 +1,62 @@
+"""
+Test script untuk cached InlineKeyboardMarkup di BotKeyboards, termasuk micro-benchmark
+"""
+import sys
+import os
+import timeit
+import tracemalloc
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.bot.keyboards import BotKeyboards
+
+def _allocated_bytes(func, calls=200):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        results = [func() for _ in range(calls)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del results
+    return sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0)
+
+def test_static_keyboards_are_shared_instances():
+    """Static keyboards are built once and returned as the same frozen markup"""
+    assert BotKeyboards.main_menu() is BotKeyboards.main_menu()
+    assert BotKeyboards.settings_menu() is BotKeyboards.settings_menu()
+    assert BotKeyboards.cache_info()['journal_menu']['currsize'] == 1
+
+def test_cached_keyboard_per_argument():
+    """confirmation_keyboard keeps one markup per action"""
+    reset = BotKeyboards.confirmation_keyboard("reset")
+    assert BotKeyboards.confirmation_keyboard("reset") is reset
+    other = BotKeyboards.confirmation_keyboard("delete")
+    assert other is not reset
+    assert other.inline_keyboard[0][0].callback_data == "confirm_delete"
+
+def test_cursor_keyboards_bypass_the_cache():
+    """Journal history pages carry one-off cursors, so their keyboards are never cached"""
+    first = BotKeyboards.journal_history_pagination("older", "newer")
+    assert BotKeyboards.journal_history_pagination("older", "newer") is not first
+    assert first.inline_keyboard[0][1].callback_data == "jpage_o_older"
+    assert 'journal_history_pagination' not in BotKeyboards.cache_info()
+
+def test_keyboard_cache_benchmark():
+    """Micro-benchmark: cached markups avoid per-callback allocations"""
+    uncached = BotKeyboards.main_menu.__wrapped__
+
+    build_time = timeit.timeit(uncached, number=2000)
+    cached_time = timeit.timeit(BotKeyboards.main_menu, number=2000)
+    build_bytes = _allocated_bytes(uncached)
+    cached_bytes = _allocated_bytes(BotKeyboards.main_menu)
+
+    print(f"\nmain_menu x2000: rebuild {build_time * 1000:.1f} ms, cached {cached_time * 1000:.1f} ms")
+    print(f"main_menu x200 allocations: rebuild {build_bytes} B, cached {cached_bytes} B")
+
+    assert cached_bytes * 5 < build_bytes
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,47 @@
+"""
+Test script untuk message template layer dan Markdown validation
+"""
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from src.bot.templates import (
+    MESSAGE_TEMPLATES, TemplateError, TemplateRegistry, message_templates, validate_markdown
+)
+
+def test_validate_markdown():
+    """Legacy Markdown entities must be closed, escaped characters are literal"""
+    assert validate_markdown("**Bold** and _italic_ and `code`") is None
+    assert validate_markdown("snake\\_case [link](https://t.me)") is None
+    assert validate_markdown("*inside bold _ is literal*") is None
+    assert "unclosed '*'" in validate_markdown("line one\n**broken*")
+    assert "unclosed link" in validate_markdown("[no target]")
+
+def test_shipped_templates_are_valid():
+    """Every shipped template loads, and static ones render to the same cached string"""
+    assert set(message_templates.names()) == set(MESSAGE_TEMPLATES)
+    static = message_templates.get('emergency_mode')
+    assert static.is_static
+    assert message_templates.render('emergency_mode') is message_templates.render('emergency_mode')
+
+def test_dynamic_fields_and_escaping():
+    """Dynamic fields are filled, user-supplied ones are escaped, missing ones fail loudly"""
+    message = message_templates.render('main_menu', first_name="budi_*", current_streak=5)
+    assert "Halo budi\\_\\*!" in message
+    assert "**5 hari**" in message
+    assert validate_markdown(message) is None
+
+    with pytest.raises(TemplateError):
+        message_templates.render('main_menu', first_name="budi")
+
+def test_invalid_template_rejected_at_load():
+    """A broken template is reported when loaded, not when sent"""
+    registry = TemplateRegistry()
+    with pytest.raises(TemplateError, match="bad_one"):
+        registry.load({'ok': "*fine*", 'bad_one': "**unclosed bold*"})
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
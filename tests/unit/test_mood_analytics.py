@@ -0,0 +1,101 @@
+"""
+Test script untuk NumPy-backed MoodAnalyticsService
+"""
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.bot.handlers.callback_handlers import CallbackHandlers
+from src.bot.templates import message_templates, validate_markdown
+from src.database.database import db
+from src.database.models import MoodEntry
+from src.services.mood_analytics_service import MoodAnalyticsService
+from src.services.user_service import UserService
+
+NOW = datetime(2024, 7, 15, 12, 0)  # Monday, UTC
+
+def _rows(days):
+    """One entry per day at 01:00 UTC; poor sleep and high stress on odd days drive urges up"""
+    rows = []
+    for day in range(days):
+        bad_day = day % 2 == 1
+        rows.append((
+            NOW - timedelta(days=days - day, hours=11),
+            4 if bad_day else 8,       # mood
+            5,                         # energy
+            8 if bad_day else 3,       # stress
+            3 if bad_day else 8,       # sleep
+            7 if bad_day else 2,       # urge
+        ))
+    return rows
+
+def test_compute_patterns_and_correlations():
+    """Averages, rolling windows, local weekday/hour patterns and correlations"""
+    analytics = MoodAnalyticsService.compute(_rows(28), "Asia/Jakarta", now=NOW)
+
+    assert analytics['entries'] == 28
+    assert analytics['averages']['mood_score'] == 6.0
+    assert analytics['rolling']['last_7d'] is not None
+    assert analytics['correlations']['sleep_urge'] == -1.0
+    assert analytics['correlations']['stress_urge'] == 1.0
+    assert analytics['correlations']['sleep_mood'] == 1.0
+
+    # 01:00 UTC is 08:00 in Jakarta
+    assert list(analytics['hour_mood']) == [8]
+    assert set(analytics['weekday_mood']) == set(range(7))
+    assert abs(analytics['trends']['mood_score']) < 0.5
+
+def test_compute_without_optional_metrics():
+    """Entries with only mood_score still produce averages and trends"""
+    rows = [(NOW - timedelta(days=i), 5 + (i % 3), None, None, None, None) for i in range(10, 0, -1)]
+    analytics = MoodAnalyticsService.compute(rows, now=NOW)
+    assert analytics['averages']['sleep_quality'] is None
+    assert analytics['correlations']['sleep_urge'] is None
+    assert analytics['trends']['mood_score'] is not None
+
+    assert MoodAnalyticsService.compute([], now=NOW) == {'timezone': 'Asia/Jakarta', 'entries': 0}
+
+def test_mood_analysis_screen_renders_valid_markdown():
+    """The analysis screen template accepts the formatted analytics"""
+    analytics = MoodAnalyticsService.compute(_rows(28), "Asia/Jakarta", now=NOW)
+    message = message_templates.render('mood_analysis', **CallbackHandlers._mood_analysis_fields(analytics))
+    assert "28 check-in" in message
+    assert "Sleep ↔ Urge: -1.00" in message
+    assert validate_markdown(message) is None
+
+def test_cache_invalidated_on_checkin(temp_db):
+    """Analytics are cached per user and dropped when a new check-in is recorded"""
+    session = db.get_session()
+    try:
+        for days_ago in range(3, 0, -1):
+            session.add(MoodEntry(user_id=7001, mood_score=6, created_at=datetime.utcnow() - timedelta(days=days_ago)))
+        session.commit()
+    finally:
+        db.close_session(session)
+
+    first = MoodAnalyticsService.get_user_analytics(7001)
+    assert first['entries'] == 3
+    assert MoodAnalyticsService.get_user_analytics(7001) is first
+
+    assert UserService.record_mood_checkin(7001, 9) is True
+    refreshed = MoodAnalyticsService.get_user_analytics(7001)
+    assert refreshed is not first
+    assert refreshed['entries'] == 4
+
+def test_compute_years_of_history_benchmark():
+    """Three years of daily check-ins are analysed in milliseconds"""
+    rows = _rows(3 * 365)
+    started_at = time.perf_counter()
+    analytics = MoodAnalyticsService.compute(rows, "Asia/Jakarta", now=NOW)
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+    print(f"\n{len(rows)} entries analysed in {elapsed_ms:.1f} ms")
+    assert analytics['entries'] == len(rows)
+    assert elapsed_ms < 250
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,100 @@
+"""
+Test script untuk pure streak calculation dan single-query streak stats
+"""
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import event
+from src.database.database import db
+from src.database.models import User
+from src.services.streak_service import StreakService
+from src.services.user_service import UserService
+
+def _capture_statements(engine, action):
+    statements = []
+    listener = lambda *args: statements.append(args[2].strip().split()[0].upper())
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = action()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, statements
+
+def _set_clean_start(telegram_id, clean_start_date):
+    session = db.get_session()
+    try:
+        user = session.query(User).filter(User.telegram_id == telegram_id).first()
+        user.clean_start_date = clean_start_date
+        user.current_streak = 0
+        session.commit()
+    finally:
+        db.close_session(session)
+
+def test_streak_days_is_pure():
+    """Streak is derived from clean_start_date only"""
+    now = datetime(2024, 7, 10, 12, 0)
+    assert StreakService.streak_days(None, now) == 0
+    assert StreakService.streak_days(now - timedelta(hours=23), now) == 0
+    assert StreakService.streak_days(now - timedelta(days=5, hours=1), now) == 5
+    assert StreakService.streak_days(now + timedelta(days=1), now) == 0
+
+def test_streak_stats_single_query_without_writes(temp_db):
+    """Stats read path issues one SELECT and never persists current_streak"""
+    UserService.get_or_create_user(telegram_id=9001, first_name="Streak")
+    _set_clean_start(9001, datetime.utcnow() - timedelta(days=12))
+
+    stats, statements = _capture_statements(db.engine, lambda: StreakService.get_streak_stats(9001))
+    assert stats['current_streak'] == 12
+    assert statements == ['SELECT']
+
+    streak, statements = _capture_statements(db.engine, lambda: StreakService.calculate_current_streak(9001))
+    assert streak == 12
+    assert statements == ['SELECT']
+
+    _, statements = _capture_statements(
+        db.async_engine.sync_engine, lambda: asyncio.run(StreakService.get_streak_stats_async(9001))
+    )
+    assert statements == ['SELECT']
+
+def test_record_relapse_uses_one_session(temp_db):
+    """Relapse keeps longest streak and resets in a single read + write round"""
+    UserService.get_or_create_user(telegram_id=9002, first_name="Relapse")
+    _set_clean_start(9002, datetime.utcnow() - timedelta(days=7))
+
+    assert StreakService.record_relapse(9002, triggers=["stress"]) is True
+    stats = StreakService.get_streak_stats(9002)
+    assert stats['current_streak'] == 0
+    assert stats['longest_streak'] == 7
+    assert stats['total_relapses'] == 1
+
+def test_refresh_streaks_chunked_bulk_update(temp_db):
+    """Nightly refresh updates current and longest streak with one UPDATE per chunk"""
+    for telegram_id, days in [(9003, 3), (9004, 30), (9005, 0)]:
+        UserService.get_or_create_user(telegram_id=telegram_id, first_name="U")
+        _set_clean_start(telegram_id, datetime.utcnow() - timedelta(days=days, hours=1))
+
+    report, statements = _capture_statements(db.engine, lambda: StreakService.refresh_streaks(chunk_size=2))
+    assert report['updated'] == 2  # 0-day user already matches
+    assert report['chunks'] == 2
+    assert statements.count('UPDATE') == 2
+
+    session = db.get_session()
+    try:
+        streaks = {row.telegram_id: (row.current_streak, row.longest_streak) for row in
+                   session.query(User.telegram_id, User.current_streak, User.longest_streak)
+                   .filter(User.telegram_id.in_([9003, 9004, 9005])).all()}
+    finally:
+        db.close_session(session)
+    assert streaks == {9003: (3, 3), 9004: (30, 30), 9005: (0, 0)}
+
+    # Second run finds nothing to change
+    assert StreakService.refresh_streaks()['updated'] == 0
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-v"])
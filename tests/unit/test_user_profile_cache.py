@@ -0,0 +1,74 @@
+"""
+Test script untuk TTLCache dan write-through user profile cache
+"""
+import asyncio
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import event
+from src.services.streak_service import StreakService
+from src.services.user_service import UserService
+from src.utils.cache import TTLCache
+
+def _count_statements(engine, action):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = action()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, len(statements)
+
+def test_ttl_cache_lru_and_expiry():
+    """Entries expire after ttl and the least recently used one is evicted first"""
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now most recently used
+    cache.set("c", 3)           # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 2 and stats['evictions'] == 1
+
+def test_repeated_lookups_skip_database(temp_db):
+    """Second identity lookup with unchanged profile is served from the cache"""
+    profile = dict(telegram_id=1, username="andi", first_name="Andi", last_name=None)
+    UserService.get_or_create_user(**profile)
+
+    user, statements = _count_statements(temp_db, lambda: UserService.get_or_create_user(**profile))
+    assert statements == 0 and user.username == "andi"
+
+    user, statements = _count_statements(temp_db, lambda: asyncio.run(UserService.get_or_create_user_async(**profile)))
+    assert user.telegram_id == 1
+    assert UserService.get_cache_stats()['hits'] >= 2
+
+def test_profile_change_and_writes_refresh_cache(temp_db):
+    """Changed Telegram profile goes to the DB; preference and relapse writes invalidate"""
+    UserService.get_or_create_user(2, username="budi")
+
+    renamed, statements = _count_statements(temp_db, lambda: UserService.get_or_create_user(2, username="budi_baru"))
+    assert statements > 0 and renamed.username == "budi_baru"
+    assert UserService.get_user(2).username == "budi_baru"
+
+    assert UserService.update_user_preferences(2, reminder_time="21:00")
+    assert UserService.get_user(2).reminder_time == "21:00"
+
+    assert StreakService.record_relapse(2)
+    assert UserService.get_user(2).total_relapses == 1
+
+    assert asyncio.run(StreakService.record_relapse_async(2))
+    assert asyncio.run(UserService.get_user_async(2)).total_relapses == 2
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))